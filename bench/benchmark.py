@@ -0,0 +1,585 @@
+"""
+Macro benchmark for the TAMS report parsers
+
+Generates synthetic reports with generate_reports.py and reports throughput
+(MB/s, lines/s) and peak memory for each parse_RPTxxx function, then for a
+full run.py ingest of a generated reports/<date>/ tree.
+
+Usage:
+    python bench/benchmark.py [--transactions N] [--employees N] [--days N]
+                              [--repeat N] [--workers N] [--skip-ingest]
+                              [--columnar] [--vectorized] [--mmap] [--stream]
+                              [--summary] [--sniff] [--sqlite] [--stores N] [--pipeline]
+                              [--scan-days N]
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import pathlib
+import datetime
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import report_parser  # noqa: E402
+from report_io import open_report  # noqa: E402
+from generate_reports import generate_archive, generate_report  # noqa: E402
+
+REPORT_NUMBERS = ["001", "002", "003", "004", "083"]
+
+
+def measure_parser(report_number, text, repeat=5):
+    """
+    Time a parse_RPTxxx function on one report and measure its peak allocation
+
+    Args:
+        report_number (str): Report number without prefix
+        text (str): Report text
+        repeat (int): Number of timed runs, the best one is reported
+
+    Returns:
+        dict: seconds, mb_per_s, lines_per_s and peak_mb for the report
+    """
+    parse = getattr(report_parser, f"parse_RPT{report_number}")
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    parse(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size_mb = len(text.encode("utf-8")) / 1e6
+    lines = text.count("\n")
+    return {
+        "seconds": best,
+        "mb_per_s": size_mb / best,
+        "lines_per_s": lines / best,
+        "peak_mb": peak / 1e6,
+        "size_mb": size_mb,
+    }
+
+
+def measure_columnar_memory(text):
+    """
+    Compare the memory retained by RPT002 results in list-of-dicts and columnar layout
+
+    Args:
+        text (str): RPT002 report text
+
+    Returns:
+        dict: retained_mb for 'dicts' and 'columnar', and their ratio
+    """
+    retained = {}
+    for layout, columnar in (("dicts", False), ("columnar", True)):
+        tracemalloc.start()
+        result = report_parser.parse_RPT002(text, columnar=columnar)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        retained[layout] = current / 1e6
+        del result
+    retained["ratio"] = retained["dicts"] / retained["columnar"]
+    return retained
+
+
+def measure_input_memory(text, **options):
+    """
+    Compare the peak allocation of parsing RPT002 from a str and from a memory-mapped file
+
+    Args:
+        text (str): RPT002 report text
+        **options: Extra ReportParser arguments, e.g. columnar=True
+
+    Returns:
+        dict: result_mb retained by the parse result, and peak_mb for 'text' and 'mmap'
+    """
+    peaks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "RPT002_20140514181224.PF")
+        with open(file_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        for mode in ("text", "mmap"):
+            parser = report_parser.ReportParser(**options)
+            tracemalloc.start()
+            if mode == "text":
+                with open_report(file_path) as f:
+                    parser.parse_report("002", f.read())
+            else:
+                parser.parse_file("002", file_path)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks[mode] = peak / 1e6
+            peaks["result_mb"] = current / 1e6
+            del parser
+    return peaks
+
+
+def measure_streaming(transactions):
+    """
+    Consume report_parser.iter_transactions over a generated RPT002 file and measure its peak allocation
+
+    Args:
+        transactions (int): Transaction lines in the generated register
+
+    Returns:
+        dict: size_mb of the file, transactions seen and peak_mb
+    """
+    text = generate_report("002", datetime.datetime(2014, 5, 12, 18, 12, 24), transactions=transactions)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = pathlib.Path(tmp) / "RPT002_20140514181224.PF"
+        with open(file_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        del text
+        count = 0
+        tracemalloc.start()
+        for event, _ in report_parser.iter_transactions(file_path):
+            if event == "transaction":
+                count += 1
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = file_path.stat().st_size
+    return {
+        "size_mb": size / 1e6,
+        "transactions": count,
+        "peak_mb": peak / 1e6,
+    }
+
+
+def measure_summary(transactions, repeat=5):
+    """
+    Time parse_RPT002_summary against a full parse_RPT002 on a generated RPT002 file
+
+    Args:
+        transactions (int): Transaction lines in the generated register
+        repeat (int): Number of timed runs of each, the best one is reported
+
+    Returns:
+        dict: size_mb of the file, best seconds for 'summary' and 'full', and their ratio
+    """
+    text = generate_report("002", datetime.datetime(2014, 5, 12, 18, 12, 24), transactions=transactions)
+    best = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = pathlib.Path(tmp) / "RPT002_20140514181224.PF"
+        with open(file_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        del text
+        for _ in range(repeat):
+            for mode, parse in (("summary", report_parser.parse_RPT002_summary),
+                                ("full", report_parser.parse_RPT002)):
+                start = time.perf_counter()
+                parse(file_path)
+                elapsed = time.perf_counter() - start
+                best[mode] = min(best.get(mode, elapsed), elapsed)
+        best["size_mb"] = file_path.stat().st_size / 1e6
+    best["speedup"] = best["full"] / best["summary"]
+    return best
+
+
+def measure_vectorized(report_number, text, repeat=5, **options):
+    """
+    Compare a parse_RPTxxx function with and without the NumPy engine
+
+    Args:
+        report_number (str): Report number without prefix, '002' or '003'
+        text (str): Report text
+        repeat (int): Number of timed runs of each, the best one is reported
+        **options: Extra keyword arguments for the parser, e.g. columnar=True
+
+    Returns:
+        dict: best seconds for 'python' and 'numpy', and their ratio
+    """
+    parse = getattr(report_parser, f"parse_RPT{report_number}")
+    best = {}
+    for _ in range(repeat):
+        for engine, vectorized in (("python", False), ("numpy", True)):
+            start = time.perf_counter()
+            parse(text, vectorized=vectorized, **options)
+            elapsed = time.perf_counter() - start
+            best[engine] = min(best.get(engine, elapsed), elapsed)
+    best["speedup"] = best["python"] / best["numpy"]
+    return best
+
+
+def measure_sniff(days, transactions):
+    """
+    Classify a generated archive by file name and by sniffing every file's header
+
+    Args:
+        days (int): Number of date directories to generate
+        transactions (int): Transaction lines per RPT002, sniffing should not depend on it
+
+    Returns:
+        dict: files classified, size_mb of the archive and seconds for 'names' and 'sniff'
+    """
+    import run
+    with tempfile.TemporaryDirectory() as tmp:
+        reports_dir = os.path.join(tmp, "reports")
+        paths = generate_archive(reports_dir, days=days, employees=50, transactions=transactions,
+                                 compress=True)
+        result = {"size_mb": sum(os.path.getsize(path) for path in paths) / 1e6}
+        for mode, sniff in (("names", False), ("sniff", True)):
+            start = time.perf_counter()
+            jobs = run.find_report_files(reports_dir, sniff=sniff)
+            result[mode] = time.perf_counter() - start
+            result["files"] = len(jobs)
+    return result
+
+
+# Names of the files TAMS leaves in every date directory besides the RPT reports, see run.py
+ARCHIVE_NAMES = (["COMLOG.PF", "EODLOG.PF", "ISLOG.PF", "ISLOG.PF.z", "JOEILOG.PF", "JOEILOG.PF.z"]
+                 + [f"COM{number:03d}_{{stamp}}.PF.z" for number in (50, 60, 70, 150)]
+                 + [f"PO_FINAL_{{stamp}}{index:02d}.PF.z" for index in range(16)]
+                 + [f"SCR{number:03d}_{{stamp}}.PF.z" for number in range(50, 60)]
+                 + [f"RPT{number}_{{stamp}}.PF.z" for number in ("001", "002", "003", "004", "005", "006", "008",
+                                                                 "012", "013", "015", "017", "077", "078", "079",
+                                                                 "080", "082", "083", "113", "121", "130", "203")])
+
+
+def measure_scan(days):
+    """
+    Time find_report_files over an archive skeleton with and without scan filters, then the catalog
+
+    The archive holds days date directories with about 60 empty files each,
+    named like the files TAMS writes, so only directory listing is measured.
+    The catalog is timed building, refreshing an unchanged archive, refreshing
+    after a new day was added, and opened and queried without a refresh, whole
+    and filtered.
+
+    Args:
+        days (int): Number of date directories, 3650 for ten years
+
+    Returns:
+        dict: files in the archive and scans, 'all', 'week', 'type' and the 'catalog ...'
+        steps -> (seconds, reports found)
+    """
+    import run
+    start_date = datetime.date(2014, 5, 12)
+    with tempfile.TemporaryDirectory() as tmp:
+        for day in range(days):
+            date = start_date + datetime.timedelta(days=day)
+            date_dir = os.path.join(tmp, date.strftime("%Y%m%d"))
+            os.mkdir(date_dir)
+            stamp = date.strftime("%Y%m%d") + "1812"
+            for name in ARCHIVE_NAMES:
+                open(os.path.join(date_dir, name.format(stamp=stamp)), "w").close()
+            # Old enough for the catalog to trust the directory mtimes
+            os.utime(date_dir, (0, 0))
+        os.utime(tmp, (0, 0))
+
+        last_week = (start_date + datetime.timedelta(days=days - 7)).strftime("%Y%m%d")
+        filters = {
+            "all": None,
+            "week": run.ScanFilter(since=last_week),
+            "type": run.ScanFilter(types=["RPT083"]),
+        }
+        result = {"files": days * len(ARCHIVE_NAMES), "scans": {}}
+        for name, scan_filter in filters.items():
+            start = time.perf_counter()
+            jobs = run.find_report_files(tmp, scan_filter=scan_filter)
+            result["scans"][name] = (time.perf_counter() - start, len(jobs))
+
+        catalog_path = os.path.join(tmp, "catalog.sqlite")
+        catalog = run.ReportCatalog(catalog_path)
+        for name in ("catalog build", "catalog refresh", "catalog new day"):
+            if name == "catalog new day":
+                date_dir = os.path.join(tmp, (start_date + datetime.timedelta(days=days)).strftime("%Y%m%d"))
+                os.mkdir(date_dir)
+                open(os.path.join(date_dir, "RPT083_20990101181200.PF.z"), "w").close()
+                os.utime(tmp, (1, 1))
+            start = time.perf_counter()
+            catalog.update(tmp)
+            jobs = [job for _, dir_jobs in run.find_catalog_files(catalog, tmp) for job in dir_jobs]
+            result["scans"][name] = (time.perf_counter() - start, len(jobs))
+        for name, scan_filter in filters.items():
+            start = time.perf_counter()
+            jobs = [job for _, dir_jobs in run.find_catalog_files(run.ReportCatalog(catalog_path), tmp, scan_filter)
+                    for job in dir_jobs]
+            result["scans"][f"catalog query {name}"] = (time.perf_counter() - start, len(jobs))
+    return result
+
+
+def measure_sqlite(days, employees, transactions):
+    """
+    Load one parsed day of every report into a SQLite database for many dates, then run indexed lookups
+
+    Parsing is done once up front, so only the database load is timed.
+
+    Args:
+        days (int): Number of dates loaded
+        employees (int): Employee rows per RPT001
+        transactions (int): Transaction lines per RPT002
+
+    Returns:
+        dict: rows loaded, seconds for 'load' and 'index', size_mb of the database and
+        best seconds of the 'invoice' and 'employee' lookups
+    """
+    from report_sqlite import ReportDatabase
+    printed = datetime.datetime(2014, 5, 12, 18, 12, 24)
+    reports = {f"RPT{report_number}": getattr(report_parser, f"parse_RPT{report_number}")(
+        generate_report(report_number, printed, employees=employees, transactions=transactions))
+        for report_number in REPORT_NUMBERS}
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dump.sqlite")
+        database = ReportDatabase(path)
+        start = time.perf_counter()
+        for day in range(days):
+            real_date = (printed + datetime.timedelta(days=day)).strftime("%Y%m%d")
+            for report_type, data in reports.items():
+                database.add(real_date, report_type, data)
+        database.commit()
+        result["load"] = time.perf_counter() - start
+        start = time.perf_counter()
+        database.close()
+        result["index"] = time.perf_counter() - start
+        result["size_mb"] = os.path.getsize(path) / 1e6
+
+        connection = sqlite3.connect(path)
+        result["rows"] = sum(connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                             for table in ("reports", "employee_metrics", "transactions", "quarter_hours",
+                                           "journal_lines", "inventory_metrics"))
+        lookups = {
+            "invoice": ("SELECT r.print_date, t.* FROM transactions t JOIN reports r USING (report_id) "
+                        "WHERE t.inv_number = ?", ("100042",)),
+            "employee": ("SELECT r.print_date, m.today_net_sales FROM employee_metrics m "
+                         "JOIN reports r USING (report_id) WHERE m.employee = ? AND m.role = 'employee' "
+                         "AND r.store_id = ? ORDER BY r.print_date", ("12", "900002424")),
+        }
+        for name, (query, parameters) in lookups.items():
+            for _ in range(5):
+                start = time.perf_counter()
+                connection.execute(query, parameters).fetchall()
+                elapsed = time.perf_counter() - start
+                result[name] = min(result.get(name, elapsed), elapsed)
+        connection.close()
+    return result
+
+
+def measure_stores(stores, days, employees, transactions, workers=1):
+    """
+    Run run.py --by-store over generated archives of several stores in a subprocess
+
+    Every store gets its own reports tree, passed with one --reports-dir each.
+
+    Args:
+        stores (int): Number of stores
+        days (int): Number of date directories per store
+        employees (int): Employee rows per RPT001
+        transactions (int): Transaction lines per RPT002
+        workers (int): Value passed to run.py --workers
+
+    Returns:
+        dict: seconds and size_mb of the run, reports listed in stores.json
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        command = [sys.executable, os.path.join(REPO_DIR, "run.py"), "--by-store",
+                   "--output", os.path.join(tmp, "stores"), "--workers", str(workers)]
+        size = 0
+        for store in range(stores):
+            reports_dir = os.path.join(tmp, f"reports{store}")
+            paths = generate_archive(reports_dir, days=days, employees=employees, transactions=transactions,
+                                     compress=True, store_id=f"9000{store:05d}", store_name=f"STORE {store}",
+                                     seed=store)
+            size += sum(os.path.getsize(path) for path in paths)
+            command += ["--reports-dir", reports_dir]
+
+        start = time.perf_counter()
+        subprocess.run(command, check=True, cwd=tmp, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        with open(os.path.join(tmp, "stores", "stores.json")) as f:
+            index = json.load(f)
+    return {
+        "seconds": elapsed,
+        "size_mb": size / 1e6,
+        "reports": sum(entry["reports"] for entry in index.values()),
+    }
+
+
+def measure_ingest(days, employees, transactions, workers=1, pipeline=False):
+    """
+    Run run.py over a generated archive in a subprocess
+
+    Args:
+        days (int): Number of date directories to generate
+        employees (int): Employee rows per RPT001
+        transactions (int): Transaction lines per RPT002
+        workers (int): Value passed to run.py --workers
+        pipeline (bool): Pass --pipeline to run.py
+
+    Returns:
+        dict: seconds, mb_per_s, lines_per_s and max_rss_mb of the run, and the
+        output of run.py (the stage utilization table with pipeline)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        reports_dir = os.path.join(tmp, "reports")
+        generate_archive(reports_dir, days=days, employees=employees, transactions=transactions,
+                         compress=True)
+        size = 0
+        lines = 0
+        for report_number in REPORT_NUMBERS:
+            text = generate_report(report_number, datetime.datetime(2014, 5, 12, 18, 12, 24),
+                                   employees=employees, transactions=transactions)
+            size += len(text.encode("utf-8"))
+            lines += text.count("\n")
+        size *= days
+        lines *= days
+
+        before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, os.path.join(REPO_DIR, "run.py"),
+                                    "--reports-dir", reports_dir,
+                                    "--output", os.path.join(tmp, "dump.jsonl"),
+                                    "--workers", str(workers)] + (["--pipeline"] if pipeline else []),
+                                   check=True, cwd=tmp, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return {
+        "seconds": elapsed,
+        "mb_per_s": size / 1e6 / elapsed,
+        "lines_per_s": lines / elapsed,
+        # ru_maxrss is in kilobytes on Linux
+        "max_rss_mb": max(max_rss, before) / 1024,
+        "size_mb": size / 1e6,
+        "output": completed.stdout,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the TAMS report parsers")
+    arg_parser.add_argument("--transactions", type=int, default=20000,
+                            help="transaction lines in the RPT002 sample (default: 20000)")
+    arg_parser.add_argument("--employees", type=int, default=200,
+                            help="employee rows in the RPT001 sample (default: 200)")
+    arg_parser.add_argument("--days", type=int, default=30,
+                            help="date directories in the ingest run (default: 30)")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="run.py --workers for the ingest run (default: 1)")
+    arg_parser.add_argument("--skip-ingest", action="store_true")
+    arg_parser.add_argument("--columnar", action="store_true",
+                            help="also compare RPT002 memory in list-of-dicts and columnar layout")
+    arg_parser.add_argument("--vectorized", action="store_true",
+                            help="also compare RPT002/RPT003 parse times with and without NumPy")
+    arg_parser.add_argument("--mmap", action="store_true",
+                            help="also compare RPT002 peak memory parsing a str and a memory-mapped file")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="also measure iter_transactions peak memory on growing RPT002 registers")
+    arg_parser.add_argument("--summary", action="store_true",
+                            help="also compare RPT002 summary-only and full parse times on growing registers")
+    arg_parser.add_argument("--sniff", action="store_true",
+                            help="also time classifying a generated archive by file name and by header sniffing")
+    arg_parser.add_argument("--sqlite", action="store_true",
+                            help="also time loading a year of parsed reports into SQLite and indexed lookups")
+    arg_parser.add_argument("--stores", type=int, default=0,
+                            help="also time run.py --by-store on this many stores with 1 and --workers processes")
+    arg_parser.add_argument("--pipeline", action="store_true",
+                            help="also run the ingest through run.py --pipeline and print its stage utilization")
+    arg_parser.add_argument("--scan-days", type=int, default=0,
+                            help="also time scanning an archive skeleton of this many days, whole, filtered "
+                                 "and through a catalog")
+    args = arg_parser.parse_args()
+
+    printed = datetime.datetime(2014, 5, 12, 18, 12, 24)
+    print(f"{'parser':<12}{'size MB':>9}{'seconds':>10}{'MB/s':>9}{'lines/s':>12}{'peak MB':>10}")
+    for report_number in REPORT_NUMBERS:
+        text = generate_report(report_number, printed, employees=args.employees,
+                               transactions=args.transactions)
+        result = measure_parser(report_number, text, args.repeat)
+        print(f"{'RPT' + report_number:<12}{result['size_mb']:>9.2f}{result['seconds']:>10.4f}"
+              f"{result['mb_per_s']:>9.2f}{result['lines_per_s']:>12.0f}{result['peak_mb']:>10.2f}")
+
+    if args.columnar:
+        text = generate_report("002", printed, transactions=args.transactions)
+        result = measure_columnar_memory(text)
+        print(f"RPT002 retained result: {result['dicts']:.2f} MB as dicts, "
+              f"{result['columnar']:.2f} MB columnar ({result['ratio']:.1f}x smaller)")
+
+    if args.vectorized:
+        import report_numpy
+        if not report_numpy.available():
+            print("NumPy is not installed, the vectorized engine falls back to pure Python")
+        for report_number, options in (("002", {}), ("002", {"columnar": True}), ("003", {})):
+            text = generate_report(report_number, printed, transactions=args.transactions)
+            result = measure_vectorized(report_number, text, args.repeat, **options)
+            label = f"RPT{report_number}" + (" columnar" if options else "")
+            print(f"{label:<16} python {result['python']:.4f}s, numpy {result['numpy']:.4f}s "
+                  f"({result['speedup']:.2f}x)")
+
+    if args.mmap:
+        for options in ({}, {"columnar": True}):
+            text = generate_report("002", printed, transactions=args.transactions)
+            result = measure_input_memory(text, **options)
+            del text
+            label = "RPT002" + (" columnar" if options else "")
+            print(f"{label:<16} result {result['result_mb']:.2f} MB, peak {result['text']:.2f} MB "
+                  f"from str, {result['mmap']:.2f} MB from mmap")
+
+    if args.stream:
+        for scale in (1, 4):
+            result = measure_streaming(args.transactions * scale)
+            print(f"iter_transactions {result['transactions']:>8} transactions, {result['size_mb']:.2f} MB: "
+                  f"peak {result['peak_mb']:.2f} MB")
+
+    if args.summary:
+        for scale in (1, 4):
+            result = measure_summary(args.transactions * scale, args.repeat)
+            print(f"parse_RPT002_summary {result['size_mb']:.2f} MB: {result['summary'] * 1000:.2f} ms, "
+                  f"full parse {result['full']:.4f}s ({result['speedup']:.0f}x)")
+
+    if args.sniff:
+        for transactions in (2000, 20000):
+            result = measure_sniff(args.days, transactions)
+            print(f"sniff {result['files']} files ({result['size_mb']:.2f} MB compressed): "
+                  f"{result['sniff'] * 1000:.1f} ms, {result['files'] / result['sniff']:.0f} files/s "
+                  f"(file names {result['names'] * 1000:.1f} ms)")
+
+    if args.scan_days:
+        result = measure_scan(args.scan_days)
+        print(f"scan {args.scan_days} days, {result['files']} files: "
+              + ", ".join(f"{name} {seconds * 1000:.0f} ms ({jobs} reports)"
+                          for name, (seconds, jobs) in result["scans"].items()))
+
+    if args.sqlite:
+        result = measure_sqlite(365, args.employees, args.transactions // 4)
+        print(f"sqlite 365 days, {result['rows']} rows: load {result['load']:.2f}s, "
+              f"indexes {result['index']:.2f}s, {result['size_mb']:.0f} MB; lookup by invoice "
+              f"{result['invoice'] * 1000:.2f} ms, employee history {result['employee'] * 1000:.2f} ms")
+
+    if args.stores:
+        for workers in sorted({1, args.workers}):
+            result = measure_stores(args.stores, args.days, 50, 2000, workers)
+            print(f"by store, {args.stores} stores x {args.days} days, {result['reports']} reports "
+                  f"({result['size_mb']:.2f} MB compressed): {result['seconds']:.2f}s with {workers} "
+                  f"worker{'s' if workers != 1 else ''}")
+
+    if not args.skip_ingest:
+        result = measure_ingest(args.days, employees=50, transactions=2000, workers=args.workers)
+        print(f"{'ingest':<12}{result['size_mb']:>9.2f}{result['seconds']:>10.4f}"
+              f"{result['mb_per_s']:>9.2f}{result['lines_per_s']:>12.0f}"
+              f"{result['max_rss_mb']:>10.2f}  (max RSS, {args.days} days, "
+              f"{args.workers} worker{'s' if args.workers != 1 else ''})")
+        if args.pipeline:
+            result = measure_ingest(args.days, employees=50, transactions=2000, workers=args.workers,
+                                    pipeline=True)
+            print(f"{'pipeline':<12}{result['size_mb']:>9.2f}{result['seconds']:>10.4f}"
+                  f"{result['mb_per_s']:>9.2f}{result['lines_per_s']:>12.0f}"
+                  f"{result['max_rss_mb']:>10.2f}")
+            print(result["output"].rstrip())
+
+
+if __name__ == "__main__":
+    main()
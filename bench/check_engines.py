@@ -0,0 +1,439 @@
+"""
+Equivalence check of the parsing engines against the reference parser
+
+Generates reports of every type with generate_reports.py over several seeds
+and page lengths, plus two copies of each with cells overwritten: one with
+the blanks, signs and points the NumPy engine still converts in bulk, one
+with sentinels, separators, percentages, stray form feeds and multi-byte
+characters. Then checks that every engine produces exactly what the
+reference produces:
+
+- the fixed-width layouts: every FixedWidthLayout of the parsers, its
+  extract, extract_many and extract_columns, with and without the NumPy
+  engine, against slicing each field and calling its converter, on the
+  lines the parsers apply the layout to and on copies with blanked cells;
+- the page readers: read_pages, read_lines, read_last_pages and PageIndex
+  on report text, bytes, memoryviews, memory-mapped files and streams read
+  in small chunks, against str.split on the report text;
+- the parsers: report text is the reference input, bytes, memoryviews,
+  memory-mapped .PF files, .PF.z streams and open text files must give the
+  same result, and so must the vectorized, columnar and summary-only modes;
+- the ingest: run.py --pipeline, with one and two parser processes, must
+  write the same jsonl and sqlite output as a plain run.py over a generated
+  archive.
+
+Results are compared as JSON, so a float that should be an int or a -0.0
+that should be 0.0 is a mismatch. The NumPy checks are skipped, with a note,
+when NumPy is not installed.
+
+Usage:
+    python bench/check_engines.py [--seeds N] [--transactions N]
+
+Exits with status 1 on any mismatch.
+"""
+import io
+import os
+import sys
+import gzip
+import json
+import random
+import sqlite3
+import argparse
+import datetime
+import tempfile
+import importlib
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import report_numpy  # noqa: E402
+import report_parser  # noqa: E402
+from report_io import ReportBuffer, map_report, split_stream, split_text  # noqa: E402
+from report_pages import PageIndex, read_last_pages, read_lines, read_pages  # noqa: E402
+from report_layout import FixedWidthLayout  # noqa: E402
+from report_columnar import json_default  # noqa: E402
+from generate_reports import generate_archive, generate_report  # noqa: E402
+
+REPORT_NUMBERS = ["001", "002", "003", "004", "083"]
+
+# Text written over report cells by mutate, what TAMS prints besides plain numbers and some of what it should not
+CELL_TOKENS = ['', ' ', '******', '!!!!!!', '-', '0.00', '1,234.50', '12.50-', '87.50%', '+3', 'abc', 'é', '\f', '.', ',']
+
+# Characters written over single positions by mutate
+CELL_CHARACTERS = '0123456789 -+,.%!*abcTé\f'
+
+# Edits made only of the characters the NumPy engine converts in bulk, blank cells and misplaced signs,
+# spaces and points, so the mutated columns are still converted by it rather than handed back to Python
+NUMERIC_TOKENS = ['      ', '   ', '-', '+', '.', '0', '1-', '-1', '+.5', '1.2.3', '- 1', '9' * 20]
+NUMERIC_CHARACTERS = '0123456789 -+.'
+
+# run.py output formats whose files check_ingest compares
+INGEST_FORMATS = ('jsonl', 'sqlite')
+
+# Chunk sizes the streams and report text are split with, small enough to cut through pages and lines
+SPLIT_CHUNK_SIZES = (1, 7, 4096)
+
+
+def mutate(text, rng, edits=40, tokens=CELL_TOKENS, characters=CELL_CHARACTERS):
+    """
+    Overwrite random cells and characters of a report, keeping its line lengths mostly intact
+
+    Args:
+        text (str): Report text
+        rng (random.Random): Source of the edits
+        edits (int): Number of cells and characters overwritten
+        tokens (list): Text written over cells
+        characters (str): Characters written over single positions
+
+    Returns:
+        str: The mutated report text
+    """
+    lines = text.split('\n')
+    for _ in range(edits):
+        index = rng.randrange(len(lines))
+        line = lines[index]
+        if not line:
+            continue
+        start = rng.randrange(len(line))
+        if rng.random() < 0.5:
+            token = rng.choice(tokens)
+            lines[index] = line[:start] + token + line[start + len(token):]
+        else:
+            lines[index] = line[:start] + rng.choice(characters) + line[start + 1:]
+    return '\n'.join(lines)
+
+
+def generate_fixtures(seeds, transactions):
+    """
+    Build the reports every engine is checked on
+
+    Args:
+        seeds (int): Number of seeds, each with its own page length
+        transactions (int): Transaction lines of RPT002
+
+    Returns:
+        list: (name, report_number, text) triples, per seed and type a clean report, one
+        with numeric edits the NumPy engine still converts and one with arbitrary edits
+    """
+    printed = datetime.datetime(2014, 5, 14, 18, 12, 24)
+    fixtures = []
+    for seed in range(seeds):
+        rng = random.Random(seed)
+        for report_number in REPORT_NUMBERS:
+            text = generate_report(report_number, printed, employees=30, transactions=transactions,
+                                   seed=seed, lines_per_page=20 + seed * 7)
+            fixtures.append((f"RPT{report_number} seed {seed}", report_number, text))
+            fixtures.append((f"RPT{report_number} seed {seed} numeric edits", report_number,
+                             mutate(text, rng, tokens=NUMERIC_TOKENS, characters=NUMERIC_CHARACTERS)))
+            fixtures.append((f"RPT{report_number} seed {seed} mutated", report_number, mutate(text, rng)))
+    return fixtures
+
+
+def as_json(value):
+    """Serialize a result for comparison, columnar and NumPy sequences as the lists they stand for"""
+    def default(obj):
+        if hasattr(obj, 'tolist'):
+            return obj.tolist()
+        return json_default(obj)
+    return json.dumps(value, default=default)
+
+
+def outcome(function, *args, **kwargs):
+    """JSON of what a call returns, or the name of the exception it raises"""
+    try:
+        return as_json(function(*args, **kwargs))
+    except Exception as error:
+        return f"raised {type(error).__name__}"
+
+
+class Checker:
+    """Counts comparisons and prints the first mismatches"""
+
+    def __init__(self, shown=10):
+        self.checks = 0
+        self.mismatches = 0
+        self.shown = shown
+
+    def same(self, what, expected, actual):
+        self.checks += 1
+        if expected == actual:
+            return
+        self.mismatches += 1
+        if self.mismatches <= self.shown:
+            print(f"MISMATCH {what}\n  expected {expected[:200]}\n  actual   {actual[:200]}")
+
+
+def parser_layouts():
+    """Every FixedWidthLayout defined at module level by the registered parsers, by qualified name"""
+    layouts = {}
+    for report_number in REPORT_NUMBERS:
+        module = importlib.import_module(f"report_parsers.rpt{report_number}")
+        for name, value in vars(module).items():
+            if isinstance(value, FixedWidthLayout):
+                layouts[f"{module.__name__}.{name}"] = value
+    return layouts
+
+
+def reference_row(layout, line):
+    """Apply a layout by slicing every field and calling its converter, what extract does without the float()/int() first attempt"""
+    if len(line) < layout.width:
+        line = line.ljust(layout.width)
+    return {field.name: field.convert(line[field.start:field.end]) for field in layout.fields}
+
+
+def layout_batches(fixtures):
+    """
+    Record the lines every layout is applied to while the fixtures are parsed
+
+    Args:
+        fixtures (list): (name, report_number, text) triples
+
+    Returns:
+        tuple: (layouts by name, layout name -> list of (batch name, lines)); a batch
+        per extract_many or extract_columns call, one per fixture for the lines
+        handed to extract one at a time, all of those merged, and every fixture line
+    """
+    layouts = parser_layouts()
+    batches = {name: [] for name in layouts}
+    singles = {}
+    current = {}
+
+    def record_each(name, extract):
+        def record(line):
+            singles.setdefault((name, current['fixture']), []).append(line)
+            return extract(line)
+        return record
+
+    def record_batch(name, method):
+        def record(lines, *args, **kwargs):
+            batches[name].append((f"{current['fixture']} {method.__name__}", list(lines)))
+            return method(lines, *args, **kwargs)
+        return record
+
+    for name, layout in layouts.items():
+        # Instance attributes shadow the extract, extract_many and extract_columns methods
+        layout.extract = record_each(name, layout.extract)
+        layout.extract_many = record_batch(name, layout.extract_many)
+        layout.extract_columns = record_batch(name, layout.extract_columns)
+    try:
+        for fixture, report_number, text in fixtures:
+            current['fixture'] = fixture
+            getattr(report_parser, f"parse_RPT{report_number}")(text)
+    finally:
+        for layout in layouts.values():
+            del layout.extract, layout.extract_many, layout.extract_columns
+
+    for (name, fixture), lines in singles.items():
+        batches[name].append((f"{fixture} extract", lines))
+    all_lines = [line for _, _, text in fixtures for line in text.split('\n')]
+    for name in layouts:
+        # Merged batches reach the NumPy engine's minimum size even for layouts applied to a few lines per report
+        batches[name].append(("all batches", [line for _, lines in batches[name] for line in lines]))
+        batches[name].append(("all fixture lines", all_lines))
+    return layouts, batches
+
+
+def blank_cells(layout, lines, rng, share=0.1):
+    """Blank a share of the cells of a batch, field by field, so numeric columns hold nulls"""
+    blanked = []
+    for line in lines:
+        line = line.ljust(layout.width)
+        for field in layout.fields:
+            if field.end is not None and rng.random() < share:
+                line = line[:field.start] + ' ' * (field.end - field.start) + line[field.end:]
+        blanked.append(line)
+    return blanked
+
+
+def check_layouts(checker, fixtures, vectorized):
+    """Compare the layouts and the NumPy engine with reference_row on the lines the parsers apply them to"""
+    layouts, batches = layout_batches(fixtures)
+    rng = random.Random(0)
+    for name, layout in layouts.items():
+        batches[name].extend([(f"{batch} blanked cells", blank_cells(layout, lines, rng))
+                              for batch, lines in batches[name]])
+        for batch, lines in batches[name]:
+            expected_rows = [reference_row(layout, line) for line in lines]
+            expected = as_json(expected_rows)
+            expected_columns = as_json({field: [row[field] for row in expected_rows] for field in layout.names})
+            what = f"{name} {batch} ({len(lines)} lines)"
+            checker.same(f"{what} extract", expected, as_json([layout.extract(line) for line in lines]))
+            checker.same(f"{what} extract_many", expected, outcome(layout.extract_many, lines))
+            checker.same(f"{what} extract_columns", expected_columns, outcome(layout.extract_columns, lines))
+            if vectorized:
+                checker.same(f"{what} extract_many vectorized", expected,
+                             outcome(layout.extract_many, lines, vectorized=True))
+                checker.same(f"{what} extract_columns vectorized", expected_columns,
+                             outcome(layout.extract_columns, lines, vectorized=True))
+
+
+def report_inputs(text, file_path):
+    """
+    The forms a report can be handed to a reader in, each built fresh when called
+
+    Args:
+        text (str): Report text
+        file_path (str): The same report written as an uncompressed file
+
+    Returns:
+        dict: Name -> callable(use) calling use with the report in that form
+    """
+    encoded = text.encode('utf-8')
+
+    def mapped(use):
+        with map_report(file_path) as buffer:
+            return use(buffer)
+
+    return {
+        'bytes': lambda use: use(encoded),
+        'memoryview': lambda use: use(memoryview(encoded)),
+        'buffer': lambda use: use(ReportBuffer(bytearray(encoded))),
+        'mmap': mapped,
+        'text stream': lambda use: use(io.StringIO(text, newline='')),
+        'binary stream': lambda use: use(io.BytesIO(encoded)),
+    }
+
+
+def page_texts(pages):
+    return [(page.index, page.text) for page in pages]
+
+
+def indexed_pages(data):
+    """Every page of a PageIndex, fetched from the last to the first by negative index"""
+    index = PageIndex(data)
+    return [(page.index, page.text) for page in reversed([index[-n] for n in range(1, len(index) + 1)])]
+
+
+def check_pages(checker, fixtures, directory):
+    """Compare the page and line readers on every input form with str.split on the report text"""
+    for name, _, text in fixtures:
+        file_path = os.path.join(directory, 'pages.PF')
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        pages = text.split('\f')
+        expected_pages = as_json(list(enumerate(pages)))
+        expected_lines = as_json(text.split('\n'))
+        last = pages[-3:]
+        expected_last = as_json([(index - len(last), page) for index, page in enumerate(last)])
+
+        checker.same(f"{name} read_pages str", expected_pages, as_json(page_texts(read_pages(text))))
+        checker.same(f"{name} read_lines str", expected_lines, as_json(list(read_lines(text))))
+        checker.same(f"{name} read_last_pages str", expected_last, as_json(page_texts(read_last_pages(text, 3))))
+        checker.same(f"{name} PageIndex str", expected_pages, outcome(indexed_pages, text))
+        for form, use in report_inputs(text, file_path).items():
+            checker.same(f"{name} read_pages {form}", expected_pages,
+                         use(lambda data: as_json(page_texts(read_pages(data)))))
+            checker.same(f"{name} read_lines {form}", expected_lines,
+                         use(lambda data: as_json(list(read_lines(data)))))
+            checker.same(f"{name} read_last_pages {form}", expected_last,
+                         use(lambda data: as_json(page_texts(read_last_pages(data, 3)))))
+            # A page index needs the whole report, an open file is refused
+            checker.same(f"{name} PageIndex {form}", "raised TypeError" if 'stream' in form else expected_pages,
+                         use(lambda data: outcome(indexed_pages, data)))
+        for chunk_size in SPLIT_CHUNK_SIZES:
+            checker.same(f"{name} split_text chunk {chunk_size}", expected_pages,
+                         as_json(list(enumerate(split_text(text, '\f', chunk_size)))))
+            for stream in (io.StringIO(text, newline=''), io.BytesIO(text.encode('utf-8'))):
+                checker.same(f"{name} split_stream {type(stream).__name__} chunk {chunk_size}", expected_pages,
+                             as_json(list(enumerate(split_stream(stream, '\f', chunk_size)))))
+
+
+def check_parsers(checker, fixtures, directory, vectorized):
+    """Compare every parser input form and mode with parsing the report text"""
+    for name, report_number, text in fixtures:
+        parse = getattr(report_parser, f"parse_RPT{report_number}")
+        file_path = os.path.join(directory, f"RPT{report_number}_20140514181224.PF")
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        with gzip.open(file_path + '.z', 'wt', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+        expected = outcome(parse, text)
+        for form, use in report_inputs(text, file_path).items():
+            checker.same(f"{name} {form}", expected, use(lambda data: outcome(parse, data)))
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            checker.same(f"{name} open file", expected, outcome(parse, f))
+        checker.same(f"{name} parse_file .PF", expected,
+                     outcome(report_parser.ReportParser().parse_file, report_number, file_path))
+        checker.same(f"{name} parse_file .PF.z", expected,
+                     outcome(report_parser.ReportParser().parse_file, report_number, file_path + '.z'))
+
+        _, options = report_parser.ReportParser.parser_for(report_number)
+        if vectorized and 'vectorized' in options:
+            checker.same(f"{name} vectorized", expected, outcome(parse, text, vectorized=True))
+        if 'columnar' in options:
+            checker.same(f"{name} columnar", expected, outcome(parse, text, columnar=True))
+            if vectorized:
+                checker.same(f"{name} columnar vectorized", expected,
+                             outcome(parse, text, columnar=True, vectorized=True))
+        if 'summary_only' in options and not expected.startswith('raised'):
+            full = json.loads(expected)
+            checker.same(f"{name} summary_only",
+                         as_json({'metadata': full['metadata'], 'summary': full['summary']}),
+                         outcome(parse, text, summary_only=True))
+
+
+def output_contents(output_format, path):
+    """The contents of a run.py output file, a SQLite database as its SQL dump"""
+    if output_format == 'sqlite':
+        connection = sqlite3.connect(path)
+        try:
+            return '\n'.join(connection.iterdump())
+        finally:
+            connection.close()
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def check_ingest(checker, directory, transactions):
+    """Compare run.py --pipeline with a plain run.py for every format in INGEST_FORMATS"""
+    reports_dir = os.path.join(directory, 'reports')
+    generate_archive(reports_dir, days=3, employees=30, transactions=transactions)
+    for output_format in INGEST_FORMATS:
+        outputs = {}
+        for mode, options in (('serial', []), ('pipeline', ['--pipeline']),
+                              ('pipeline 2 workers', ['--pipeline', '--workers', '2'])):
+            output = os.path.join(directory, f"{mode.replace(' ', '_')}.{output_format}")
+            completed = subprocess.run(
+                [sys.executable, os.path.join(REPO_DIR, 'run.py'), '--reports-dir', reports_dir,
+                 '--format', output_format, '--output', output] + options,
+                cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            if completed.returncode:
+                outputs[mode] = f"exit status {completed.returncode}: {completed.stderr.strip()[-300:]}"
+            else:
+                outputs[mode] = output_contents(output_format, output)
+        for mode in ('pipeline', 'pipeline 2 workers'):
+            checker.same(f"run.py --format {output_format} {mode}", outputs['serial'], outputs[mode])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the parsing engines against the reference parser")
+    arg_parser.add_argument("--seeds", type=int, default=4,
+                            help="seeds, each with its own page length (default: 4)")
+    arg_parser.add_argument("--transactions", type=int, default=600,
+                            help="transaction lines of every RPT002 (default: 600)")
+    args = arg_parser.parse_args()
+
+    vectorized = report_numpy.available()
+    if not vectorized:
+        print("NumPy is not installed, the vectorized engine is not checked")
+    fixtures = generate_fixtures(args.seeds, args.transactions)
+    checker = Checker()
+    with tempfile.TemporaryDirectory() as directory:
+        check_layouts(checker, fixtures, vectorized)
+        check_pages(checker, fixtures, directory)
+        check_parsers(checker, fixtures, directory, vectorized)
+        check_ingest(checker, directory, args.transactions)
+
+    print(f"{checker.checks} comparisons on {len(fixtures)} reports and a {len(INGEST_FORMATS)}-format ingest: "
+          f"{checker.mismatches} mismatches")
+    if checker.mismatches:
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
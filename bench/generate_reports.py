@@ -0,0 +1,458 @@
+"""
+Synthetic TAMS report generator
+
+Emits fixed-width RPT001, RPT002, RPT003, RPT004 and RPT083 text laid out on
+the same column positions the parsers in report_parser.py hard-code, so the
+output can be used to measure parser throughput without real store data.
+
+Usage:
+    python bench/generate_reports.py OUTPUT_DIR [--days N] [--employees N]
+                                     [--transactions N] [--lines-per-page N]
+                                     [--store-id ID] [--uncompressed]
+"""
+import argparse
+import datetime
+import gzip
+import os
+import random
+
+STORE_ID = "900002424"
+STORE_NAME = "NAPA AUTO PARTS FORTUNA"
+PAGE_WIDTH = 131
+LINES_PER_PAGE = 60
+
+TRANSACTION_TYPES = ['CASH', 'CHG', 'CR MEM', 'ROA', 'REFUND']
+
+
+def header_lines(report_datetime, title, report_number, page, store_id=STORE_ID,
+                 store_name=STORE_NAME, accounting_day=5):
+    """
+    Build the two header lines every TAMS report page starts with
+
+    Args:
+        report_datetime (datetime.datetime): Time the report was printed
+        title (str): Spaced-out report title, e.g. 'S A L E S   J O U R N A L'
+        report_number (str): Report number without prefix, e.g. '004'
+        page (int): Page number
+
+    Returns:
+        list: The date/title line and the store/accounting day line
+    """
+    stamp = report_datetime.strftime("%m/%d/%Y %I:%M %p")
+    tag = f"(RPT{report_number})"
+    first = f"{stamp:<45}{title}"
+    first = first + " " * max(1, PAGE_WIDTH - len(first) - len(tag)) + tag
+    store = f"{store_id} - {store_name}"
+    second = f"{store:<57}Accounting Day - {accounting_day}"
+    second = second + " " * max(1, PAGE_WIDTH - len(second) - 7) + f"Page {page}"
+    return [first, second]
+
+
+def _money(rng, low, high):
+    return round(rng.uniform(low, high), 2)
+
+
+def _sentinel_or(rng, value, width, sentinel='!!!!!!'):
+    """Occasionally replace a value with a TAMS overflow sentinel"""
+    if rng.random() < 0.02:
+        return f"{sentinel:>{width}}"
+    return f"{value:>{width}.2f}"
+
+
+def generate_rpt001(report_datetime, employees=20, salesreps=5, seed=0,
+                    lines_per_page=LINES_PER_PAGE, **store):
+    """
+    Generate an Employee Sales Report (RPT001)
+
+    Args:
+        report_datetime (datetime.datetime): Time the report was printed
+        employees (int): Number of employee rows
+        salesreps (int): Number of salesrep rows
+        seed (int): Random seed
+        lines_per_page (int): Page length, more rows than fit spill onto extra pages
+
+    Returns:
+        str: Report text, pages separated by form feeds
+    """
+    rng = random.Random(seed)
+    title = "E M P L O Y E E   S A L E S   R E P O R T"
+    sales_header = [
+        "       ------------Today---------- -----------------MTD----------------- -------------YTD------------- ----------Last Dec-----------",
+        "          Net      Gross              Net       Gross                       Net       Gross               Net       Gross           ",
+        " Emp     Sales    Profit     GP%     Sales      Profit     GP%    % Chg    Sales      Profit     GP%     Sales      Profit     GP%  ",
+        "------ --------- --------- ------- ---------- ---------- ------- ------- ---------- ---------- ------- ---------- ---------- -------",
+    ]
+    invoice_header = [
+        "       ----------Today----------- ------------MTD------------- ---------------YTD--------------- -----------Last Dec-----------",
+        "                          Returns                       Returns                           Returns                         Returns",
+        " Emp    Inv Lines Vd Ret  Value    Inv  Lines  Vd Ret    Value     Inv   Lines   Vd  Ret    Value    Inv  Lines  Vd Ret    Value",
+        "------ ---- ----- -- --- ------- ----- ------ --- --- -------- ------- ------- ---- ---- -------- ----- ------ --- --- --------",
+    ]
+    separator = sales_header[3]
+
+    def sales_row(label):
+        values = [_money(rng, -500, 5000), _money(rng, -100, 1500), _money(rng, 0, 60),
+                  _money(rng, 0, 50000), _money(rng, 0, 15000), _money(rng, 0, 60),
+                  _money(rng, -100, 100), _money(rng, 0, 900000), _money(rng, 0, 300000),
+                  _money(rng, 0, 60), _money(rng, 0, 90000), _money(rng, 0, 30000),
+                  _money(rng, 0, 60)]
+        widths = [9, 9, 7, 10, 10, 7, 7, 10, 10, 7, 10, 10, 7]
+        cells = [_sentinel_or(rng, v, w) for v, w in zip(values, widths)]
+        return f"{label:<6} " + " ".join(cells)
+
+    def invoice_row(label):
+        cells = []
+        for width in (4, 5, 2, 3):
+            cells.append(f"{rng.randint(0, 10 ** (width - 1) - 1):>{width}}")
+        cells.append(f"{_money(rng, 0, 9999):>7.2f}")
+        for width in (5, 6, 3, 3):
+            cells.append(f"{rng.randint(0, 10 ** (width - 1) - 1):>{width}}")
+        cells.append(f"{_money(rng, 0, 99999):>8.2f}")
+        for width in (7, 7, 4, 4):
+            cells.append(f"{rng.randint(0, 10 ** (width - 1) - 1):>{width}}")
+        cells.append(f"{_money(rng, 0, 99999):>8.2f}")
+        for width in (5, 6, 3, 3):
+            cells.append(f"{rng.randint(0, 10 ** (width - 1) - 1):>{width}}")
+        cells.append(f"{_money(rng, 0, 99999):>8.2f}")
+        return f"{label:<6} " + " ".join(cells)
+
+    def section_pages(column_header, row):
+        sections = [("*Employee", [row(f"  {emp_id}") for emp_id in range(1, employees + 1)]),
+                    ("*Salesrep", [row(f"  {rep_id}") for rep_id in range(salesreps)])]
+        per_page = max(1, lines_per_page - 10)
+        pages = []
+        for marker, rows in sections:
+            chunks = [rows[i:i + per_page] for i in range(0, len(rows), per_page)] or [[]]
+            for chunk in chunks:
+                pages.append([""] + column_header + [marker] + chunk)
+            pages[-1] += [separator, row("Total"), ""]
+        return pages
+
+    pages = section_pages(sales_header, sales_row)
+    pages[-1] += [
+        "Memo of Delivery Sales",
+        "",
+        "       ------------Today---------- -----------------MTD-----------------",
+        "          Net      Gross              Net       Gross",
+        "         Sales    Profit     GP%     Sales      Profit     GP%",
+        "       --------- --------- ------- ---------- ---------- -------",
+        "       " + " ".join(f"{v:>9.2f}" for v in (_money(rng, 0, 2000), _money(rng, 0, 500),
+                                                   _money(rng, 0, 60), _money(rng, 0, 9000),
+                                                   _money(rng, 0, 2000), _money(rng, 0, 60))),
+    ]
+    pages += section_pages(invoice_header, invoice_row)
+    pages[-1] += ["", "***** End of Report *****"]
+    return _join_pages(report_datetime, title, "001", pages, store)
+
+
+def _transaction_line(rng, index):
+    transaction_type = rng.choice(TRANSACTION_TYPES)
+    total = _money(rng, 1, 2500)
+    net = round(total / 1.0725, 2)
+    cost = round(net * rng.uniform(0.4, 0.8), 2)
+    profit = round(net - cost, 2)
+    percent = round(profit / net * 100, 2) if net else 0.0
+    if transaction_type in ('CR MEM', 'REFUND') and rng.random() < 0.5:
+        total, net, cost, profit = -total, -net, -cost, -profit
+    purchase_order = rng.choice(["", "", f"PO{rng.randint(1000, 99999)}", "WALK IN"])
+    codes = rng.choice(["", "", "T", "D", "T D"])
+    line = (f"{transaction_type:<8}{100000 + index:<7}{rng.randint(1, 99999):<9}"
+            f"{rng.randint(1, 99):<7}{rng.randint(0, 9):<8}{rng.randint(1, 99):<8}"
+            f"{purchase_order:<28}{total:>12.2f}{net:>10.2f}{cost:>10.2f}"
+            f"{profit:>10.2f}{percent:>8.2f}")
+    if codes:
+        line += f" {codes}"
+    return line
+
+
+def generate_rpt002(report_datetime, transactions=500, seed=0, lines_per_page=LINES_PER_PAGE,
+                    **store):
+    """
+    Generate a Transaction Register (RPT002) with its trailing memo page
+
+    Args:
+        report_datetime (datetime.datetime): Time the report was printed
+        transactions (int): Number of transaction lines
+        seed (int): Random seed
+        lines_per_page (int): Page length, more lines than fit spill onto extra pages
+
+    Returns:
+        str: Report text, pages separated by form feeds
+    """
+    rng = random.Random(seed)
+    title = "T R A N S A C T I O N   R E G I S T E R"
+    column_header = [
+        "",
+        "                                                                    Transaction       Net                 Gross    Gross",
+        "Type    Inv #  Customer Emp    Salesrep Cashier PO                        Total      Sales      Cost     Profit     GP%  Codes",
+        "------- ------ -------- ------ -------- ------- --------------------------- ----------- --------- --------- --------- ------- -----",
+    ]
+    per_page = max(1, lines_per_page - 6)
+    rows = [_transaction_line(rng, index) for index in range(transactions)]
+    pages = [column_header + rows[i:i + per_page] for i in range(0, len(rows), per_page)]
+    memo = [
+        "",
+        "-" * 60 + "-----MEMO-----" + "-" * 57,
+        "",
+        f"{'Cash Sales':<30}{_money(rng, 0, 90000):>15.2f}   {'Core Rebate':<22}{_money(rng, 0, 900):>12.2f}   T = Taxable",
+        f"{'Charge Sales':<30}{_money(rng, 0, 90000):>15.2f}   {'Mfg Rebate Credit':<22}{_money(rng, 0, 900):>12.2f}   D = Delivery",
+        f"{'Total Sales':<30}{_money(rng, 0, 90000):>15.2f}   {'Rebates':<22}{_money(rng, 0, 900):>12.2f}   V = Voided",
+        "",
+        f"{'# of Cash Transactions':<30}{rng.randint(0, 999):>15}",
+        f"{'# of Charge Transactions':<30}{rng.randint(0, 999):>15}",
+        f"{'Total Transaction Count':<30}{rng.randint(0, 1999):>15}",
+        "",
+        "***** End of Report *****",
+    ]
+    pages.append(memo)
+    return _join_pages(report_datetime, title, "002", pages, store) + "\f"
+
+
+def generate_rpt003(report_datetime, seed=0, **store):
+    """
+    Generate a Transaction Activity by Quarter Hour report (RPT003)
+
+    Args:
+        report_datetime (datetime.datetime): Time the report was printed
+        seed (int): Random seed
+
+    Returns:
+        str: Report text
+    """
+    rng = random.Random(seed)
+    title = "TRANSACTION ACTIVITY BY QUARTER HOUR"
+    lines = [
+        "",
+        "          ------------------------Today------------------------ ----------------------Month to Date-----------------------",
+        "            Cash    Charge    %   # of     # of       %           Cash    Charge    %   # of     # of       %",
+        "  Time     Sales     Sales  Sales  Inv    Lines      Lines       Sales     Sales  Sales  Inv    Lines      Lines",
+        "--------- --------- --------- ------ ------ --------- ------------ --------- --------- ------ ------ --------- --------",
+    ]
+    start = datetime.datetime(2000, 1, 1, 7, 0)
+    for quarter in range(4 * 12):
+        slot = (start + datetime.timedelta(minutes=15 * quarter)).strftime("%I:%M %p").lstrip("0")
+        lines.append(
+            f"{slot:>8}  {_money(rng, 0, 9999):>10.2f}{_money(rng, 0, 9999):>10.2f}"
+            f"{_money(rng, 0, 9):>7.2f}{rng.randint(0, 99):>7}{rng.randint(0, 999):>10}"
+            f"{_money(rng, 0, 9):>13.2f}{_money(rng, 0, 99999):>10.2f}{_money(rng, 0, 99999):>10.2f}"
+            f"{_money(rng, 0, 9):>7.2f}{rng.randint(0, 999):>7}{rng.randint(0, 9999):>10}"
+            f"{_money(rng, 0, 9):>9.2f}")
+    lines += [
+        "--------- --------- --------- ------ ------ --------- ------------ --------- --------- ------ ------ --------- --------",
+        f"{'Total':<10}{_money(rng, 0, 99999):>10.2f}{_money(rng, 0, 99999):>10.2f}       "
+        f"{rng.randint(0, 999):>7}{rng.randint(0, 9999):>10}             "
+        f"{_money(rng, 0, 999999):>10.2f}{_money(rng, 0, 999999):>10.2f}        "
+        f"{rng.randint(0, 9999):>7}{rng.randint(0, 99999):>10}",
+        "",
+        "***** End of Report *****",
+    ]
+    return _join_pages(report_datetime, title, "003", [lines], store)
+
+
+SALES_JOURNAL_CATEGORIES = [
+    ("Merchandise Sales", ["Cost", "Rebates", "Total Cost", "Profit", "Profit Percent"]),
+    ("Labor Sales", ["Cost", "Profit"]),
+    ("Net Sales", ["Cost", "Profit", "Profit Percent"]),
+    ("Miscellaneous", ["Freight", "Environmental Fee", "Service Charge"]),
+    ("Sales Tax", ["Tax Rate 1", "Tax Rate 2"]),
+    ("Gross Sales", ["Cash", "Charge", "Taxable", "Non-Taxable", "Core Sales", "Core Returns"]),
+]
+
+
+def generate_rpt004(report_datetime, seed=0, **store):
+    """
+    Generate a Sales Journal report (RPT004)
+
+    Args:
+        report_datetime (datetime.datetime): Time the report was printed
+        seed (int): Random seed
+
+    Returns:
+        str: Report text
+    """
+    rng = random.Random(seed)
+    title = "S A L E S   J O U R N A L"
+    lines = [
+        "",
+        "                                 -------------Today------------ -------------MTD--------------- ----------------YTD-----------------",
+        "                                     Today  Last Year  % Chg      MTD     Last Year  % Chg        YTD     Last Year     % Chg",
+        "-------------------------------- ---------- ---------- ------- ---------- ---------- ------- ----------- ----------- --------",
+    ]
+
+    def values():
+        cells = [(33, 11, _money(rng, 0, 99999)), (44, 11, _money(rng, 0, 99999)),
+                 (56, 7, _money(rng, -99, 99)), (64, 10, _money(rng, 0, 999999)),
+                 (75, 11, _money(rng, 0, 999999)), (87, 7, _money(rng, -99, 99)),
+                 (95, 12, _money(rng, 0, 9999999)), (107, 12, _money(rng, 0, 9999999)),
+                 (120, 8, _money(rng, -99, 99))]
+        row = ""
+        for start, width, value in cells:
+            text = f"{value:,.2f}" if width >= 10 else f"{value:.2f}"
+            if rng.random() < 0.02:
+                text = rng.choice(["******", "!!!!!!", "-"])
+            row = row.ljust(start) + f"{text:>{width - 1}} "
+        return row.rstrip()
+
+    for category, subcategories in SALES_JOURNAL_CATEGORIES:
+        lines.append(f"  {category:<31}"[:33] + values()[33:])
+        for subcategory in subcategories:
+            lines.append(f"    {subcategory:<29}"[:33] + values()[33:])
+        lines.append("")
+    lines += [
+        "                                ----------- Memo -------------",
+        f"  {'Tax Exempt Sales':<31}"[:33] + values()[33:],
+        "",
+        "***** End of Report *****",
+    ]
+    return _join_pages(report_datetime, title, "004", [lines], store)
+
+
+def generate_rpt083(report_datetime, seed=0, **store):
+    """
+    Generate an Inventory Effectiveness report (RPT083)
+
+    Args:
+        report_datetime (datetime.datetime): Time the report was printed
+        seed (int): Random seed
+
+    Returns:
+        str: Report text
+    """
+    rng = random.Random(seed)
+    title = "I N V E N T O R Y   E F F E C T I V E N E S S"
+
+    def row(label, low, high):
+        return (f"{label:<56}{rng.randint(low, high):>9,} {rng.randint(low, high * 20):>12,} "
+                f"{rng.randint(low, high * 250):>12,} {rng.randint(low, high * 250):>13,}")
+
+    lines = [
+        "",
+        "                                                          Today        MTD          YTD         Last Year",
+        "  Merchandise Inventory                                  Today        MTD          YTD         Last Year",
+        "-------------------------------------------------------- --------- ------------ ------------ -------------",
+        row("  Instore Items", 0, 900),
+        row("  Non-Instore Items", 0, 90),
+        row("  Merchandise Total", 0, 990),
+        "",
+        row("  Lost Sales", 0, 50),
+        row("  Total Merchandise & Lost", 0, 1040),
+        "",
+        "  An item is considered Instore when it is on hand at the time of sale.",
+        "  The initial sale quantity is used.  Any other part is considered non-instore.",
+        "",
+        (f"{'  * * Rating * *':<56}{_money(rng, 50, 100):>8.2f}% {_money(rng, 50, 100):>11.2f}% "
+         f"{_money(rng, 50, 100):>11.2f}% {_money(rng, 50, 100):>12.2f}%"),
+        "",
+        "***** End of Report *****",
+    ]
+    return _join_pages(report_datetime, title, "083", [lines], store)
+
+
+def _join_pages(report_datetime, title, report_number, pages, store):
+    texts = []
+    for page_number, body in enumerate(pages, start=1):
+        lines = header_lines(report_datetime, title, report_number, page_number, **store) + body
+        texts.append("\n".join(lines) + "\n")
+    return "\f".join(texts)
+
+
+GENERATORS = {
+    "001": generate_rpt001,
+    "002": generate_rpt002,
+    "003": generate_rpt003,
+    "004": generate_rpt004,
+    "083": generate_rpt083,
+}
+
+
+def generate_report(report_number, report_datetime, employees=20, transactions=500, seed=0,
+                    lines_per_page=LINES_PER_PAGE, **store):
+    """
+    Generate the text of one report by number
+
+    Args:
+        report_number (str): '001', '002', '003', '004' or '083'
+        report_datetime (datetime.datetime): Time the report was printed
+        employees (int): Employee rows for RPT001
+        transactions (int): Transaction lines for RPT002
+        seed (int): Random seed
+        lines_per_page (int): Page length of RPT001 and RPT002
+
+    Returns:
+        str: Report text
+    """
+    if report_number == "001":
+        return generate_rpt001(report_datetime, employees=employees, seed=seed,
+                               lines_per_page=lines_per_page, **store)
+    if report_number == "002":
+        return generate_rpt002(report_datetime, transactions=transactions, seed=seed,
+                               lines_per_page=lines_per_page, **store)
+    return GENERATORS[report_number](report_datetime, seed=seed, **store)
+
+
+def generate_archive(output_dir, days=7, employees=20, transactions=500, start=None,
+                     compress=True, store_id=STORE_ID, store_name=STORE_NAME, seed=0,
+                     lines_per_page=LINES_PER_PAGE):
+    """
+    Write a reports/<date>/RPTxxx_<timestamp>.PF[.z] tree like the one TAMS produces
+
+    Args:
+        output_dir (str): Root directory to create date directories in
+        days (int): Number of consecutive days
+        employees (int): Employee rows per RPT001
+        transactions (int): Transaction lines per RPT002
+        start (datetime.date): First day, defaults to 2014-05-12
+        compress (bool): Write gzip-compressed .PF.z files instead of .PF
+        lines_per_page (int): Page length of RPT001 and RPT002
+
+    Returns:
+        list: Paths of the files written
+    """
+    start = start or datetime.date(2014, 5, 12)
+    written = []
+    for day in range(days):
+        date = start + datetime.timedelta(days=day)
+        date_dir = os.path.join(output_dir, date.strftime("%Y%m%d"))
+        os.makedirs(date_dir, exist_ok=True)
+        printed = datetime.datetime.combine(date, datetime.time(18, 12, 24))
+        for offset, report_number in enumerate(GENERATORS):
+            report_datetime = printed + datetime.timedelta(seconds=offset)
+            text = generate_report(report_number, report_datetime, employees=employees,
+                                   transactions=transactions, seed=seed * 100003 + day * 101 + offset,
+                                   lines_per_page=lines_per_page, store_id=store_id,
+                                   store_name=store_name)
+            name = f"RPT{report_number}_{report_datetime.strftime('%Y%m%d%H%M%S')}.PF"
+            path = os.path.join(date_dir, name + (".z" if compress else ""))
+            payload = text.encode("utf-8")
+            if compress:
+                with gzip.open(path, "wb") as f:
+                    f.write(payload)
+            else:
+                with open(path, "wb") as f:
+                    f.write(payload)
+            written.append(path)
+    return written
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generate synthetic TAMS report archives")
+    arg_parser.add_argument("output_dir")
+    arg_parser.add_argument("--days", type=int, default=7)
+    arg_parser.add_argument("--employees", type=int, default=20)
+    arg_parser.add_argument("--transactions", type=int, default=500)
+    arg_parser.add_argument("--store-id", default=STORE_ID)
+    arg_parser.add_argument("--lines-per-page", type=int, default=LINES_PER_PAGE)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--uncompressed", action="store_true",
+                            help="write .PF files instead of .PF.z")
+    args = arg_parser.parse_args()
+
+    written = generate_archive(args.output_dir, days=args.days, employees=args.employees,
+                               transactions=args.transactions, compress=not args.uncompressed,
+                               store_id=args.store_id, seed=args.seed,
+                               lines_per_page=args.lines_per_page)
+    print(f"Wrote {len(written)} reports to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
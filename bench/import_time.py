@@ -0,0 +1,91 @@
+"""
+Import-time budget for short-lived processes using the TAMS report parsers
+
+Cron jobs and pool workers often parse a single report type and exit, so
+the time spent importing the parsers is paid on every run. Each scenario is
+timed in a fresh interpreter; the time of a bare interpreter start is
+subtracted and the best of --repeat runs is reported, together with the
+report modules the scenario ended up importing.
+
+Usage:
+    python bench/import_time.py [--repeat N] [--budget-ms MS]
+
+Exits with status 1 when a scenario exceeds the budget.
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Scenario name -> code run in the fresh interpreter
+SCENARIOS = {
+    "import report_parser": "import report_parser",
+    "RPT001 parser": "import report_parser; report_parser.ReportParser.parser_for('001')",
+    "RPT002 parser": "import report_parser; report_parser.ReportParser.parser_for('002')",
+    "RPT003 parser": "import report_parser; report_parser.ReportParser.parser_for('003')",
+    "RPT004 parser": "import report_parser; report_parser.ReportParser.parser_for('004')",
+    "RPT083 parser": "import report_parser; report_parser.ReportParser.parser_for('083')",
+    "every parser": ("import report_parser\n"
+                     "for number in report_parser.PARSER_MODULES:\n"
+                     "    report_parser.ReportParser.parser_for(number)"),
+    "import run": "import run",
+}
+
+# Printed by the child after the scenario, lists the repo modules it imported
+LIST_MODULES = "import sys; print(' '.join(sorted(m for m in sys.modules if m.startswith('report'))))"
+
+
+def time_code(code, repeat=10):
+    """
+    Time a snippet in fresh interpreters
+
+    Args:
+        code (str): Python source to run
+        repeat (int): Number of runs, the best one is reported
+
+    Returns:
+        tuple: (best seconds, stdout of the last run)
+    """
+    best = None
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, check=True,
+                                capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        output = result.stdout
+    return best, output
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure the import time of the report parsers")
+    arg_parser.add_argument("--repeat", type=int, default=10,
+                            help="fresh interpreter runs per scenario, the best is reported (default: 10)")
+    arg_parser.add_argument("--budget-ms", type=float, default=40.0,
+                            help="import time allowed per scenario beyond a bare interpreter (default: 40)")
+    args = arg_parser.parse_args()
+
+    baseline, _ = time_code("pass", args.repeat)
+    print(f"bare interpreter: {baseline * 1000:.1f} ms (subtracted below)")
+    print(f"{'scenario':<24}{'ms':>8}  modules")
+    over_budget = []
+    for name, code in SCENARIOS.items():
+        seconds, output = time_code(f"{code}\n{LIST_MODULES}", args.repeat)
+        milliseconds = max(seconds - baseline, 0.0) * 1000
+        if milliseconds > args.budget_ms:
+            over_budget.append(name)
+        print(f"{name:<24}{milliseconds:>8.1f}  {output.strip()}")
+
+    if over_budget:
+        print(f"over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print(f"every scenario within the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
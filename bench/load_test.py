@@ -0,0 +1,173 @@
+"""
+Load test for the HTTP parse service (serve.py)
+
+Starts serve.py on a free local port, unless --url points at a running
+service, then has --clients threads each POST --requests generated reports
+over one keep-alive connection. Half the uploads are gzip-compressed and
+every report type is sent both with its number in the URL and without, to be
+sniffed. Reports p50/p99 latency and requests per second, and exits with
+status 1 if any request failed.
+
+Usage:
+    python bench/load_test.py [--clients N] [--requests N] [--workers N]
+                              [--transactions N] [--url URL]
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import socket
+import argparse
+import datetime
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from generate_reports import generate_report  # noqa: E402
+
+REPORT_NUMBERS = ["001", "002", "003", "004", "083"]
+
+
+def build_requests(transactions):
+    """
+    Build the uploads cycled through by the clients
+
+    Args:
+        transactions (int): Transaction lines per RPT002
+
+    Returns:
+        list: (path, headers, body, expected report type) tuples
+    """
+    printed = datetime.datetime(2014, 5, 12, 18, 12, 24)
+    uploads = []
+    for report_number in REPORT_NUMBERS:
+        body = generate_report(report_number, printed, employees=50, transactions=transactions).encode("utf-8")
+        compressed = gzip.compress(body)
+        for path in (f"/parse/RPT{report_number}", "/parse"):
+            uploads.append((path, {}, body, f"RPT{report_number}"))
+            uploads.append((path, {"Content-Encoding": "gzip", "Accept-Encoding": "gzip"}, compressed,
+                            f"RPT{report_number}"))
+    return uploads
+
+
+def free_port():
+    """A local TCP port nothing listens on right now"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_service(workers, port):
+    """
+    Run serve.py in a subprocess and wait until it answers /health
+
+    Returns:
+        subprocess.Popen: The service process
+    """
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "serve.py"), "--port", str(port),
+                                "--workers", str(workers)], cwd=REPO_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("serve.py did not start")
+
+
+def run_client(host, port, uploads, offset, count):
+    """
+    Send count uploads over one keep-alive connection, starting at uploads[offset]
+
+    Returns:
+        tuple: (latencies in seconds of the successful requests, number of failures)
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    latencies = []
+    failures = 0
+    for index in range(offset, offset + count):
+        path, headers, body, report_type = uploads[index % len(uploads)]
+        start = time.perf_counter()
+        try:
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            failures += 1
+            connection.close()
+            continue
+        elapsed = time.perf_counter() - start
+        if response.getheader("Content-Encoding") == "gzip":
+            payload = gzip.decompress(payload)
+        if response.status != 200 or json.loads(payload)["report"] != report_type:
+            failures += 1
+            continue
+        latencies.append(elapsed)
+    connection.close()
+    return latencies, failures
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Load test the HTTP parse service")
+    arg_parser.add_argument("--clients", type=int, default=8,
+                            help="concurrent keep-alive connections (default: 8)")
+    arg_parser.add_argument("--requests", type=int, default=50,
+                            help="requests per client (default: 50)")
+    arg_parser.add_argument("--workers", type=int, default=2,
+                            help="serve.py --workers when the service is started here (default: 2)")
+    arg_parser.add_argument("--transactions", type=int, default=500,
+                            help="transaction lines per uploaded RPT002 (default: 500)")
+    arg_parser.add_argument("--url", default=None,
+                            help="base URL of a running service, e.g. http://127.0.0.1:8080 (default: start one)")
+    args = arg_parser.parse_args()
+
+    uploads = build_requests(args.transactions)
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        process = start_service(args.workers, port)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            results = list(executor.map(lambda client: run_client(host, port, uploads, client * args.requests,
+                                                                  args.requests),
+                                        range(args.clients)))
+        elapsed = time.perf_counter() - start
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    failures = sum(client_failures for _, client_failures in results)
+    print(f"{len(latencies) + failures} requests from {args.clients} clients in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:.1f} req/s, {failures} failed")
+    if latencies:
+        print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
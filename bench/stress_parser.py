@@ -0,0 +1,94 @@
+"""
+Concurrency stress test for a single shared ReportParser
+
+Generates one report of every supported type in a few sizes, parses each
+once serially for reference, then has a thread pool parse them all again
+many times through one ReportParser, with a parse cache and statistics
+enabled so the shared cache and the cumulative counters are exercised too.
+Every result returned, and the report_data each thread sees afterwards,
+must equal the reference, and the cumulative call count must match.
+
+Usage:
+    python bench/stress_parser.py [--threads N] [--rounds N] [--transactions N]
+
+Exits with status 1 on any mismatch.
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from report_cache import ParseCache  # noqa: E402
+from report_parser import ReportParser  # noqa: E402
+from generate_reports import generate_report  # noqa: E402
+
+REPORT_NUMBERS = ["001", "002", "003", "004", "083"]
+
+
+def generate_samples(transactions):
+    """
+    Build the reports parsed by the stress test
+
+    Args:
+        transactions (int): Transaction lines of the largest RPT002
+
+    Returns:
+        list: (report_number, text) pairs, three sizes of every report type
+    """
+    printed = datetime.datetime(2014, 5, 12, 18, 12, 24)
+    samples = []
+    for seed, scale in enumerate((1, 4, 20)):
+        for report_number in REPORT_NUMBERS:
+            samples.append((report_number, generate_report(
+                report_number, printed, employees=200 // scale, transactions=transactions // scale, seed=seed)))
+    return samples
+
+
+def parse_and_check(report_parser, report_number, text, expected):
+    """Parse in the calling thread and tell whether both the result and the report_data shim are right"""
+    result = report_parser.parse_report(report_number, text)
+    return result == expected and report_parser.report_data == expected
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parse reports concurrently through one ReportParser")
+    arg_parser.add_argument("--threads", type=int, default=16,
+                            help="threads sharing the parser (default: 16)")
+    arg_parser.add_argument("--rounds", type=int, default=20,
+                            help="times every sample is parsed concurrently (default: 20)")
+    arg_parser.add_argument("--transactions", type=int, default=4000,
+                            help="transaction lines of the largest RPT002 sample (default: 4000)")
+    args = arg_parser.parse_args()
+
+    samples = generate_samples(args.transactions)
+    expected = [ReportParser().parse_report(report_number, text) for report_number, text in samples]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        report_parser = ReportParser(cache=ParseCache(cache_dir), collect_stats=True)
+        calls = [index for _ in range(args.rounds) for index in range(len(samples))]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            results = list(executor.map(
+                lambda index: parse_and_check(report_parser, samples[index][0], samples[index][1], expected[index]),
+                calls))
+        elapsed = time.perf_counter() - start
+
+    failures = results.count(False)
+    counted = sum(stats['calls'] for stats in report_parser.get_stats().values())
+    print(f"{len(calls)} parses on {args.threads} threads in {elapsed:.2f}s: "
+          f"{failures} wrong results, {counted} calls counted")
+    if failures or counted != len(calls):
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
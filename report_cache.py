@@ -0,0 +1,143 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+
+from report_io import report_bytes
+from report_manifest import parser_version
+
+# Default size budget for the cache directory
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# A process re-measures the cache directory after writing max_bytes / RESCAN_FRACTION bytes to it, so entries
+# written by the other processes sharing it count against the budget too
+RESCAN_FRACTION = 16
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache of parse results
+
+    Entries are keyed by a hash of the report number, the parser version and
+    the UTF-8 report contents (the same key whether the report was handed
+    over as text or undecoded), so the same payload found under another name
+    (a .PF next to its .PF.z, a re-exported day, a restored backup) is only
+    parsed once. Results are stored as zlib-compressed compact JSON, and the
+    directory is kept under max_bytes by evicting the least recently used
+    entries. File mtimes carry the LRU order between runs and between the
+    processes sharing a directory. One cache can be shared by the threads of
+    a process, and a directory by several processes: each one re-measures the
+    directory after writing max_bytes / RESCAN_FRACTION bytes, so the
+    directory exceeds max_bytes by at most that much per process.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, version=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version or parser_version()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.written = 0
+        self.hits = 0
+        self.misses = 0
+        # Guards entries, total_bytes, written and the counters
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.scan()
+
+    def scan(self):
+        """Measure the entries of the cache directory in LRU order, by mtime; called with lock held"""
+        existing = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json.z'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    existing.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        self.entries = OrderedDict((name, size) for _, name, size in sorted(existing))
+        self.total_bytes = sum(self.entries.values())
+        self.written = 0
+
+    def key(self, report_number, raw_data):
+        """
+        Build the cache key for a report payload
+
+        Args:
+            report_number (str): Report number without prefix, e.g. '002'
+            raw_data (str or ReportBuffer): Report text or its undecoded contents
+
+        Returns:
+            str: Hex digest naming the cache entry
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{report_number}\0{self.version}\0".encode('utf-8'))
+        digest.update(report_bytes(raw_data))
+        return digest.hexdigest()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, key):
+        """
+        Look up the parse result for a report payload
+
+        Args:
+            key (str): Cache key of the payload, from key
+
+        Returns:
+            dict or None: The cached result, or None on a miss
+        """
+        name = f"{key}.json.z"
+        try:
+            with open(self._path(name), 'rb') as f:
+                data = json.loads(zlib.decompress(f.read()))
+            os.utime(self._path(name))
+        except (OSError, ValueError, zlib.error):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            if name in self.entries:
+                self.entries.move_to_end(name)
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Store the parse result for a report payload and evict old entries
+
+        Args:
+            key (str): Cache key of the payload, the one get was called with
+            data (dict): The parse result
+        """
+        name = f"{key}.json.z"
+        payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            self.total_bytes += len(payload) - self.entries.pop(name, 0)
+            self.entries[name] = len(payload)
+            self.written += len(payload)
+            if self.written >= self.max_bytes // RESCAN_FRACTION:
+                self.scan()
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes, called with lock held"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,189 @@
+import os
+import time
+import sqlite3
+
+# Stored as PRAGMA user_version, a catalog with another version is rebuilt from scratch
+CATALOG_VERSION = 1
+
+# Directories modified this recently are listed again on the next update, their mtime may still change
+# within the same timestamp tick
+RECENT_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    root_id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    root_id INTEGER NOT NULL,
+    dir TEXT NOT NULL,
+    mtime_ns INTEGER,
+    PRIMARY KEY (root_id, dir)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    root_id INTEGER NOT NULL,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    report_number TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    compression TEXT NOT NULL,
+    PRIMARY KEY (root_id, dir, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_by_report ON files (root_id, report_number, dir);
+"""
+
+# Columns of a file row, in the order files yields them
+FILE_COLUMNS = ('dir', 'name', 'report_number', 'timestamp', 'size', 'mtime_ns', 'compression')
+
+
+def report_record(entry):
+    """
+    Catalog row of a directory entry named like RPT001_20140514181224.PF[.z]
+
+    Args:
+        entry (os.DirEntry): Entry of a date directory
+
+    Returns:
+        tuple or None: (name, report_number, timestamp, size, mtime_ns, compression),
+        None for anything but an RPT file
+    """
+    name = entry.name
+    if not name.startswith('RPT') or '_' not in name or not (name.endswith('.PF') or name.endswith('.z')):
+        return None
+    stat = entry.stat()
+    return (name, name.split('_')[0][3:], name.split('_')[1].split('.')[0], stat.st_size, stat.st_mtime_ns,
+            'gzip' if name.endswith('.z') else 'none')
+
+
+class ReportCatalog:
+    """
+    Persistent SQLite index of the RPT files of one or more reports trees
+
+    Records every RPT file of every reports/<date>/ directory with its
+    report number, the timestamp embedded in its name, size, mtime and
+    compression, so finding the reports of a run is one indexed query
+    instead of a listing of the whole archive. update brings a tree up to
+    date incrementally: the root is listed again only when its mtime
+    changed, and a date directory only when its own mtime changed, which
+    happens whenever a file is created, renamed or removed in it. A file
+    rewritten in place keeps its old size and mtime in the catalog until its
+    directory changes.
+
+    Args:
+        path (str): Catalog database, created when missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.listed = 0
+        self.connection = sqlite3.connect(path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+            self.connection.executescript("DROP TABLE IF EXISTS roots; DROP TABLE IF EXISTS dirs; "
+                                          "DROP TABLE IF EXISTS files;")
+            self.connection.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+        self.connection.executescript(SCHEMA)
+
+    def trusted_mtime(self, stat):
+        """mtime of a directory to remember, None while it is too recent to be trusted"""
+        if time.time_ns() - stat.st_mtime_ns < RECENT_SECONDS * 1e9:
+            return None
+        return stat.st_mtime_ns
+
+    def update(self, reports_dir, keep_date=None):
+        """
+        List the directories of a reports tree that changed since the last update
+
+        Args:
+            reports_dir (str): Root directory holding one subdirectory per date
+            keep_date (callable): Optional date directory name -> bool; directories it
+                                  rejects are neither checked nor listed
+
+        Returns:
+            int: Number of directories listed, the root included
+        """
+        root = os.path.abspath(reports_dir)
+        connection = self.connection
+        listed = 0
+        with connection:
+            stat = os.stat(root)
+            connection.execute("INSERT OR IGNORE INTO roots (root) VALUES (?)", (root,))
+            root_id, root_mtime_ns = connection.execute(
+                "SELECT root_id, mtime_ns FROM roots WHERE root = ?", (root,)).fetchone()
+            dirs = dict(connection.execute("SELECT dir, mtime_ns FROM dirs WHERE root_id = ?", (root_id,)))
+            if root_mtime_ns is None or root_mtime_ns != stat.st_mtime_ns:
+                with os.scandir(root) as entries:
+                    names = {entry.name for entry in entries if entry.is_dir()}
+                for name in set(dirs) - names:
+                    connection.execute("DELETE FROM files WHERE root_id = ? AND dir = ?", (root_id, name))
+                    connection.execute("DELETE FROM dirs WHERE root_id = ? AND dir = ?", (root_id, name))
+                    del dirs[name]
+                for name in names - set(dirs):
+                    dirs[name] = None
+                connection.execute("UPDATE roots SET mtime_ns = ? WHERE root_id = ?",
+                                   (self.trusted_mtime(stat), root_id))
+                listed += 1
+
+            for name, mtime_ns in dirs.items():
+                if keep_date is not None and not keep_date(name):
+                    continue
+                dir_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(dir_path)
+                except FileNotFoundError:
+                    # Removed since the root was listed, dropped when the root is listed again
+                    connection.execute("DELETE FROM files WHERE root_id = ? AND dir = ?", (root_id, name))
+                    connection.execute("UPDATE dirs SET mtime_ns = NULL WHERE root_id = ? AND dir = ?",
+                                       (root_id, name))
+                    continue
+                if mtime_ns is not None and mtime_ns == stat.st_mtime_ns:
+                    continue
+                with os.scandir(dir_path) as entries:
+                    records = [record for record in map(report_record, entries) if record is not None]
+                connection.execute("DELETE FROM files WHERE root_id = ? AND dir = ?", (root_id, name))
+                connection.executemany(
+                    "INSERT INTO files (root_id, dir, name, report_number, timestamp, size, mtime_ns, compression) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", ((root_id, name) + record for record in records))
+                connection.execute("INSERT OR REPLACE INTO dirs (root_id, dir, mtime_ns) VALUES (?, ?, ?)",
+                                   (root_id, name, self.trusted_mtime(stat)))
+                listed += 1
+
+        self.listed += listed
+        return listed
+
+    def files(self, reports_dir, since=None, until=None, report_numbers=None, columns=FILE_COLUMNS):
+        """
+        Query the recorded RPT files of a reports tree
+
+        Args:
+            reports_dir (str): Root directory passed to update
+            since (str): Optional first date directory name
+            until (str): Optional last date directory name
+            report_numbers (iterable): Optional report numbers without prefix, e.g. ['083']
+            columns (tuple): Columns to return, a subset of FILE_COLUMNS
+
+        Returns:
+            list: Tuples of columns, sorted by directory then file name like run.find_report_files
+        """
+        unknown = set(columns) - set(FILE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown catalog columns: {', '.join(sorted(unknown))}")
+        query = (f"SELECT {', '.join(columns)} FROM files "
+                 f"WHERE root_id = (SELECT root_id FROM roots WHERE root = ?)")
+        values = [os.path.abspath(reports_dir)]
+        if since is not None:
+            query += " AND dir >= ?"
+            values.append(since)
+        if until is not None:
+            query += " AND dir <= ?"
+            values.append(until)
+        if report_numbers is not None:
+            report_numbers = sorted(report_numbers)
+            query += f" AND report_number IN ({', '.join('?' * len(report_numbers))})"
+            values.extend(report_numbers)
+        return self.connection.execute(query + " ORDER BY dir, name", values).fetchall()
+
+    def close(self):
+        self.connection.close()
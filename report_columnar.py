@@ -0,0 +1,251 @@
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+# Column order matches the keys of the dicts built by parse_transaction_line
+TRANSACTION_FIELDS = (
+    'transaction_type',
+    'inv_number',
+    'customer',
+    'employee',
+    'salesrep',
+    'cashier',
+    'purchase_order',
+    'transaction_total',
+    'net_sales',
+    'cost',
+    'gross_profit_amount',
+    'gross_profit_percent',
+    'codes',
+)
+
+# Stored as float64 arrays with a null mask
+NUMERIC_FIELDS = ('transaction_total', 'net_sales', 'cost', 'gross_profit_amount', 'gross_profit_percent')
+
+# Few distinct values, stored as integer codes into a shared value table
+CATEGORICAL_FIELDS = ('transaction_type', 'employee', 'salesrep', 'cashier', 'codes')
+
+# Mostly unique per transaction, stored as plain (interned) strings
+TEXT_FIELDS = ('inv_number', 'customer', 'purchase_order')
+
+
+class DictionaryColumn:
+    """
+    Dictionary-encoded string column
+
+    Each distinct value (None included) is stored once in values; rows hold
+    an index into it.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.lookup = {}
+        self.codes = array('H')
+
+    def code(self, value):
+        """Code of a value, adding it to values when it is new"""
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            if code > 0xFFFF and self.codes.typecode == 'H':
+                self.codes = array('I', self.codes)
+            self.lookup[value] = code
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.code(value))
+
+    def extend(self, values):
+        """
+        Append many values
+
+        Args:
+            values: Sequence of values, or a report_numpy.CategoryArray whose
+                    codes are remapped in one step
+        """
+        if hasattr(values, 'recode'):
+            table = [self.code(value) for value in values.values]
+            self.codes.frombytes(values.recode(table, self.codes.typecode))
+        else:
+            for value in values:
+                self.append(value)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class NumericColumn:
+    """Float64 column with a separate null mask, so None survives the round trip"""
+
+    def __init__(self):
+        self.data = array('d')
+        self.nulls = bytearray()
+
+    def append(self, value):
+        if value is None:
+            self.data.append(0.0)
+            self.nulls.append(1)
+        else:
+            self.data.append(value)
+            self.nulls.append(0)
+
+    def extend(self, values):
+        """
+        Append many values
+
+        Args:
+            values: Sequence of floats and None, or a report_numpy.NumericArray,
+                    whose typed array and null mask are copied over as raw bytes
+        """
+        if hasattr(values, 'nulls'):
+            self.data.frombytes(values.values.astype('float64').tobytes())
+            self.nulls.extend(values.nulls.astype('uint8').tobytes())
+        else:
+            for value in values:
+                self.append(value)
+
+    def __getitem__(self, index):
+        if self.nulls[index]:
+            return None
+        return self.data[index]
+
+    def __len__(self):
+        return len(self.data)
+
+
+class TransactionColumns(Sequence):
+    """
+    Columnar store for RPT002 transactions
+
+    Holds the same data as the list of 13-key dicts that parse_RPT002 returns
+    by default: numeric fields as typed float arrays, type/employee/salesrep/
+    cashier/codes dictionary-encoded, and the remaining strings interned.
+    Indexing returns a lazy TransactionRow view that behaves like the
+    original dict; to_dicts() materializes the old layout.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = NumericColumn()
+        for field in CATEGORICAL_FIELDS:
+            self.columns[field] = DictionaryColumn()
+        for field in TEXT_FIELDS:
+            self.columns[field] = []
+        self.length = 0
+
+    def append(self, transaction):
+        """
+        Add one transaction
+
+        Args:
+            transaction (dict): A transaction as returned by parse_transaction_line
+        """
+        for field in NUMERIC_FIELDS:
+            self.columns[field].append(transaction[field])
+        for field in CATEGORICAL_FIELDS:
+            self.columns[field].append(transaction[field])
+        for field in TEXT_FIELDS:
+            value = transaction[field]
+            self.columns[field].append(sys.intern(value) if value is not None else None)
+        self.length += 1
+
+    def extend(self, columns):
+        """
+        Add many transactions at once
+
+        Args:
+            columns (dict): Field -> sequence of values, one entry per transaction,
+                            e.g. from TRANSACTION_LAYOUT.extract_columns
+        """
+        for field in NUMERIC_FIELDS:
+            self.columns[field].extend(columns[field])
+        for field in CATEGORICAL_FIELDS:
+            self.columns[field].extend(columns[field])
+        for field in TEXT_FIELDS:
+            self.columns[field].extend([sys.intern(value) if value is not None else None
+                                        for value in columns[field]])
+        self.length += len(columns['transaction_type'])
+
+    def column(self, field):
+        """
+        Access a whole column
+
+        Args:
+            field (str): One of TRANSACTION_FIELDS
+
+        Returns:
+            array.array or list: float64 array for numeric fields (nulls read as 0.0,
+            see null_mask), list of values otherwise
+        """
+        column = self.columns[field]
+        if isinstance(column, NumericColumn):
+            return column.data
+        if isinstance(column, DictionaryColumn):
+            return [column.values[code] for code in column.codes]
+        return column
+
+    def null_mask(self, field):
+        """Null mask of a numeric column, 1 where the parsed value was None"""
+        return self.columns[field].nulls
+
+    def value(self, index, field):
+        return self.columns[field][index]
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TransactionRow(self, i) for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("transaction index out of range")
+        return TransactionRow(self, index)
+
+    def to_dicts(self):
+        """
+        Materialize the transactions in the default list-of-dicts layout
+
+        Returns:
+            list: One dict per transaction, equal to parse_RPT002's default output
+        """
+        return [dict(row) for row in self]
+
+
+class TransactionRow(Mapping):
+    """Read-only dict-like view of one transaction in a TransactionColumns"""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, field):
+        if field not in self.table.columns:
+            raise KeyError(field)
+        return self.table.value(self.index, field)
+
+    def __iter__(self):
+        return iter(TRANSACTION_FIELDS)
+
+    def __len__(self):
+        return len(TRANSACTION_FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def json_default(obj):
+    """json.dump default= hook that writes columnar results in the list-of-dicts layout"""
+    if isinstance(obj, TransactionColumns):
+        return obj.to_dicts()
+    if isinstance(obj, TransactionRow):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,305 @@
+import os
+import gzip
+import mmap
+from contextlib import contextmanager
+from functools import partial
+
+# Decoded characters handed out per read, keeps the working set of a read bounded
+CHUNK_SIZE = 1 << 20
+
+# Concurrent file reads and decompressions of run.py --pipeline, kept here so run.py can offer them as
+# defaults without importing asyncio through report_pipeline
+READERS = 4
+DECOMPRESSORS = 2
+
+
+def is_compressed(file_path):
+    """Check whether a report file is a gzip-compressed .z file"""
+    return file_path.endswith('.z')
+
+
+def open_report(file_path):
+    """
+    Open a .PF or .PF.z report as a text stream
+
+    Compressed files are decompressed on the fly, nothing is written next to
+    the original. Newlines are passed through untranslated so the parsers see
+    exactly the bytes TAMS wrote.
+
+    Args:
+        file_path (str): Path to the report file
+
+    Returns:
+        io.TextIOBase: Text stream of the report, to be closed by the caller
+    """
+    if is_compressed(file_path):
+        return gzip.open(file_path, 'rt', encoding='utf-8', newline='')
+    return open(file_path, 'r', encoding='utf-8', newline='')
+
+
+class ReportBuffer:
+    """
+    Undecoded report held as bytes, a memoryview or an mmap
+
+    The parsers take pages and lines from it one at a time, so only the
+    slices they are working on are ever decoded; the report text is never
+    built as one str. Splitting on the raw bytes is safe because UTF-8 never
+    uses the bytes of '\\f' and '\\n' inside a multi-byte character.
+
+    Args:
+        data (bytes-like): bytes, bytearray, memoryview or mmap of the report file
+    """
+
+    def __init__(self, data):
+        if isinstance(data, memoryview) and (data.format != 'B' or data.ndim != 1):
+            data = data.cast('B')
+        self.data = data
+        # memoryview has no find/count, it is searched through bounded copies instead
+        self.searchable = not isinstance(data, memoryview)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Decode a byte range, buffer[start:end] is the text of those bytes"""
+        if not isinstance(index, slice):
+            raise TypeError("ReportBuffer only supports slicing")
+        return str(self.data[index], 'utf-8')
+
+    def _find(self, separator, start, end=None):
+        if end is None:
+            end = len(self.data)
+        if self.searchable:
+            return self.data.find(separator, start, end)
+        # Windows grow from a page-sized first copy, pages are usually found within it
+        size = 4096
+        while start < end:
+            stop = min(start + size, end)
+            index = bytes(self.data[start:stop]).find(separator)
+            if index >= 0:
+                return start + index
+            start = stop
+            size = min(size * 2, CHUNK_SIZE)
+        return -1
+
+    def _rfind(self, separator, start, end):
+        if self.searchable:
+            return self.data.rfind(separator, start, end)
+        size = 4096
+        while end > start:
+            stop = max(end - size, start)
+            index = bytes(self.data[stop:end]).rfind(separator)
+            if index >= 0:
+                return stop + index
+            end = stop
+            size = min(size * 2, CHUNK_SIZE)
+        return -1
+
+    def find(self, separator, start=0, end=None):
+        """Byte offset of a single ASCII character, like str.find, -1 if absent"""
+        return self._find(separator.encode('ascii'), start, end)
+
+    def rfind(self, separator, start=0, end=None):
+        """Byte offset of the last occurrence of a single ASCII character, like str.rfind"""
+        if end is None:
+            end = len(self.data)
+        return self._rfind(separator.encode('ascii'), start, end)
+
+    def split(self, separator):
+        """
+        Decode the report piece by piece, like str.split on the decoded text
+
+        Args:
+            separator (str): Single ASCII character, e.g. '\\f' or '\\n'
+
+        Yields:
+            str: Consecutive pieces, the empty piece after a trailing separator included
+        """
+        separator = separator.encode('ascii')
+        start = 0
+        while True:
+            end = self._find(separator, start)
+            if end < 0:
+                yield str(self.data[start:], 'utf-8')
+                return
+            yield str(self.data[start:end], 'utf-8')
+            start = end + 1
+
+    def count(self, separator):
+        """Number of occurrences of a single ASCII character, without decoding"""
+        separator = separator.encode('ascii')
+        if isinstance(self.data, (bytes, bytearray)):
+            return self.data.count(separator)
+        return sum(bytes(self.data[offset:offset + CHUNK_SIZE]).count(separator)
+                   for offset in range(0, len(self.data), CHUNK_SIZE))
+
+
+def is_stream(raw_data):
+    """Check whether a parser was handed an open file rather than the report contents"""
+    return hasattr(raw_data, 'read')
+
+
+def report_input(raw_data):
+    """
+    Normalize what a parser was handed to a str, a ReportBuffer or a stream
+
+    Args:
+        raw_data: Report text, bytes-like report contents, a ReportBuffer or
+                  a file object opened in text or binary mode
+
+    Returns:
+        str, ReportBuffer or file object: str input and streams are returned as is
+    """
+    if isinstance(raw_data, (str, ReportBuffer)) or is_stream(raw_data):
+        return raw_data
+    return ReportBuffer(raw_data)
+
+
+def split_chunks(chunks, separator):
+    """
+    Yield the pieces between separators of text arriving in chunks
+
+    Only the current chunk and the piece being assembled are held, so the
+    first piece is available before the rest of the input has been read.
+
+    Args:
+        chunks (iterable): Consecutive str chunks, or bytes chunks of UTF-8 text
+        separator (str): Single ASCII character, e.g. '\\f' or '\\n'
+
+    Yields:
+        str: Consecutive pieces, the same as splitting the whole decoded text
+    """
+    parts = []
+    decode = None
+    for chunk in chunks:
+        if decode is None:
+            if isinstance(chunk, str):
+                decode = str
+            else:
+                separator = separator.encode('ascii')
+                decode = partial(str, encoding='utf-8')
+            empty = chunk[:0]
+        pieces = chunk.split(separator)
+        if len(pieces) == 1:
+            parts.append(chunk)
+            continue
+        parts.append(pieces[0])
+        yield decode(empty.join(parts))
+        for piece in pieces[1:-1]:
+            yield decode(piece)
+        parts = [pieces[-1]]
+    yield decode(empty.join(parts)) if decode is not None else ''
+
+
+def split_text(text, separator, chunk_size=CHUNK_SIZE):
+    """Yield the pieces of text.split(separator), splitting at most chunk_size characters at a time"""
+    return split_chunks((text[start:start + chunk_size] for start in range(0, len(text), chunk_size)),
+                        separator)
+
+
+def split_stream(stream, separator, chunk_size=CHUNK_SIZE):
+    """
+    Read a file object chunk by chunk and yield the pieces between separators
+
+    Args:
+        stream: File object opened in text or binary (UTF-8) mode
+        separator (str): Single ASCII character, e.g. '\\f' or '\\n'
+        chunk_size (int): Characters or bytes per read
+
+    Returns:
+        iterator: Pieces as str, see split_chunks
+    """
+    # read(0) returns the end-of-file value of the stream's mode, '' or b''
+    return split_chunks(iter(partial(stream.read, chunk_size), stream.read(0)), separator)
+
+
+def split_report(raw_data, separator):
+    """
+    Iterate over the pieces of a report between separators, decoding one at a time
+
+    Args:
+        raw_data: Anything report_input accepts
+        separator (str): Single ASCII character, e.g. '\\f' or '\\n'
+
+    Returns:
+        iterator: Pieces as str, exactly those of str.split on the decoded report
+    """
+    raw_data = report_input(raw_data)
+    if isinstance(raw_data, str):
+        return split_text(raw_data, separator)
+    if isinstance(raw_data, ReportBuffer):
+        return raw_data.split(separator)
+    return split_stream(raw_data, separator)
+
+
+def iter_pages(raw_data):
+    """Iterate over the form-feed separated pages of a report as str, see split_report"""
+    return split_report(raw_data, '\f')
+
+
+def iter_lines(raw_data):
+    """Iterate over the lines of a whole report as str, form feeds left in place"""
+    return split_report(raw_data, '\n')
+
+
+def report_bytes(raw_data):
+    """
+    The encoded report, for hashing and size accounting
+
+    Args:
+        raw_data (str or ReportBuffer): Report text or buffer
+
+    Returns:
+        bytes-like: The UTF-8 encoding of a str, the underlying buffer otherwise
+    """
+    if isinstance(raw_data, str):
+        return raw_data.encode('utf-8')
+    return raw_data.data
+
+
+@contextmanager
+def map_report(file_path):
+    """
+    Open a .PF or .PF.z report as a ReportBuffer
+
+    Uncompressed files are memory-mapped, so pages are read from the page
+    cache as the parser reaches them. Compressed files are decompressed into
+    one bytes object, which is never decoded as a whole.
+
+    Args:
+        file_path (str): Path to the report file
+
+    Yields:
+        ReportBuffer: The report, valid until the with block exits
+    """
+    if is_compressed(file_path):
+        with gzip.open(file_path, 'rb') as f:
+            yield ReportBuffer(f.read())
+        return
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield ReportBuffer(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield ReportBuffer(data)
+
+
+@contextmanager
+def open_source(file_path):
+    """
+    Open a .PF or .PF.z report for a single lazy pass
+
+    Args:
+        file_path (str): Path to the report file
+
+    Yields:
+        ReportBuffer or file object: A memory-mapped ReportBuffer for an
+        uncompressed file, a text stream decompressing as it is read otherwise
+    """
+    if is_compressed(file_path):
+        with open_report(file_path) as stream:
+            yield stream
+    else:
+        with map_report(file_path) as buffer:
+            yield buffer
@@ -0,0 +1,121 @@
+# Builtins that convert plain number text for fields of these kinds
+PLAIN_TYPES = {
+    'float': float,
+    'int': int,
+}
+
+
+class Field:
+    """
+    One column of a fixed-width report line
+
+    Args:
+        name (str): Key the converted value is stored under
+        start (int): First character of the column
+        end (int): One past the last character, None reads to the end of the line
+        convert (callable): Turns the raw (unstripped) column text into a value
+        kind (str): 'float' or 'int' when convert returns what float()/int() return
+                    for plain number text, 'category' for text columns with few
+                    distinct values; see FixedWidthLayout and report_numpy
+    """
+
+    __slots__ = ('name', 'start', 'end', 'convert', 'kind')
+
+    def __init__(self, name, start, end, convert, kind=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.convert = convert
+        self.kind = kind
+
+
+class FixedWidthLayout:
+    """
+    Column layout of a fixed-width report line, prepared once
+
+    The slice of every field and the converter applied to it are built when
+    the layout is created, so applying it to a line costs one slice and one
+    converter call per field with no per-line setup. Fields of kind 'float'
+    or 'int' are converted with the float()/int() builtins directly, and only
+    when one of them rejects its cell (a blank, a sentinel) is the line
+    converted again with the fields' own converters. extract returns a dict
+    of field name -> converted value in field order; row builds the same dict
+    from values that were already converted, one positional argument per
+    field.
+
+    Args:
+        fields (list): Field objects in output order
+        width (int): Lines shorter than this are padded with spaces first
+    """
+
+    def __init__(self, fields, width=0):
+        self.fields = tuple(fields)
+        self.names = tuple(field.name for field in self.fields)
+        self.width = width
+        self.slices = tuple(slice(field.start, field.end) for field in self.fields)
+        # (name, slice, converter) of every field, with the field's own converter
+        self.items = tuple(zip(self.names, self.slices, (field.convert for field in self.fields)))
+        # The same with float()/int() for the numeric fields, tried first; None when no field has a numeric kind
+        plain_items = tuple((name, column, PLAIN_TYPES.get(field.kind, field.convert))
+                            for name, column, field in zip(self.names, self.slices, self.fields))
+        self.plain_items = plain_items if plain_items != self.items else None
+
+    def extract(self, line):
+        """
+        Apply the layout to one line
+
+        Args:
+            line (str): A report line
+
+        Returns:
+            dict: Field name -> converted value, in field order
+        """
+        if len(line) < self.width:
+            line = line.ljust(self.width)
+        if self.plain_items is not None:
+            try:
+                return {name: convert(line[column]) for name, column, convert in self.plain_items}
+            except ValueError:
+                pass
+        return {name: convert(line[column]) for name, column, convert in self.items}
+
+    def row(self, *values):
+        """Build the dict extract returns from already converted values, one per field in field order"""
+        return dict(zip(self.names, values))
+
+    def extract_many(self, lines, vectorized=False):
+        """
+        Apply the layout to a batch of lines
+
+        Args:
+            lines (list): Report lines
+            vectorized (bool): Use the NumPy engine in report_numpy when it is installed
+
+        Returns:
+            list: One dict per line, the same as calling extract on each line
+        """
+        if vectorized:
+            import report_numpy
+            return report_numpy.extract_batch(self, lines)
+        extract = self.extract
+        return [extract(line) for line in lines]
+
+    def extract_columns(self, lines, vectorized=False):
+        """
+        Apply the layout to a batch of lines, returning one sequence per field
+
+        Args:
+            lines (list): Report lines
+            vectorized (bool): Use the NumPy engine in report_numpy when it is installed
+
+        Returns:
+            dict: Field name -> values of that field for every line, in line order;
+            with vectorized set, numeric columns may be report_numpy.NumericArray
+        """
+        if vectorized:
+            import report_numpy
+            return report_numpy.extract_columns(self, lines)
+        if self.width:
+            lines = [line.ljust(self.width) for line in lines]
+        return {field.name: [field.convert(line[column]) for line in lines]
+                for field, column in zip(self.fields, self.slices)}
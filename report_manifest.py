@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+
+# Directory holding the report_*.py modules and the report_parsers package
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSERS_DIR = os.path.join(SOURCE_DIR, 'report_parsers')
+
+# Source files whose contents define the parser version, listed without importing them
+PARSER_SOURCES = [os.path.join(SOURCE_DIR, name) for name in (
+    'report_parser.py', 'report_io.py', 'report_layout.py', 'report_pages.py', 'report_tokens.py')] + sorted(
+    os.path.join(PARSERS_DIR, name) for name in os.listdir(PARSERS_DIR) if name.endswith('.py'))
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def parser_version():
+    """
+    Fingerprint the parser source so results are invalidated when its logic changes
+
+    Returns:
+        str: Hex digest over the contents of PARSER_SOURCES
+    """
+    digest = hashlib.sha256()
+    for source in PARSER_SOURCES:
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def file_digest(file_path):
+    """Hash the raw bytes of a file as stored on disk"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_fingerprinted(file_path):
+    """
+    Read a whole file and fingerprint exactly the bytes read, for IngestManifest.record
+
+    The mtime is taken from the open file before reading, so a file rewritten
+    while it is read gets a fingerprint that no longer matches it.
+
+    Args:
+        file_path (str): Path to the report file
+
+    Returns:
+        tuple: (file contents as bytes, {'size', 'mtime_ns', 'sha256'} of those contents)
+    """
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        raw = f.read()
+    return raw, {'size': len(raw), 'mtime_ns': stat.st_mtime_ns, 'sha256': hashlib.sha256(raw).hexdigest()}
+
+
+class IngestManifest:
+    """
+    Persistent record of the report files already ingested and their results
+
+    Each source file is tracked by path, size, mtime and content hash. A file
+    whose size and mtime match its entry is reused without being read; if only
+    the mtime changed the file is hashed and reused when the hash still
+    matches. Results are kept as one JSON file per source under results/, and
+    the whole manifest is dropped when the parser version changes.
+    """
+
+    def __init__(self, directory, version=None):
+        self.directory = directory
+        self.path = os.path.join(directory, 'manifest.json')
+        self.results_dir = os.path.join(directory, 'results')
+        self.version = version or parser_version()
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.results_dir, exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                manifest = json.load(f)
+            if manifest.get('parser_version') == self.version:
+                self.entries = manifest.get('files', {})
+
+    def _result_path(self, file_path):
+        key = hashlib.sha256(file_path.encode('utf-8')).hexdigest()
+        return os.path.join(self.results_dir, f"{key}.json")
+
+    def lookup(self, file_path):
+        """
+        Return the previously emitted result for an unchanged file
+
+        Args:
+            file_path (str): Path to the report file
+
+        Returns:
+            dict or None: The stored parse result, or None if the file must be parsed
+        """
+        file_path = os.path.abspath(file_path)
+        entry = self.entries.get(file_path)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        try:
+            stat = os.stat(file_path)
+            changed = stat.st_size != entry['size'] or (
+                stat.st_mtime_ns != entry['mtime_ns'] and file_digest(file_path) != entry['sha256'])
+        except FileNotFoundError:
+            # Removed since the scan, the parse will report it
+            changed = True
+        if changed:
+            self.misses += 1
+            return None
+        if stat.st_mtime_ns != entry['mtime_ns']:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self.dirty = True
+
+        try:
+            with open(self._result_path(file_path)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def record(self, file_path, data, fingerprint):
+        """
+        Store the result of parsing a file and remember its fingerprint
+
+        Args:
+            file_path (str): Path to the report file
+            data (dict): The parse result
+            fingerprint (dict): Fingerprint of the bytes that were parsed, from read_fingerprinted;
+                                taken before the parse so a file rewritten meanwhile is not paired
+                                with the result of its old contents
+        """
+        file_path = os.path.abspath(file_path)
+        result_path = self._result_path(file_path)
+        with open(result_path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(result_path + '.tmp', result_path)
+
+        self.entries[file_path] = dict(fingerprint)
+        self.dirty = True
+
+    def prune(self):
+        """
+        Forget the files that left the archive and delete the results nothing refers to
+
+        Results of files whose entry is gone, e.g. after a parser version
+        change, are deleted too, so results/ does not keep growing.
+
+        Returns:
+            int: Number of result files deleted
+        """
+        for file_path in [file_path for file_path in self.entries if not os.path.exists(file_path)]:
+            del self.entries[file_path]
+            self.dirty = True
+        kept = {os.path.basename(self._result_path(file_path)) for file_path in self.entries}
+        removed = 0
+        with os.scandir(self.results_dir) as entries:
+            for entry in entries:
+                if entry.name not in kept:
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def save(self):
+        """Write the manifest to disk if anything changed"""
+        if not self.dirty:
+            return
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'parser_version': self.version, 'files': self.entries}, f)
+        os.replace(self.path + '.tmp', self.path)
+        self.dirty = False
@@ -0,0 +1,238 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, every entry point falls back to the pure-Python path
+    np = None
+
+# Characters a numeric column may contain for its bulk conversion to agree with report_tokens.to_float/to_int
+ALLOWED_BYTES = {
+    'float': b'0123456789.+- ',
+    'int': b'0123456789+- ',
+}
+NUMPY_TYPES = {
+    'float': 'float64',
+    'int': 'int64',
+}
+
+# Below this many lines building the byte grid costs more than it saves
+MIN_BATCH_ROWS = 256
+
+if np is not None:
+    ALLOWED_TABLES = {}
+    for kind, allowed in ALLOWED_BYTES.items():
+        ALLOWED_TABLES[kind] = np.zeros(256, dtype=bool)
+        ALLOWED_TABLES[kind][np.frombuffer(allowed, dtype=np.uint8)] = True
+
+
+def available():
+    """Check whether the NumPy engine can be used"""
+    return np is not None
+
+
+class NumericArray:
+    """
+    Numeric column converted in bulk, a typed array plus a null mask
+
+    Behaves as a sequence of the values to_float/to_int would have
+    returned, None where the cell was blank. Null slots hold 0 in values.
+    """
+
+    __slots__ = ('values', 'nulls')
+
+    def __init__(self, values, nulls):
+        self.values = values
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if self.nulls[index]:
+            return None
+        return self.values[index].item()
+
+    def __setitem__(self, index, value):
+        self.nulls[index] = value is None
+        self.values[index] = 0 if value is None else value
+
+    def tolist(self):
+        values = self.values.tolist()
+        for index in np.flatnonzero(self.nulls).tolist():
+            values[index] = None
+        return values
+
+
+class CategoryArray:
+    """
+    Low-cardinality column converted once per distinct cell
+
+    values holds the converted distinct cells in order of first appearance
+    and codes an integer array indexing into it, one entry per row.
+    """
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __setitem__(self, index, value):
+        if value not in self.values:
+            self.values.append(value)
+        self.codes[index] = self.values.index(value)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def recode(self, table, typecode):
+        """
+        Map the codes through a lookup table
+
+        Args:
+            table (list): New code for every entry of values
+            typecode (str): array module typecode of the result
+
+        Returns:
+            bytes: The new codes, ready for array.frombytes
+        """
+        return np.asarray(table, dtype=typecode)[self.codes].tobytes()
+
+    def tolist(self):
+        values = np.empty(len(self.values), dtype=object)
+        values[:] = self.values
+        return values[self.codes].tolist()
+
+
+def extract_columns(layout, lines):
+    """
+    Apply a FixedWidthLayout to many lines at once, column by column
+
+    The lines are packed into one padded (rows x width) byte grid, and the
+    columns of fields with a numeric kind are cut out of it whole and
+    converted with a single astype instead of one to_float/to_int call
+    per cell. Columns of kind 'category' are reduced to their distinct cells,
+    each converted once. Other fields, and columns holding anything the bulk
+    conversion cannot match exactly, are converted per cell. Without NumPy,
+    for small batches, or for lines that are not plain ASCII (where
+    characters and bytes would not line up), every cell is converted in
+    Python.
+
+    Args:
+        layout (FixedWidthLayout): Layout to apply
+        lines (list): Report lines
+
+    Returns:
+        dict: Field name -> NumericArray or CategoryArray for columns converted in
+        bulk, list of values otherwise; either way the values layout.extract would produce
+    """
+    grid = None
+    padded = lines
+    if np is not None and len(lines) >= MIN_BATCH_ROWS:
+        width = max(layout.width, max(map(len, lines)))
+        padded = [line.ljust(width) for line in lines]
+        try:
+            buffer = ''.join(padded).encode('ascii')
+            grid = np.frombuffer(buffer, dtype=np.uint8).reshape(len(lines), width)
+        except UnicodeEncodeError:
+            padded = lines
+
+    columns = {}
+    for field in layout.fields:
+        values = None
+        if grid is not None and field.kind in ALLOWED_BYTES:
+            values = convert_column(grid, field)
+        elif grid is not None and field.kind == 'category' and field.end is not None \
+                and field.end <= layout.width:
+            values = category_column(grid, field)
+        if values is None:
+            # Per-cell conversions must see exactly the text layout.extract would slice
+            convert = field.convert
+            column = slice(field.start, field.end)
+            if padded is not lines and field.end is not None and field.end <= layout.width:
+                values = [convert(line[column]) for line in padded]
+            else:
+                values = [convert(line.ljust(layout.width)[column]) for line in lines]
+        columns[field.name] = values
+    return columns
+
+
+def extract_batch(layout, lines):
+    """
+    Apply a FixedWidthLayout to many lines at once
+
+    Args:
+        layout (FixedWidthLayout): Layout to apply
+        lines (list): Report lines
+
+    Returns:
+        list: One dict per line, identical to [layout.extract(line) for line in lines]
+    """
+    if np is None or len(lines) < MIN_BATCH_ROWS:
+        return [layout.extract(line) for line in lines]
+    columns = extract_columns(layout, lines).values()
+    return list(map(layout.row, *(column if isinstance(column, list) else column.tolist()
+                                  for column in columns)))
+
+
+def convert_column(grid, field):
+    """
+    Convert one numeric column of a byte grid in bulk
+
+    Args:
+        grid (numpy.ndarray): (rows x width) uint8 array of padded lines
+        field (Field): Field with kind 'float' or 'int'
+
+    Returns:
+        NumericArray or None: The converted column, or None when it holds
+        anything the bulk conversion cannot match exactly
+    """
+    rows, width = grid.shape
+    start = min(field.start, width)
+    end = width if field.end is None else min(field.end, width)
+    if end <= start:
+        return NumericArray(np.zeros(rows, dtype=NUMPY_TYPES[field.kind]), np.ones(rows, dtype=bool))
+
+    block = np.ascontiguousarray(grid[:, start:end])
+    if not ALLOWED_TABLES[field.kind][block].all():
+        return None
+
+    blank = (block == ord(' ')).all(axis=1)
+    cells = block.view(f"S{end - start}").ravel()
+    if blank.any():
+        cells = np.where(blank, b'0', cells)
+    try:
+        values = cells.astype(NUMPY_TYPES[field.kind])
+    except (ValueError, OverflowError):
+        return None
+    return NumericArray(values, blank)
+
+
+def category_column(grid, field):
+    """
+    Convert one low-cardinality column of a byte grid, once per distinct cell
+
+    Args:
+        grid (numpy.ndarray): (rows x width) uint8 array of padded lines
+        field (Field): Field with kind 'category' that ends inside the grid
+
+    Returns:
+        CategoryArray or None: The converted column, or None when a cell holds
+        a NUL byte, which the fixed-size bytes view would drop
+    """
+    block = np.ascontiguousarray(grid[:, field.start:field.end])
+    if not block.all():
+        return None
+
+    cells = block.view(f"S{field.end - field.start}").ravel()
+    distinct, first, inverse = np.unique(cells, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    convert = field.convert
+    values = [convert(cell.decode('ascii')) for cell in distinct[order].tolist()]
+    return CategoryArray(values, rank[inverse.ravel()])
@@ -0,0 +1,196 @@
+import os
+import json
+import shutil
+import tempfile
+
+
+class ReportWriter:
+    """
+    Base class for the output stages of run.py
+
+    Reports are handed over one at a time as soon as they are parsed, so a
+    writer never needs to hold more than the report it is writing.
+    """
+
+    def write(self, real_date, report_type, data):
+        raise NotImplementedError
+
+    def flush(self):
+        """Make everything written so far visible to readers of the output"""
+        pass
+
+    def build_indexes(self):
+        """Build now the lookup structures a format otherwise builds on close, for outputs read while written"""
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonLinesWriter(ReportWriter):
+    """
+    Append one {"date", "report", "data"} JSON object per line
+
+    Every line is flushed as it is written, so a crash only loses the report
+    that was being parsed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w')
+
+    def write(self, real_date, report_type, data):
+        self.file.write(json.dumps({'date': real_date, 'report': report_type, 'data': data}))
+        self.file.write('\n')
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class ShardWriter(ReportWriter):
+    """
+    Write each report to <directory>/<date>/<RPTxxx>.json plus an index.json
+
+    The index maps each date to the report types written for it, in the order
+    they were first seen. It is rewritten whenever a new date shows up, so a
+    crashed run still leaves an index of everything that made it to disk.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, real_date, report_type, data):
+        date_dir = os.path.join(self.directory, real_date)
+        os.makedirs(date_dir, exist_ok=True)
+        write_json_atomic(os.path.join(date_dir, f"{report_type}.json"), data)
+
+        new_date = real_date not in self.index
+        report_types = self.index.setdefault(real_date, [])
+        if report_type not in report_types:
+            report_types.append(report_type)
+        if new_date:
+            self.write_index()
+
+    def write_index(self):
+        write_json_atomic(os.path.join(self.directory, 'index.json'), self.index)
+
+    def flush(self):
+        self.write_index()
+
+    def close(self):
+        self.write_index()
+
+
+class JsonDumpWriter(ReportWriter):
+    """
+    Compatibility writer for the original single dump.json
+
+    Reports are spooled to a temporary directory next to the output as they
+    arrive and stitched together on close, producing exactly what
+    json.dump(report_data, file, indent=2) would, without ever holding more
+    than one report in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.spool_dir = tempfile.mkdtemp(prefix='.dump-', dir=os.path.dirname(os.path.abspath(path)))
+        self.spooled = {}
+        self.spool_count = 0
+
+    def write(self, real_date, report_type, data):
+        spool_path = os.path.join(self.spool_dir, f"{self.spool_count}.json")
+        self.spool_count += 1
+        with open(spool_path, 'w') as f:
+            f.write(json.dumps(data, indent=2))
+        self.spooled.setdefault(real_date, {})[report_type] = spool_path
+
+    def close(self):
+        if self.spool_dir is None:
+            return
+        with open(self.path, 'w') as file:
+            if not self.spooled:
+                file.write('{}')
+            else:
+                file.write('{\n')
+                for date_index, (real_date, reports) in enumerate(self.spooled.items()):
+                    file.write(f"  {json.dumps(real_date)}: {{\n")
+                    for report_index, (report_type, spool_path) in enumerate(reports.items()):
+                        with open(spool_path) as f:
+                            body = f.read().replace('\n', '\n    ')
+                        file.write(f"    {json.dumps(report_type)}: {body}")
+                        file.write(',\n' if report_index < len(reports) - 1 else '\n')
+                    file.write('  }')
+                    file.write(',\n' if date_index < len(self.spooled) - 1 else '\n')
+                file.write('}')
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+        self.spool_dir = None
+
+
+class SqliteWriter(ReportWriter):
+    """
+    Load each report into a SQLite database, see report_sqlite.ReportDatabase
+
+    Rows are committed in batches, so a crash loses at most the reports of
+    the batch in progress; loading them again replaces nothing but themselves.
+    """
+
+    def __init__(self, path):
+        # Imported here, the other formats need neither sqlite3 nor the parser field lists
+        from report_sqlite import ReportDatabase
+        self.database = ReportDatabase(path)
+
+    def write(self, real_date, report_type, data):
+        self.database.add(real_date, report_type, data)
+
+    def flush(self):
+        self.database.commit()
+
+    def build_indexes(self):
+        self.database.create_indexes()
+
+    def close(self):
+        self.database.close()
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to path via a temporary file so readers never see a partial file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Output format name -> (writer class, default output path)
+WRITERS = {
+    'jsonl': (JsonLinesWriter, 'dump.jsonl'),
+    'shards': (ShardWriter, 'dump'),
+    'json': (JsonDumpWriter, 'dump.json'),
+    'sqlite': (SqliteWriter, 'dump.sqlite'),
+}
+
+
+def open_writer(output_format, path=None):
+    """
+    Create the writer for an output format
+
+    Args:
+        output_format (str): One of the keys of WRITERS
+        path (str): Output file or directory, defaults to the format's default path
+
+    Returns:
+        ReportWriter: The writer, to be closed by the caller
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    writer_class, default_path = WRITERS[output_format]
+    return writer_class(path or default_path)
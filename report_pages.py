@@ -0,0 +1,188 @@
+from array import array
+from collections import deque
+
+from report_io import is_stream, iter_lines, iter_pages, report_input
+
+
+class Page:
+    """
+    One form-feed separated page of a report
+
+    Pages are produced lazily by read_pages; a page's lines and header are
+    only split out when a parser asks for them, and then kept for later use.
+
+    Args:
+        index (int): Position of the page in the report, from 0, or counted
+                     from the end (-1 for the last page) for pages found by
+                     read_last_pages
+        text (str): Page contents between the surrounding form feeds
+    """
+
+    __slots__ = ('index', 'text', '_lines', '_header')
+
+    def __init__(self, index, text):
+        self.index = index
+        self.text = text
+        self._lines = None
+        self._header = None
+
+    @property
+    def lines(self):
+        """Lines of the page with leading and trailing blank space stripped from the page"""
+        if self._lines is None:
+            self._lines = self.text.strip().split('\n')
+        return self._lines
+
+    @property
+    def raw_lines(self):
+        """Lines of the page exactly as printed, blank leading and trailing lines included"""
+        return self.text.split('\n')
+
+    @property
+    def header(self):
+        """Report date and store information from the top of the page, see page_header"""
+        if self._header is None:
+            self._header = page_header(self.lines)
+        return self._header
+
+
+def page_header(lines):
+    """
+    Read the header TAMS prints at the top of every page
+
+    The first line starts with the print date and time, the second holds
+    '<store id> - <store name>' optionally followed by 'Accounting Day - <n>'.
+
+    Args:
+        lines (list): Lines of the page
+
+    Returns:
+        dict: report_date, store_id, store_name and accounting_day, each only when found
+    """
+    header = {}
+    if not lines:
+        return header
+
+    header_date_line = lines[0].split()
+    if len(header_date_line) >= 2:
+        header['report_date'] = f"{header_date_line[0]} {header_date_line[1]}"
+    if len(lines) < 2:
+        return header
+
+    store_info_line = lines[1].split(' - ')
+    if len(store_info_line) >= 2:
+        header['store_id'] = store_info_line[0].strip()
+        header['store_name'] = store_info_line[1].replace('Accounting Day', '').rstrip()
+
+    accounting_info = lines[1].split('Accounting Day - ')
+    if len(accounting_info) > 1:
+        header['accounting_day'] = accounting_info[1].split()[0].strip()
+    return header
+
+
+def read_pages(raw_data):
+    """
+    Tokenize a report into pages, one at a time
+
+    Args:
+        raw_data: Report text, bytes-like report contents, a report_io.ReportBuffer
+                  or an open file, which is read as the pages are consumed
+
+    Yields:
+        Page: Every page of the report in order, the empty page after a trailing
+        form feed included
+    """
+    for index, text in enumerate(iter_pages(raw_data)):
+        yield Page(index, text)
+
+
+def read_lines(raw_data):
+    """
+    Tokenize a report into lines, one at a time, ignoring page boundaries
+
+    Args:
+        raw_data: Anything read_pages accepts
+
+    Returns:
+        iterator: Lines as str, form feeds left inside the lines they start
+    """
+    return iter_lines(raw_data)
+
+
+class PageIndex:
+    """
+    Random access to the pages of a report held in memory
+
+    One scan for form feeds records where every page starts; indexing then
+    decodes just the requested page. Works on report text and on undecoded
+    contents (a memory-mapped file, bytes), where offsets are byte offsets
+    and the scan never decodes anything.
+
+    Args:
+        raw_data: Report text, bytes-like report contents or a report_io.ReportBuffer
+    """
+
+    def __init__(self, raw_data):
+        data = report_input(raw_data)
+        if is_stream(data):
+            raise TypeError("a page index needs the whole report, not an open file")
+        self.data = data
+        # Offset of the first character of every page, the form feeds sit one before each
+        self.starts = array('q', [0])
+        position = data.find('\f')
+        while position >= 0:
+            self.starts.append(position + 1)
+            position = data.find('\f', position + 1)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        """
+        Decode one page
+
+        Args:
+            index (int): Page number from 0, negative numbers count from the end
+
+        Returns:
+            Page: The page, the same as the index-th page of read_pages
+        """
+        if index < 0:
+            index += len(self.starts)
+        if not 0 <= index < len(self.starts):
+            raise IndexError("page index out of range")
+        start = self.starts[index]
+        end = self.starts[index + 1] - 1 if index + 1 < len(self.starts) else len(self.data)
+        return Page(index, self.data[start:end])
+
+
+def read_last_pages(raw_data, count=1):
+    """
+    Decode only the trailing pages of a report
+
+    Reports in memory are scanned backwards from the end for form feeds, so
+    the cost depends on the size of the pages returned, not of the report.
+    An open file has no end to start from; it is read through, keeping only
+    the last pages.
+
+    Args:
+        raw_data: Anything read_pages accepts
+        count (int): Number of pages wanted
+
+    Returns:
+        list: Up to count Page objects in report order, indexed from the end
+        (-1 for the last page); the empty page after a trailing form feed counts
+    """
+    data = report_input(raw_data)
+    if is_stream(data):
+        tail = deque(iter_pages(data), maxlen=count)
+        return [Page(index - len(tail), text) for index, text in enumerate(tail)]
+
+    pages = []
+    end = len(data)
+    while len(pages) < count and end >= 0:
+        start = data.rfind('\f', 0, end) + 1
+        pages.append(Page(-len(pages) - 1, data[start:end]))
+        end = start - 1
+    pages.reverse()
+    return pages
@@ -0,0 +1,2 @@
+# One module per report, imported by report_parser.ReportParser.parser_for when a
+# report number is first parsed; the modules register their parsers on import.
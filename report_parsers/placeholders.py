@@ -0,0 +1,114 @@
+from report_parser import ReportParser
+
+
+@ReportParser.register_parser("005")
+def parse_RPT005(raw_data, stats=None):
+    parsed_data = {}
+    # Parse sales posted (day sales info)
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("006")
+def parse_RPT006(raw_data, stats=None):
+    parsed_data = {}
+    # Parse sales by department
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("008")
+def parse_RPT008(raw_data, stats=None):
+    parsed_data = {}
+    # Parse received on account
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("012")
+def parse_RPT012(raw_data, stats=None):
+    parsed_data = {}
+    # Parse saved invoice report
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("013")
+def parse_RPT013(raw_data, stats=None):
+    parsed_data = {}
+    # Parse inventory status
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("015")
+def parse_RPT015(raw_data, stats=None):
+    parsed_data = {}
+    # Parse special order communication report
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("017")
+def parse_RPT017(raw_data, stats=None):
+    parsed_data = {}
+    # Parse daily reportable sales
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("077")
+def parse_RPT077(raw_data, stats=None):
+    parsed_data = {}
+    # Parse cash report
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("078")
+def parse_RPT078(raw_data, stats=None):
+    parsed_data = {}
+    # Parse inventory activity
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("079")
+def parse_RPT079(raw_data, stats=None):
+    parsed_data = {}
+    # Parse checks
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("080")
+def parse_RPT080(raw_data, stats=None):
+    parsed_data = {}
+    # Parse payment cards
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("082")
+def parse_RPT082(raw_data, stats=None):
+    parsed_data = {}
+    # Parse price overrides
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("113")
+def parse_RPT113(raw_data, stats=None):
+    parsed_data = {}
+    # Parse (No description)
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("121")
+def parse_RPT121(raw_data, stats=None):
+    parsed_data = {}
+    # Parse return defective / labor claim
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("130")
+def parse_RPT130(raw_data, stats=None):
+    parsed_data = {}
+    # Parse special invoice report
+    # ...
+    return parsed_data
+
+@ReportParser.register_parser("203")
+def parse_RPT203(raw_data, stats=None):
+    parsed_data = {}
+    # Parse transfers invoiced
+    # ...
+    return parsed_data
@@ -0,0 +1,318 @@
+from report_pages import read_pages
+from report_parser import ReportParser
+from report_tokens import row_converter, to_float, to_int
+
+
+# RPT001 sales columns after the employee or salesrep id
+SALES_FIELDS = (
+    'today_net_sales', 'today_gross_profit', 'today_gp_percent',
+    'mtd_net_sales', 'mtd_gross_profit', 'mtd_gp_percent', 'mtd_percent_change',
+    'ytd_net_sales', 'ytd_gross_profit', 'ytd_gp_percent',
+    'last_year_net_sales', 'last_year_gross_profit', 'last_year_gp_percent',
+)
+
+# RPT001 invoice columns after the employee or salesrep id, four counts and a value per period
+INVOICE_FIELDS = tuple(
+    f"{period}_{column}"
+    for period in ('today', 'mtd', 'ytd', 'last_year')
+    for column in ('invoices', 'lines', 'voided', 'returns', 'returns_value')
+)
+INVOICE_TYPES = (int, int, int, int, float) * 4
+
+# Rows are split on whitespace, the id or 'Total' comes first; last year data is only present on wide rows
+convert_sales_row = row_converter(SALES_FIELDS, (float,) * 13, offset=1)
+convert_short_sales_row = row_converter(SALES_FIELDS[:10], (float,) * 10, offset=1)
+convert_invoice_row = row_converter(INVOICE_FIELDS, INVOICE_TYPES, offset=1)
+convert_short_invoice_row = row_converter(INVOICE_FIELDS[:15], INVOICE_TYPES[:15], offset=1)
+
+# RPT001 memo of delivery sales rows, no leading id
+convert_memo_invoice_row = row_converter(('today_invoices', 'today_lines', 'mtd_invoices', 'mtd_lines'), (int,) * 4)
+convert_memo_sales_row = row_converter(SALES_FIELDS[:6], (float,) * 6)
+
+
+# may need to switch to fixed width parsing if unreliable
+@ReportParser.register_parser("001")
+def parse_RPT001(raw_data, stats=None):
+    """
+    Parse the employee sales report (RPT001) with proper pagination handling
+    
+    Args:
+        raw_data (str): Raw ASCII report data
+        stats (ParseStats): Optional counters for skipped lines
+    
+    Returns:
+        dict: Parsed data containing report metadata, sales data, and invoice data
+    """
+    parsed_data = {
+        'metadata': {},
+        'employees': {},
+        'salesreps': {},
+        'totals': {
+            'employee': {
+                'sales': {},
+                'invoice': {}
+            },
+            'salesrep': {
+                'sales': {},
+                'invoice': {}
+            }
+        },
+        'memo_delivery_sales': {}
+    }
+    
+    # Track the current section and data type across pages
+    current_section = None
+    current_data_type = 'sales'  # Start with sales data, will switch to 'invoice' when detected
+    
+    # Parse employee sales report, one page at a time
+    for page in read_pages(raw_data):
+        current_section = None
+        lines = page.lines
+        
+        # Parse metadata from each page header
+        if len(lines) > 5:
+            # Extract report metadata from first page only
+            if page.index == 0 or not parsed_data['metadata']:
+                parsed_data['metadata'].update(page.header)
+                parsed_data['metadata']['report_type'] = 'Employee Sales'
+                
+                # Get month for "Last Month" reference
+                last_month_info = None
+                for line in lines[0:5]:
+                    if 'Last' in line and '-' in line:
+                        parts = line.split('Last')
+                        if len(parts) > 1:
+                            month_parts = parts[1].split('-')
+                            if len(month_parts) > 0:
+                                last_month_info = month_parts[0].strip()
+                
+                if last_month_info:
+                    parsed_data['metadata']['last_month'] = last_month_info
+            
+            # Extract page number
+            page_info = lines[1].split('Page')
+            if len(page_info) > 1:
+                current_page = int(page_info[1].strip())
+                parsed_data['metadata']['current_page'] = current_page
+        
+        # Detect if this page contains invoice data or sales data
+        for i, line in enumerate(lines):
+            if i < 10 and 'InvLinesVdRet' in line.replace(' ', ''):
+                current_data_type = 'invoice'
+                break
+            elif i < 10 and 'NetGrossNet' in line.replace(' ', ''):
+                current_data_type = 'sales'
+                break
+        
+        # Scan for section headers on each page
+        line_index = 0
+        while line_index < len(lines):
+            line = lines[line_index]
+            
+            # Identify section headers - these can appear on any page
+            if '*Employee' in line:
+                current_section = 'employee'
+                line_index += 1
+                continue
+            elif '*Salesrep' in line:
+                current_section = 'salesrep'
+                line_index += 1
+                continue
+            elif 'Memo of Delivery Sales' in line:
+                current_section = 'memo_delivery'
+                line_index += 1
+                continue
+            
+            # Skip header and separator lines
+            if ('-----' in line or 
+                line.strip() == '' or 
+                'EMPLOYEE SALES REPORT' in line.upper() or
+                'End of Report' in line or
+                'Page' in line and len(line.strip()) < 10 or
+                '***' in line or
+                '# Inv' in line):
+                line_index += 1
+                continue
+                
+            # Skip column headers based on data type
+            if current_data_type == 'sales' and ('Emp' in line and 'Sales' in line or
+                                             'Net' in line and 'Gross' in line):
+                line_index += 1
+                continue
+            elif current_data_type == 'invoice' and ('Emp' in line and 'Inv' in line or
+                                                 'Lines' in line and 'Vd' in line and 'Ret' in line):
+                line_index += 1
+                continue
+            
+            # Process data lines if we're in a valid section
+            if current_section and line.strip():
+                
+                # Process Total lines
+                if line.strip().startswith('Total'):
+                    parts = line.split()
+                    
+                    if current_data_type == 'sales' and len(parts) >= 14:
+                        # Sentinels such as '!!!!!!' convert to None
+                        total_data = convert_sales_row(parts)
+                        
+                        parsed_data['totals'][current_section]['sales'] = total_data
+                    
+                    # Handle invoice data totals
+                    elif current_data_type == 'invoice' and len(parts) >= 20:
+                        # The last year returns value may be missing, a None token converts to None
+                        if len(parts) < 21:
+                            parts.append(None)
+                        total_data = convert_invoice_row(parts)
+                        
+                        parsed_data['totals'][current_section]['invoice'] = total_data
+                
+                # Process memo delivery sales data
+                elif current_section == 'memo_delivery':
+                    parts = line.split()
+
+                    if len(parts) >= 4:
+                        try:
+                            # Handle invoice counts for memo delivery
+                            if 'Inv Lines' in line:
+                                line_index += 1
+                                continue
+                                
+                            memo_data = {}
+                            
+                            # Handle memo delivery data layout
+                            if current_data_type == 'invoice' and len(parts) >= 4:
+                                memo_data = convert_memo_invoice_row(parts)
+                            
+                            # Handle memo delivery data for sales data (if present)
+                            elif current_data_type == 'sales' and len(parts) >= 6:
+                                memo_data = convert_memo_sales_row(parts)
+                            
+                            if memo_data:
+                                parsed_data['memo_delivery_sales'].update(memo_data)
+                                
+                        except (ValueError, IndexError):
+                            # Skip malformed memo lines
+                            if stats is not None:
+                                stats.skip('malformed_memo_line')
+                
+                # Process regular data lines (employee or salesrep)
+                elif current_section in ['employee', 'salesrep'] and not line.strip().startswith('Total'):
+                    try:
+                        parts = line.split()
+                        id_value = parts[0].strip()
+                        
+                        # Skip if this doesn't start with a valid ID
+                        if not (id_value.isdigit() or id_value.isalnum() and len(id_value) <= 6):
+                            if stats is not None:
+                                stats.skip('invalid_id')
+                            line_index += 1
+                            continue
+                        
+                        # Initialize structure if this ID is seen for the first time
+                        collection_name = f"{current_section}s"  # 'employees' or 'salesreps'
+                        if id_value not in parsed_data[collection_name]:
+                            parsed_data[collection_name][id_value] = {
+                                'sales': {},
+                                'invoice': {}
+                            }
+                            
+                        # Process sales data
+                        if current_data_type == 'sales' and len(parts) >= 11:
+                            # Sentinels such as '!!!!!!' convert to None
+                            if len(parts) >= 14:
+                                entry = convert_sales_row(parts)
+                            else:
+                                entry = convert_short_sales_row(parts)
+                            
+                            # Store in the appropriate section
+                            parsed_data[collection_name][id_value]['sales'] = entry
+                        
+                        # Process invoice data
+                        elif current_data_type == 'invoice' and len(parts) >= 16:
+                            if len(parts) >= 21:
+                                entry = convert_invoice_row(parts)
+                            else:
+                                entry = convert_short_invoice_row(parts)
+                            
+                            # Store in the appropriate section
+                            parsed_data[collection_name][id_value]['invoice'] = entry
+
+                        elif stats is not None:
+                            stats.skip('too_few_columns')
+                            
+                    except (ValueError, IndexError) as e:
+                        # Skip any malformed lines but continue processing
+                        if stats is not None:
+                            stats.skip('malformed_line')
+                        
+            line_index += 1
+    
+    return parsed_data
+
+
+def safe_float(value):
+    """
+    Convert a cell to float, None if it holds no number
+
+    Kept for code written against the original report_parser module: text
+    goes through report_tokens.to_float like the parser's own cells, other
+    values through float().
+    """
+    if isinstance(value, str):
+        return to_float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def safe_int(value):
+    """Convert a cell to int, None if it holds no integer, see safe_float and report_tokens.to_int"""
+    if isinstance(value, str):
+        return to_int(value)
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def detect_data_type(line):
+    """
+    Detects whether a line is from sales or invoice data
+    
+    Args:
+        line (str): A line from the report
+    
+    Returns:
+        str: 'sales' or 'invoice' or None if can't determine
+    """
+    # Check for invoice data headers
+    if ('Inv' in line and 'Lines' in line and 'Vd' in line and 'Ret' in line and 'Returns' in line):
+        return 'invoice'
+    
+    # Check for sales data headers
+    elif ('Net' in line and 'Gross' in line and 'GP%' in line):
+        return 'sales'
+    
+    # Check data content patterns
+    elif line.strip() and line[0].isdigit():
+        parts = line.split()
+        # Invoice data typically has more columns and specific numeric patterns
+        if len(parts) >= 16:
+            # Check if columns 1-4 look like integers (invoice counts)
+            try:
+                all(isinstance(int(parts[i]), int) for i in range(1, 5))
+                return 'invoice'
+            except ValueError:
+                pass
+                
+        # Sales data typically has percentage values
+        if len(parts) >= 10:
+            try:
+                # Check for percentage patterns
+                if any(float(part) <= 100.0 for part in [parts[3], parts[6], parts[10]]):
+                    return 'sales'
+            except ValueError:
+                pass
+    
+    return None
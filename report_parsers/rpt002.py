@@ -0,0 +1,432 @@
+import os
+from collections import deque
+from itertools import chain
+
+from report_io import is_stream, map_report, open_source, report_input
+from report_layout import Field, FixedWidthLayout
+from report_pages import read_last_pages, read_pages
+from report_parser import ReportParser
+from report_tokens import to_float
+
+
+# Transaction types that start an RPT002 data line
+TRANSACTION_TYPES = ('CASH', 'CHG', 'CR MEM', 'ROA', 'REFUND')
+
+# Transaction lines extracted at a time, bounds the lines and intermediate rows held besides the result
+TRANSACTION_BATCH_LINES = 8192
+
+@ReportParser.register_parser("002", options=('columnar', 'vectorized', 'summary_only'))
+def parse_RPT002(raw_data, stats=None, columnar=False, vectorized=False, summary_only=False):
+    """
+    Parse the Transaction Register report (RPT002)
+    
+    Args:
+        raw_data (str): Raw ASCII report data
+        stats (ParseStats): Optional counters for skipped lines
+        columnar (bool): Collect transactions in a TransactionColumns instead of a list of dicts
+        vectorized (bool): Convert the transaction lines with the NumPy engine (see report_numpy.py)
+        summary_only (bool): Return only the metadata and summary, see parse_RPT002_summary
+    
+    Returns:
+        dict: Parsed data containing report metadata and transaction details
+    """
+    if summary_only:
+        return parse_RPT002_summary(raw_data, stats)
+
+    if columnar:
+        from report_columnar import TransactionColumns
+        transactions = TransactionColumns()
+    else:
+        transactions = []
+
+    parsed_data = {
+        'metadata': {},
+        'transactions': transactions,
+        'summary': {}
+    }
+    
+    # Transaction lines waiting for extraction, converted in batches of TRANSACTION_BATCH_LINES
+    transaction_lines = []
+    
+    for event, value in iter_transaction_lines(raw_data, stats):
+        if event == 'line':
+            transaction_lines.append(value)
+            if len(transaction_lines) >= TRANSACTION_BATCH_LINES:
+                add_transactions(transactions, transaction_lines, columnar, vectorized)
+                transaction_lines = []
+        elif event == 'metadata':
+            parsed_data['metadata'] = value
+        else:
+            parsed_data['summary'] = value
+
+    add_transactions(transactions, transaction_lines, columnar, vectorized)
+    
+    return parsed_data
+
+
+def iter_transactions(source, stats=None):
+    """
+    Stream an RPT002 report, yielding each transaction as its line is read
+
+    Only the current page and the memo page are held, so a register of any
+    size is parsed in constant memory. The transactions are the dicts
+    parse_RPT002 returns by default.
+
+    Args:
+        source: Report text, bytes-like contents, an open file or an os.PathLike path
+        stats (ParseStats): Optional counters for skipped lines
+
+    Yields:
+        tuple: ('metadata', dict) first, then ('transaction', dict) for every
+        transaction in report order, and ('summary', dict) with the memo
+        sales totals, rebates, codes legend and transaction counts last
+    """
+    layout = TRANSACTION_LAYOUT
+    for event, value in iter_transaction_lines(source, stats):
+        if event == 'line':
+            yield 'transaction', sign_credit_memo(layout.extract(value), value)
+        else:
+            yield event, value
+
+
+def iter_transaction_lines(source, stats=None):
+    """
+    Scan an RPT002 report page by page, yielding its transaction lines unconverted
+
+    Args:
+        source: Report text, bytes-like contents, an open file or an os.PathLike path
+        stats (ParseStats): Optional counters for skipped lines
+
+    Yields:
+        tuple: ('metadata', dict) first, ('line', str) for every transaction line
+        of at least 75 characters, and ('summary', dict) last
+    """
+    if isinstance(source, os.PathLike):
+        with open_source(os.fspath(source)) as data:
+            yield from iter_transaction_lines(data, stats)
+        return
+
+    # The memo is on the last page, the one before the page delimiter at EOF if there is one
+    previous_page = last_page = ''
+    
+    # Parse transaction register report, one page at a time
+    for page in read_pages(source):
+        previous_page, last_page = last_page, page.text
+        lines = page.lines
+        
+        # Parse metadata (from first page)
+        if page.index == 0:
+            metadata = {}
+            if len(lines) > 3:
+                metadata.update(page.header)
+                metadata['report_type'] = 'Transaction Register'
+            yield 'metadata', metadata
+        
+        # Process transaction data lines
+        for line in lines:
+            if '-----MEMO-----' in line:
+                break
+            # Skip header, footer and separator lines
+            if (not line.strip() or 
+                '-----' in line or 
+                'Page' in line or 
+                'TRANSACTION REGISTER' in line.upper() or
+                'End of Report' in line or
+                'Inv #' in line):
+                continue
+                
+            # Identify transaction data lines - typically start with transaction type
+            if line.strip().startswith(TRANSACTION_TYPES):
+                # Ensure line has minimum length, at least up to transaction_total position
+                if len(line) < 75:
+                    if stats is not None:
+                        stats.skip('short_transaction_line')
+                    continue
+                yield 'line', line
+            elif stats is not None:
+                stats.skip('not_a_transaction')
+
+    # Parse memo section from the last page
+    if last_page == '':
+        last_page = previous_page
+    memo = {
+        'summary': {
+            'sales_totals': {},
+            'rebates': {},
+            'codes_legend': {},
+            'transaction_counts': {}
+        }
+    }
+    parse_memo_section(last_page, memo, stats)
+    yield 'summary', memo['summary']
+
+
+def parse_RPT002_summary(raw_data, stats=None):
+    """
+    Parse only the metadata and the memo summary of a Transaction Register (RPT002)
+
+    Reads the first page for the metadata and the memo page, found by a
+    reverse scan from the end, for the summary; the transaction pages in
+    between are never decoded, so the cost does not grow with the register.
+    An open file has to be read through to reach its end, but only the first
+    and the last two pages are kept.
+
+    Args:
+        raw_data: Report text, bytes-like contents, an open file or an os.PathLike path
+        stats (ParseStats): Optional counters for skipped lines
+
+    Returns:
+        dict: 'metadata' and 'summary' as parse_RPT002 returns them
+    """
+    if isinstance(raw_data, os.PathLike):
+        with map_report(os.fspath(raw_data)) as data:
+            return parse_RPT002_summary(data, stats)
+    raw_data = report_input(raw_data)
+
+    parsed_data = {
+        'metadata': {},
+        'summary': {
+            'sales_totals': {},
+            'rebates': {},
+            'codes_legend': {},
+            'transaction_counts': {}
+        }
+    }
+
+    pages = read_pages(raw_data)
+    first_page = next(pages)
+    if is_stream(raw_data):
+        pages = list(deque(chain([first_page], pages), maxlen=2))
+    else:
+        pages = read_last_pages(raw_data, 2)
+
+    if len(first_page.lines) > 3:
+        parsed_data['metadata'].update(first_page.header)
+        parsed_data['metadata']['report_type'] = 'Transaction Register'
+
+    # The memo is on the last page, the one before the page delimiter at EOF if there is one
+    memo_page = pages[-1].text
+    if memo_page == '' and len(pages) > 1:
+        memo_page = pages[-2].text
+    parse_memo_section(memo_page, parsed_data, stats)
+
+    return parsed_data
+
+
+def add_transactions(transactions, lines, columnar=False, vectorized=False):
+    """
+    Extract a batch of transaction lines and add them to the result
+
+    Args:
+        transactions (list or TransactionColumns): parse_RPT002 result to extend
+        lines (list): Transaction lines, at least 75 characters each
+        columnar (bool): transactions is a TransactionColumns
+        vectorized (bool): Convert the lines with the NumPy engine (see report_numpy.py)
+    """
+    if not lines:
+        return
+    if columnar and vectorized:
+        # Bulk-converted columns go into the TransactionColumns without a dict per transaction
+        columns = TRANSACTION_LAYOUT.extract_columns(lines, vectorized=True)
+        sign_credit_memo_columns(columns, lines)
+        transactions.extend(columns)
+    else:
+        extracted = TRANSACTION_LAYOUT.extract_many(lines, vectorized=vectorized)
+        for line, transaction in zip(lines, extracted):
+            transactions.append(sign_credit_memo(transaction, line))
+
+
+def strip_or_none(value):
+    """Strip a text column, empty columns become None"""
+    value = value.strip()
+    return value if value else None
+
+
+# RPT002 transaction line, lines are padded to 130 characters before slicing
+TRANSACTION_LAYOUT = FixedWidthLayout([
+    Field('transaction_type', 0, 8, strip_or_none, 'category'),
+    Field('inv_number', 8, 15, strip_or_none),
+    Field('customer', 15, 24, strip_or_none),
+    Field('employee', 24, 31, strip_or_none, 'category'),
+    Field('salesrep', 31, 39, strip_or_none, 'category'),
+    Field('cashier', 39, 47, strip_or_none, 'category'),
+    Field('purchase_order', 47, 75, strip_or_none),
+    Field('transaction_total', 75, 87, to_float, 'float'),
+    Field('net_sales', 87, 97, to_float, 'float'),
+    Field('cost', 97, 107, to_float, 'float'),
+    Field('gross_profit_amount', 107, 117, to_float, 'float'),
+    Field('gross_profit_percent', 117, 125, to_float, 'float'),
+    # Codes run from column 125 to the end of the line
+    Field('codes', 125, None, strip_or_none),
+], width=130)
+
+
+def parse_transaction_line(line, stats=None):
+    """
+    Parse a single transaction line from the RPT002 report using fixed-width positions
+    
+    Args:
+        line (str): A transaction line from the report
+        stats (ParseStats): Optional counters for skipped lines
+        
+    Returns:
+        dict: Parsed transaction data
+    """
+    # Ensure line has minimum length
+    if len(line) < 75:  # At least up to transaction_total position
+        if stats is not None:
+            stats.skip('short_transaction_line')
+        return None
+    
+    try:
+        # Fixed-width field extraction, empty fields come back as None
+        return sign_credit_memo(TRANSACTION_LAYOUT.extract(line), line)
+        
+    except Exception as e:
+        # Return None for any parsing issues
+        if stats is not None:
+            stats.skip('malformed_transaction')
+        return None
+
+
+def sign_credit_memo(transaction, line):
+    """
+    Special handling for CR MEM (credit memo) - ensure negative values
+
+    Args:
+        transaction (dict): Fields extracted from the line with TRANSACTION_LAYOUT
+        line (str): The transaction line itself
+
+    Returns:
+        dict: The same transaction, with credit memo amounts negated
+    """
+    if transaction['transaction_type'] == 'CR MEM':
+        for field in ('transaction_total', 'net_sales', 'cost'):
+            value = transaction[field]
+            if value and not str(value).startswith('-'):
+                transaction[field] = -abs(value)
+        gross_profit_amount = transaction['gross_profit_amount']
+        gross_profit_amount_str = line[107:117].strip()
+        if gross_profit_amount and not gross_profit_amount_str.startswith('-'):
+            # Don't force negative if it was intentionally positive
+            # (sometimes CR MEMs can have positive profit amounts)
+            if gross_profit_amount_str:
+                transaction['gross_profit_amount'] = -abs(gross_profit_amount)
+    return transaction
+
+
+# Fields sign_credit_memo reads or changes
+CREDIT_MEMO_FIELDS = ('transaction_type', 'transaction_total', 'net_sales', 'cost', 'gross_profit_amount')
+
+
+def sign_credit_memo_columns(columns, lines):
+    """
+    Apply sign_credit_memo to transactions held column by column
+
+    Args:
+        columns (dict): Field -> sequence of values, from TRANSACTION_LAYOUT.extract_columns
+        lines (list): The transaction lines the columns were extracted from
+    """
+    for index, transaction_type in enumerate(columns['transaction_type']):
+        if transaction_type == 'CR MEM':
+            transaction = {field: columns[field][index] for field in CREDIT_MEMO_FIELDS}
+            sign_credit_memo(transaction, lines[index])
+            for field in CREDIT_MEMO_FIELDS:
+                columns[field][index] = transaction[field]
+
+
+def parse_memo_section(page_data, parsed_data, stats=None):
+    """
+    Parse the memo section that appears on the last page of RPT002 reports
+    
+    Args:
+        page_data (str): The last page content
+        parsed_data (dict): The data structure to update with memo information
+        stats (ParseStats): Optional counters for skipped lines
+    """
+    lines = page_data.strip().split('\n')
+    
+    # Find the memo section marker
+    memo_index = -1
+    for i, line in enumerate(lines):
+        if '-----MEMO-----' in line:
+            memo_index = i
+            break
+    
+    if memo_index == -1:
+        return  # No memo section found
+    
+    # Process the lines after the memo marker
+    current_section = None
+    
+    for i in range(memo_index + 1, len(lines)):
+        line = lines[i].strip()
+
+        # Skip empty lines and separator lines
+        if not line or '------' in line or '***' in line:
+            continue
+        
+        # Process content
+        if not ('#' in line and 'Transactions' in line):
+            line = lines[i]
+            # sales_total_section
+            sales_parts = line[:45].split()
+            if len(sales_parts) == 2:
+                type = sales_parts[0]
+                amount = to_float(sales_parts[1])
+                parsed_data['summary']['sales_totals'][type] = amount
+            elif len(sales_parts) == 3:
+                type = sales_parts[0] + ' ' + sales_parts[1]
+                amount = to_float(sales_parts[2])
+                parsed_data['summary']['sales_totals'][type] = amount
+
+            # rebates_section
+            rebates_parts = line[48:82].split()
+            if len(rebates_parts) == 2:
+                type = rebates_parts[0]
+                amount = to_float(rebates_parts[1])
+                parsed_data['summary']['rebates'][type] = amount
+            elif len(rebates_parts) == 3:
+                type = rebates_parts[0] + ' ' + rebates_parts[1]
+                amount = to_float(rebates_parts[2])
+                parsed_data['summary']['rebates'][type] = amount
+            elif len(rebates_parts) == 4:
+                type = rebates_parts[0] + ' ' + rebates_parts[1] + ' ' + rebates_parts[2]
+                amount = to_float(rebates_parts[3])
+                parsed_data['summary']['rebates'][type] = amount
+
+            # codes_legend_section
+            parts = line[85:].split(' = ')
+            if len(parts) == 2:
+                    code = parts[0].strip()
+                    description = parts[1].strip()
+                    parsed_data['summary']['codes_legend'][code] = description
+
+        # Handle transaction counts section (part of sales totals)
+        if 'of ' in line and 'Transaction' in line:
+            try:
+                parts = line.split('of')
+                if len(parts) == 2 and 'Transaction' in parts[1]:
+                    count_type = parts[1].split('Transaction')[0].strip().lower() + '_transactions'
+                    count_value = int(line.split()[-1]) if line.split()[-1].isdigit() else 0
+                    parsed_data['summary']['transaction_counts'][count_type] = count_value
+            except (ValueError, IndexError):
+                if stats is not None:
+                    stats.skip('malformed_memo_line')
+        
+        # Handle total transaction count
+        elif 'Total Transaction Count' in line:
+            try:
+                total_count = int(line.split()[-1]) if line.split()[-1].isdigit() else 0
+                parsed_data['summary']['transaction_counts']['total'] = total_count
+            except (ValueError, IndexError):
+                if stats is not None:
+                    stats.skip('malformed_memo_line')
+        
+        # elif current_section == 'codes_legend':
+        #     if ' = ' in line:
+        #         parts = line.split(' = ', 1)
+        #         if len(parts) == 2:
+        #             code = parts[0].strip()
+        #             description = parts[1].strip()
+        #             parsed_data['summary']['codes_legend'][code] = description
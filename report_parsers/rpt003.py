@@ -0,0 +1,131 @@
+from report_layout import Field, FixedWidthLayout
+from report_pages import read_pages
+from report_parser import ReportParser
+from report_tokens import to_float, to_int
+
+
+# RPT003 quarter hour lines, today and month-to-date halves
+QUARTER_HOUR_TODAY_LAYOUT = FixedWidthLayout([
+    Field('cash_sales', 10, 20, to_float, 'float'),
+    Field('charge_sales', 20, 30, to_float, 'float'),
+    Field('perc_of_sales', 30, 37, to_float, 'float'),
+    Field('number_of_invoices', 37, 44, to_int, 'int'),
+    Field('number_of_lines', 44, 54, to_int, 'int'),
+    Field('perc_of_lines', 54, 67, to_float, 'float'),
+])
+QUARTER_HOUR_MTD_LAYOUT = FixedWidthLayout([
+    Field('cash_sales', 67, 77, to_float, 'float'),
+    Field('charge_sales', 77, 87, to_float, 'float'),
+    Field('perc_of_sales', 87, 94, to_float, 'float'),
+    Field('number_of_invoices', 94, 101, to_int, 'int'),
+    Field('number_of_lines', 101, 111, to_int, 'int'),
+    Field('perc_of_lines', 111, None, to_float, 'float'),
+])
+
+# RPT003 Total line, the MTD counts sit one column further right than on the time lines
+QUARTER_HOUR_TOTAL_TODAY_LAYOUT = FixedWidthLayout([
+    Field('cash_sales', 10, 20, to_float, 'float'),
+    Field('charge_sales', 20, 30, to_float, 'float'),
+    Field('number_of_invoices', 37, 44, to_int, 'int'),
+    Field('number_of_lines', 44, 54, to_int, 'int'),
+])
+QUARTER_HOUR_TOTAL_MTD_LAYOUT = FixedWidthLayout([
+    Field('cash_sales', 67, 77, to_float, 'float'),
+    Field('charge_sales', 77, 87, to_float, 'float'),
+    Field('number_of_invoices', 95, 102, to_int, 'int'),
+    Field('number_of_lines', 102, None, to_int, 'int'),
+])
+
+@ReportParser.register_parser("003", options=('vectorized',))
+def parse_RPT003(raw_data, stats=None, vectorized=False):
+    """
+    Parse the Transaction Activity by Quarter Hour report (RPT003)
+    
+    Args:
+        raw_data (str): Raw ASCII report data
+        stats (ParseStats): Optional counters for skipped lines
+        vectorized (bool): Convert the quarter hour lines with the NumPy engine (see report_numpy.py)
+    
+    Returns:
+        dict: Parsed data containing report metadata and transaction activity by time
+    """
+    parsed_data = {
+        'metadata': {},
+        'time_periods': {},
+        'totals': {
+            'today': {},
+            'mtd': {}
+        }
+    }
+    
+    # Time periods and their lines from every page, extracted in one batch after the page loop
+    time_periods = []
+    period_lines = []
+    
+    # Parse report pages, one at a time
+    for page in read_pages(raw_data):
+        lines = page.lines
+        
+        # Parse metadata (from first page)
+        if page.index == 0 and len(lines) > 3:
+            parsed_data['metadata'].update(page.header)
+            parsed_data['metadata']['report_type'] = 'Transaction by Quarter Hour'
+        
+        # Find the data section
+        data_start_line = None
+        for i, line in enumerate(lines):
+            if '---------' in line and 'Time' in lines[i-1]:
+                data_start_line = i + 1
+                break
+        
+        if data_start_line is None:
+            if stats is not None:
+                stats.skip('page_without_data')
+            continue  # No data section found on this page
+        
+        # Process data lines until we hit the totals or end of data
+        line_index = data_start_line
+        while line_index < len(lines):
+            line = lines[line_index]
+            
+            # Ensure line is padded to required length to avoid index errors
+            if len(line) < 120:
+                line = line.ljust(120)
+            
+            # Check if we've reached the totals line
+            if 'Total' in line and line.strip().startswith('Total'):
+                # Use fixed indexes for total line
+                parsed_data['totals']['today'] = QUARTER_HOUR_TOTAL_TODAY_LAYOUT.extract(line)
+                parsed_data['totals']['mtd'] = QUARTER_HOUR_TOTAL_MTD_LAYOUT.extract(line)
+                break
+            
+            # Skip empty lines or separator lines
+            if not line.strip() or '---' in line or '*' in line or 'End of Report' in line:
+                line_index += 1
+                continue
+            
+            # Extract time using fixed index
+            time_period = line[0:9].strip()
+            
+            # Validate this is a time entry (contains ":" and AM/PM)
+            if ':' in time_period and ('AM' in time_period or 'PM' in time_period):
+                time_periods.append(time_period)
+                period_lines.append(line)
+
+            elif stats is not None:
+                stats.skip('not_a_time_period')
+            
+            line_index += 1
+
+    # Extract today's and MTD data using fixed column indices
+    today_data = QUARTER_HOUR_TODAY_LAYOUT.extract_many(period_lines, vectorized=vectorized)
+    mtd_data = QUARTER_HOUR_MTD_LAYOUT.extract_many(period_lines, vectorized=vectorized)
+
+    # A time period repeated on a later page keeps its position and takes the later values
+    for time_period, today, mtd in zip(time_periods, today_data, mtd_data):
+        parsed_data['time_periods'][time_period] = {
+            'today': today,
+            'mtd': mtd
+        }
+    
+    return parsed_data
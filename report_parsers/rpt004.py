@@ -0,0 +1,121 @@
+from report_layout import Field, FixedWidthLayout
+from report_pages import page_header, read_pages
+from report_parser import ReportParser
+from report_tokens import to_float
+
+
+# RPT004 description column and value columns, to_float handles the overflow markers and commas
+JOURNAL_DESCRIPTION = slice(0, 33)
+JOURNAL_LAYOUT = FixedWidthLayout([
+    Field('today_current', 33, 44, to_float),
+    Field('today_last_year', 44, 55, to_float),
+    Field('percent_change', 56, 63, to_float),
+    Field('mtd_current', 64, 74, to_float),
+    Field('mtd_last_year', 75, 86, to_float),
+    Field('mtd_percent_change', 87, 94, to_float),
+    Field('ytd_current', 95, 107, to_float),
+    Field('ytd_last_year', 107, 119, to_float),
+    Field('ytd_percent_change', 120, 128, to_float),
+])
+
+@ReportParser.register_parser("004")
+def parse_RPT004(raw_data, stats=None):
+    """
+    Parse the Sales Journal report (RPT004) using fixed-width columns
+    
+    Args:
+        raw_data (str): Raw ASCII report data
+        stats (ParseStats): Optional counters for skipped lines
+    
+    Returns:
+        dict: Parsed data containing metadata and sales data by category
+    """
+    parsed_data = {
+        'metadata': {},
+        'categories': {},
+    }
+    
+    # Track the current category for hierarchical data organization
+    current_category = None
+    current_subcategory = None
+    
+    # Split into pages and lines, one page at a time
+    for page in read_pages(raw_data):
+        # Columns are counted from the left margin, so the page is not stripped
+        lines = page.raw_lines
+        
+        # Extract metadata from the header (first page only)
+        if page.index == 0 and len(lines) > 2:
+            parsed_data['metadata'].update(page_header(lines))
+            parsed_data['metadata']['report_type'] = 'Sales Journal'
+        
+        # Skip header lines and find where data begins
+        data_start = 0
+        for i, line in enumerate(lines):
+            if 'Today' in line and 'MTD' in line and 'YTD' in line:
+                data_start = i + 2  # Skip the header and separator line
+                break
+        
+        # Process data lines
+        for line_index in range(data_start, len(lines)):
+            current_subcategory = None
+            line = lines[line_index]
+            
+            # Exit when we reach the ending section
+            if line.startswith("**"):
+                return parsed_data
+            
+            if '----------- Memo -------------' in line: # memo section header
+                continue
+            
+            # Skip empty lines and separator lines
+            if not line.strip() or all(c == '-' for c in line.strip()):
+                continue
+            
+            # Extract the description and determine if it's a category or subcategory
+            desc = line[JOURNAL_DESCRIPTION].strip()
+            if not desc:
+                continue
+                
+            # Determine if this is a main category, subcategory, or data line
+            if line.startswith('  ') and not line.startswith('    '):
+                # This is a main category (like "Merchandise Sales")
+                current_category = desc.strip()
+                current_subcategory = None
+                
+                # Initialize the category in our data structure
+                if current_category not in parsed_data['categories']:
+                    parsed_data['categories'][current_category] = {
+                        'data': {},
+                        'subcategories': {}
+                    }
+            
+            elif line.startswith('    '):
+                # This is a subcategory (like "Cost" under "Merchandise Sales")
+                current_subcategory = desc.strip()
+                
+                # Initialize the subcategory if needed
+                if current_category and current_subcategory:
+                    if current_subcategory not in parsed_data['categories'][current_category]['subcategories']:
+                        parsed_data['categories'][current_category]['subcategories'][current_subcategory] = {}
+            
+            # Extract values using fixed column positions
+            if current_category:
+                data = JOURNAL_LAYOUT.extract(line)
+                has_data = any(value is not None for value in data.values())
+                
+                # Only store if we actually parsed some data
+                if has_data:
+                    # Store the data in the appropriate place
+                    if current_subcategory:
+                        # This is subcategory data
+                        parsed_data['categories'][current_category]['subcategories'][current_subcategory] = data
+                    else:
+                        # This is main category data
+                        parsed_data['categories'][current_category]['data'] = data
+                elif stats is not None:
+                    stats.skip('no_values')
+            elif stats is not None:
+                stats.skip('outside_category')
+    
+    return parsed_data
@@ -0,0 +1,245 @@
+import re
+from itertools import chain, islice
+
+from report_layout import Field, FixedWidthLayout
+from report_pages import read_lines
+from report_parser import ReportParser
+from report_tokens import to_float, to_int
+
+
+@ReportParser.register_parser("083")
+def parse_RPT083(raw_data, stats=None):
+    """
+    Parse the Inventory Effectiveness report (RPT083) using precise fixed-width columns
+    
+    Args:
+        raw_data (str): Raw ASCII report data
+        stats (ParseStats): Optional counters for skipped lines
+    
+    Returns:
+        dict: Parsed data containing report metadata and inventory metrics
+    """
+    parsed_data = {
+        'metadata': {},
+        'inventory': {
+            'instore_items': {},
+            'non_instore_items': {},
+            'merchandise_total': {},
+            'lost_sales': {},
+            'total_merchandise_and_lost': {}
+        },
+        'ratings': {}
+    }
+    
+    # Parse the report one line at a time, lines are split on '\n' only so form feeds stay inside them
+    source = read_lines(raw_data)
+    lines = list(islice(source, 2))
+    
+    # Extract metadata from header
+    if len(lines) > 1:
+        # Get report date and time from first line
+        if len(lines[0]) >= 20:
+            date_time = lines[0][:20].strip()
+            if date_time:
+                parsed_data['metadata']['report_date'] = date_time
+        
+        parsed_data['metadata']['report_type'] = 'Inventory Effectiveness'
+        
+        # Get store information from second line
+        if " - " in lines[1]:
+            store_parts = lines[1].split(' - ', 1)
+            if len(store_parts) >= 2:
+                store_id = store_parts[0].strip()
+                # Extract accounting day if present
+                if "Accounting Day" in store_parts[1]:
+                    store_name_parts = store_parts[1].split("Accounting Day", 1)
+                    parsed_data['metadata']['store_name'] = store_name_parts[0].strip()
+                    
+                    # Extract accounting day number
+                    if "-" in store_name_parts[1]:
+                        acct_day = store_name_parts[1].split("-")[1].strip()
+                        # Get just the number part
+                        day_match = re.search(r'\d+', acct_day)
+                        if day_match:
+                            parsed_data['metadata']['accounting_day'] = day_match.group()
+                else:
+                    parsed_data['metadata']['store_name'] = store_parts[1].strip()
+                
+                parsed_data['metadata']['store_id'] = store_id
+    
+    # Find the data section (skip header); the lines before it are only kept
+    # because without one the whole report is read as data
+    source = chain(lines, source)
+    leading = []
+    data_lines = leading
+    for line in source:
+        if "Merchandise Inventory" in line and "Today" in line and "MTD" in line:
+            next(source, None)  # Skip the header row and separator
+            data_lines = source
+            break
+        leading.append(line)
+    
+    # Process data lines using precise fixed width columns
+    for line in data_lines:
+        
+        # Skip empty lines and separators
+        if not line.strip() or all(c == '-' or c.isspace() for c in line):
+            continue
+            
+        # Check if we've reached the end of data section
+        if "* * Rating * *" in line:
+            # Extract ratings with proper column handling
+            parsed_data['ratings'] = RATING_LAYOUT.extract(line)
+            break  # Exit after capturing ratings as specified
+            
+        # Skip explanatory text
+        if any(x in line for x in ["An item is", "The initial", "Any other part"]):
+            if stats is not None:
+                stats.skip('explanatory_text')
+            continue
+            
+        # Process data lines by identifying the section
+        section = None
+        
+        # Identify which section we're looking at
+        if len(line) >= 56:
+            section_text = line[:56].strip()
+            if "Non-Instore Items" in section_text:
+                section = 'non_instore_items'
+            elif "Instore Items" in section_text:
+                section = 'instore_items'
+            elif "Merchandise Total" in section_text:
+                section = 'merchandise_total'
+            elif "Lost Sales" in section_text:
+                section = 'lost_sales'
+            elif "Total Merchandise & Lost" in section_text or "Total Merchandise and Lost" in section_text:
+                section = 'total_merchandise_and_lost'
+                
+        if section:
+            # Extract all values using precise column positions
+            parsed_data['inventory'][section] = INVENTORY_LAYOUT.extract(line)
+        elif stats is not None:
+            stats.skip('unknown_section')
+        
+    return parsed_data
+
+
+PERCENTAGE_PATTERN = re.compile(r'(\d+\.\d+|\d+)\s*%')
+
+
+def _leading_chars(value, allowed):
+    """Cut value at the first character that is neither a digit nor in allowed"""
+    for i, char in enumerate(value):
+        if not (char.isdigit() or char in allowed):
+            return value[:i]
+    return value
+
+
+def last_inventory_count(value):
+    """Convert the last RPT083 count column, ignoring anything trailing the number"""
+    return to_int(_leading_chars(value.strip(), ',-'))
+
+
+def rating_percent(value):
+    """
+    Convert an RPT083 rating column such as '87.50%'
+
+    Args:
+        value (str): Raw column text
+
+    Returns:
+        float or None: The percentage, or None if not found
+    """
+    # Plain cells ('87.50%', '-12.5%') go straight to to_float, odd ones to the search below
+    text = value.rstrip()
+    percent = to_float(text[:-1] if text.endswith('%') else text)
+    if percent is not None:
+        return percent
+
+    substring = value.strip()
+    if not substring:
+        return None
+
+    # Find the percentage value - look for digits followed by %
+    match = PERCENTAGE_PATTERN.search(substring)
+    if match:
+        return float(match.group(1))
+
+    # If no explicit % symbol, try to convert the whole string if it looks like a number
+    clean_value = substring.replace('%', '').strip()
+    if clean_value and any(c.isdigit() for c in clean_value):
+        try:
+            return float(clean_value)
+        except ValueError:
+            return None
+    return None
+
+
+def last_rating_percent(value):
+    """Convert the last RPT083 rating column, ignoring anything trailing the percentage"""
+    return rating_percent(_leading_chars(value.strip(), '.% '))
+
+
+# RPT083 value columns: Today 56-66, MTD 66-79, YTD 79-92, Last Year 92 to the end
+INVENTORY_LAYOUT = FixedWidthLayout([
+    Field('total_today', 56, 66, to_int),
+    Field('total_mtd', 66, 79, to_int),
+    Field('total_ytd', 79, 92, to_int),
+    Field('total_last_year', 92, None, last_inventory_count),
+])
+RATING_LAYOUT = FixedWidthLayout([
+    Field('today_percent', 56, 66, rating_percent),
+    Field('mtd_percent', 66, 79, rating_percent),
+    Field('ytd_percent', 79, 92, rating_percent),
+    Field('last_year_percent', 92, None, last_rating_percent),
+])
+
+# Column start index -> (slice, converter) for extract_value and extract_percentage
+INVENTORY_COLUMNS = {
+    25: (slice(25, 56), to_int),  # Merchandise Inventory (variable width)
+    56: (slice(56, 66), to_int),
+    66: (slice(66, 79), to_int),
+    79: (slice(79, 92), to_int),
+    92: (slice(92, None), last_inventory_count),
+}
+RATING_COLUMNS = {
+    56: (slice(56, 66), rating_percent),
+    66: (slice(66, 79), rating_percent),
+    79: (slice(79, 92), rating_percent),
+    92: (slice(92, None), last_rating_percent),
+}
+
+
+def extract_value(line, index):
+    """
+    Extract a numeric value from a fixed position in a line based on column width,
+    handling various formats including commas
+    
+    Args:
+        line (str): The line of text
+        index (int): The starting index position
+        
+    Returns:
+        int or None: The extracted value as an integer, or None if not found
+    """
+    if index not in INVENTORY_COLUMNS:
+        return None
+    column, convert = INVENTORY_COLUMNS[index]
+    return convert(line[column])
+
+
+def extract_percentage(line, index):
+    """
+    Extract a percentage value from a fixed position in a line based on proper column width
+    
+    Args:
+        line (str): The line of text
+        index (int): The starting index position
+        
+    Returns:
+        float or None: The extracted percentage as a float, or None if not found
+    """
+    if index not in RATING_COLUMNS:
+        return None
+    column, convert = RATING_COLUMNS[index]
+    return convert(line[column])
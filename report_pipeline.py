@@ -0,0 +1,197 @@
+import time
+import asyncio
+
+from report_io import DECOMPRESSORS, READERS
+
+# Items a queue between two stages holds before the stage feeding it has to wait
+QUEUE_SIZE = 8
+
+
+class StageStats:
+    """
+    Where the tasks of one pipeline stage spent their time
+
+    busy is the time spent on items, starved the time spent waiting for the
+    previous stage and blocked the time spent waiting for room in the queue
+    to the next stage, each summed over the stage's tasks. A stage busy close
+    to all the time while the others starve or block is the bottleneck.
+
+    Args:
+        name (str): Stage name
+        concurrency (int): Number of tasks running the stage
+    """
+
+    def __init__(self, name, concurrency):
+        self.name = name
+        self.concurrency = concurrency
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+
+    def as_dict(self, elapsed):
+        """
+        Summarize the stage over a run
+
+        Args:
+            elapsed (float): Wall-clock seconds of the run
+
+        Returns:
+            dict: items, concurrency, and busy, starved and blocked as fractions of
+            the time the stage's tasks were available (elapsed times concurrency)
+        """
+        available = max(elapsed * self.concurrency, 1e-9)
+        return {
+            'items': self.items,
+            'concurrency': self.concurrency,
+            'busy': self.busy / available,
+            'starved': self.starved / available,
+            'blocked': self.blocked / available,
+        }
+
+
+class Item:
+    """A report file travelling through the pipeline, numbered in scan order"""
+
+    __slots__ = ('number', 'job', 'payload', 'result')
+
+    def __init__(self, number, job, result=None):
+        self.number = number
+        self.job = job
+        self.payload = None
+        self.result = result
+
+
+async def run_stage(stats, inbox, outbox, work, next_concurrency=1):
+    """
+    Run one stage's tasks until the previous stage is done, then tell the next stage
+
+    Args:
+        stats (StageStats): Counters of the stage, its concurrency is the number of tasks started
+        inbox (asyncio.Queue): Items from the previous stage, one None per task marks the end
+        outbox (asyncio.Queue): Queue of the next stage, None for the last stage
+        work (coroutine function): Item -> None, processes the item in place
+        next_concurrency (int): Number of tasks of the next stage, each gets a None at the end
+    """
+    async def task():
+        while True:
+            start = time.perf_counter()
+            item = await inbox.get()
+            stats.starved += time.perf_counter() - start
+            if item is None:
+                return
+            start = time.perf_counter()
+            await work(item)
+            stats.busy += time.perf_counter() - start
+            stats.items += 1
+            if outbox is not None:
+                start = time.perf_counter()
+                await outbox.put(item)
+                stats.blocked += time.perf_counter() - start
+
+    await asyncio.gather(*(task() for _ in range(stats.concurrency)))
+    if outbox is not None:
+        for _ in range(next_concurrency):
+            await outbox.put(None)
+
+
+async def run_pipeline(directories, scan, read, decompress, parse, write, thread_pool, process_pool,
+                       parsers=1, readers=READERS, decompressors=DECOMPRESSORS, queue_size=QUEUE_SIZE,
+                       lookup=None):
+    """
+    Ingest report files through concurrent scan, read, decompress, parse and write stages
+
+    The stages are connected by bounded queues, so a slow stage holds the
+    earlier ones back instead of letting items pile up in memory. Scanning,
+    reads and decompression (zlib releases the GIL) run in thread_pool,
+    parsing in process_pool. A single writer hands the results to write in
+    scan order on the event loop's own thread, keeping at most a fixed window
+    of items in flight so a slow file cannot make the finished ones behind it
+    accumulate.
+
+    Args:
+        directories (list): Directories to scan, in order
+        scan (callable): Directory -> list of jobs, (real_date, report_type, file_path) tuples
+        read (callable): File path -> file contents as bytes
+        decompress (callable): Job and file contents -> report contents as bytes
+        parse (callable): Picklable function of job and report contents -> result
+        write (callable): Called with each job and its result in scan order, on the thread running
+                          the event loop
+        thread_pool (concurrent.futures.ThreadPoolExecutor): Runs scan, read and decompress,
+                                                             needs readers + decompressors + 1 threads
+        process_pool (concurrent.futures.ProcessPoolExecutor): Runs parse
+        parsers (int): Parses in flight, usually the number of processes
+        readers (int): Concurrent file reads
+        decompressors (int): Concurrent decompressions
+        queue_size (int): Capacity of every queue between two stages
+        lookup (callable): Optional job -> result for files that need no parsing, or None
+
+    Returns:
+        dict: Stage name -> StageStats.as_dict over the run, plus 'seconds' of the run
+    """
+    loop = asyncio.get_running_loop()
+    stages = {name: StageStats(name, concurrency) for name, concurrency in (
+        ('scan', 1), ('read', readers), ('decompress', decompressors), ('parse', parsers), ('write', 1))}
+    to_read, to_decompress, to_parse, to_write = (asyncio.Queue(queue_size) for _ in range(4))
+    # Items scanned but not written yet, bounded so the writer's reorder buffer is too
+    window = asyncio.Semaphore(queue_size * 4 + readers + decompressors + parsers)
+
+    async def scan_stage():
+        stats = stages['scan']
+        number = 0
+        for directory in directories:
+            start = time.perf_counter()
+            jobs = await loop.run_in_executor(thread_pool, scan, directory)
+            stats.busy += time.perf_counter() - start
+            for job in jobs:
+                start = time.perf_counter()
+                result = await loop.run_in_executor(thread_pool, lookup, job) if lookup else None
+                stats.busy += time.perf_counter() - start
+                start = time.perf_counter()
+                await window.acquire()
+                await to_read.put(Item(number, job, result))
+                stats.blocked += time.perf_counter() - start
+                stats.items += 1
+                number += 1
+        for _ in range(readers):
+            await to_read.put(None)
+
+    async def read_item(item):
+        if item.result is None:
+            item.payload = await loop.run_in_executor(thread_pool, read, item.job[2])
+
+    async def decompress_item(item):
+        if item.result is None:
+            item.payload = await loop.run_in_executor(thread_pool, decompress, item.job, item.payload)
+
+    async def parse_item(item):
+        if item.result is None:
+            item.result = await loop.run_in_executor(process_pool, parse, item.job, item.payload)
+            item.payload = None
+
+    finished = {}
+    next_number = 0
+
+    async def write_item(item):
+        nonlocal next_number
+        finished[item.number] = item
+        while next_number in finished:
+            ready = finished.pop(next_number)
+            # Called on the loop thread, the thread that opened the writer: a SQLite connection may only
+            # be used from the thread that created it
+            write(ready.job, ready.result)
+            window.release()
+            next_number += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        scan_stage(),
+        run_stage(stages['read'], to_read, to_decompress, read_item, decompressors),
+        run_stage(stages['decompress'], to_decompress, to_parse, decompress_item, parsers),
+        run_stage(stages['parse'], to_parse, to_write, parse_item),
+        run_stage(stages['write'], to_write, None, write_item),
+    )
+    elapsed = time.perf_counter() - start
+    report = {name: stats.as_dict(elapsed) for name, stats in stages.items()}
+    report['seconds'] = elapsed
+    return report
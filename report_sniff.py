@@ -0,0 +1,125 @@
+import os
+import zlib
+import datetime
+
+from report_io import is_compressed
+from report_pages import page_header
+
+# Bytes read from the start of a file, enough for the two header lines TAMS prints (about 130 characters each)
+SNIFF_SIZE = 512
+
+# Compressed bytes read at a time from a .z file, a header compresses to far less
+SNIFF_READ_SIZE = 4096
+
+
+def header_datetime(line):
+    """
+    Read the print date and time a TAMS header line starts with
+
+    Args:
+        line (str): First line of a report, e.g. '05/12/2014 06:12 PM   ...   (RPT001)'
+
+    Returns:
+        datetime.datetime or None: The print time, None if the line does not start with one
+    """
+    tokens = line.split(None, 3)
+    try:
+        month, day, year = tokens[0].split('/')
+        hour, minute = tokens[1].split(':')
+        hour = int(hour)
+        if len(tokens) > 2 and tokens[2] in ('AM', 'PM'):
+            hour = hour % 12 + (12 if tokens[2] == 'PM' else 0)
+        return datetime.datetime(int(year), int(month), int(day), hour, int(minute))
+    except (IndexError, ValueError):
+        return None
+
+
+def sniff_header(head):
+    """
+    Identify a report from the start of its contents
+
+    Every TAMS header line ends with the report tag, e.g. '(RPT001)', the
+    second line holds the store. Only the first two lines are looked at.
+
+    Args:
+        head (str or bytes): The first few hundred characters of the report or more
+
+    Returns:
+        dict or None: report_number ('001'), report_type ('RPT001'), store_id,
+        store_name and report_datetime (datetime.datetime), each of the last
+        three only when found; None if the first line carries no report tag
+    """
+    if not isinstance(head, str):
+        # A multi-byte character cut off at the end of the sample is dropped
+        head = bytes(head).decode('utf-8', errors='ignore')
+    lines = head.lstrip('\f').split('\n', 2)[:2]
+    first_line = lines[0].rstrip()
+    start = first_line.rfind('(RPT')
+    report_number = first_line[start + 4:-1]
+    if start < 0 or not first_line.endswith(')') or not report_number.isdigit():
+        return None
+
+    header = {'report_number': report_number, 'report_type': f"RPT{report_number}"}
+    store = page_header(lines)
+    for key in ('store_id', 'store_name'):
+        if key in store:
+            header[key] = store[key]
+    report_datetime = header_datetime(first_line)
+    if report_datetime is not None:
+        header['report_datetime'] = report_datetime
+    return header
+
+
+def read_head(file_path, size=SNIFF_SIZE):
+    """
+    Read the first bytes of a report file's contents
+
+    Compressed files are inflated with a bare zlib decompressor that stops
+    after size bytes of output, so usually only the first SNIFF_READ_SIZE
+    bytes of the file are read and no more than the header is inflated.
+
+    Args:
+        file_path (str): Path to a .PF or .PF.z file
+        size (int): Bytes of report contents wanted
+
+    Returns:
+        bytes: Up to size bytes, fewer only for shorter reports
+
+    Raises:
+        OSError: The file cannot be read
+        zlib.error: A .z file is not valid gzip data
+    """
+    with open(file_path, 'rb') as f:
+        if not is_compressed(file_path):
+            return f.read(size)
+        # 16 + MAX_WBITS expects a gzip header and trailer around the deflate stream
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        head = b''
+        while len(head) < size and not decompressor.eof:
+            chunk = f.read(SNIFF_READ_SIZE)
+            if not chunk:
+                break
+            head += decompressor.decompress(chunk, size - len(head))
+        return head
+
+
+def sniff_file(file_path, size=SNIFF_SIZE):
+    """
+    Identify a .PF or .PF.z report file by reading only its first bytes
+
+    The cost of classifying a file does not depend on the size of the report,
+    see read_head.
+
+    Args:
+        file_path (str or os.PathLike): Path to the report file
+        size (int): Bytes of report contents to read
+
+    Returns:
+        dict or None: See sniff_header; None also when the file cannot be read
+        or is not valid gzip data despite its .z suffix
+    """
+    try:
+        head = read_head(os.fspath(file_path), size)
+    except (OSError, zlib.error):
+        return None
+    return sniff_header(head)
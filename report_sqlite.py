@@ -0,0 +1,243 @@
+import json
+import sqlite3
+from operator import itemgetter
+
+from report_columnar import TRANSACTION_FIELDS, json_default
+from report_parsers.rpt001 import INVOICE_FIELDS, INVOICE_TYPES, SALES_FIELDS
+from report_parsers.rpt003 import QUARTER_HOUR_TODAY_LAYOUT
+from report_parsers.rpt004 import JOURNAL_LAYOUT
+
+# Rows written before the open transaction is committed, see ReportDatabase.add
+BATCH_ROWS = 50000
+
+# RPT083 columns, the inventory counts and the rating percentages share them
+INVENTORY_COLUMNS = ('today', 'mtd', 'ytd', 'last_year')
+INVENTORY_FIELDS = ('total_today', 'total_mtd', 'total_ytd', 'total_last_year')
+RATING_FIELDS = ('today_percent', 'mtd_percent', 'ytd_percent', 'last_year_percent')
+
+QUARTER_HOUR_FIELDS = QUARTER_HOUR_TODAY_LAYOUT.names
+JOURNAL_FIELDS = JOURNAL_LAYOUT.names
+
+# Column type of the values a converter or layout field kind produces
+SQL_TYPES = {int: 'INTEGER', float: 'REAL', 'int': 'INTEGER', 'float': 'REAL'}
+
+REPORTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id INTEGER PRIMARY KEY,
+    store_id TEXT NOT NULL,
+    store_name TEXT,
+    print_date TEXT NOT NULL,
+    accounting_day TEXT,
+    report_type TEXT NOT NULL,
+    printed TEXT,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS reports_by_store_date ON reports (store_id, print_date, report_type);
+CREATE INDEX IF NOT EXISTS reports_by_date ON reports (print_date, report_type);
+"""
+
+# Table of report rows -> its columns after report_id, as (name, type) pairs
+ROW_COLUMNS = {
+    'employee_metrics': ([('role', 'TEXT NOT NULL'), ('employee', 'TEXT')]
+                         + [(field, 'REAL') for field in SALES_FIELDS]
+                         + [(field, SQL_TYPES[kind]) for field, kind in zip(INVOICE_FIELDS, INVOICE_TYPES)]),
+    'transactions': ([('line', 'INTEGER NOT NULL')]
+                     + [(field, 'TEXT') for field in TRANSACTION_FIELDS[:7]]
+                     + [(field, 'REAL') for field in TRANSACTION_FIELDS[7:12]]
+                     + [(field, 'TEXT') for field in TRANSACTION_FIELDS[12:]]),
+    'quarter_hours': ([('time_period', 'TEXT'), ('period', 'TEXT NOT NULL')]
+                      + [(field.name, SQL_TYPES[field.kind]) for field in QUARTER_HOUR_TODAY_LAYOUT.fields]),
+    'journal_lines': ([('category', 'TEXT NOT NULL'), ('line', 'TEXT')]
+                      + [(field, 'REAL') for field in JOURNAL_FIELDS]),
+    'inventory_metrics': ([('metric', 'TEXT NOT NULL')]
+                          + [(column, 'NUMERIC') for column in INVENTORY_COLUMNS]),
+}
+
+# Built after a bulk load, an index maintained row by row would slow every insert down
+INDEXES = """
+CREATE INDEX IF NOT EXISTS employee_metrics_by_report ON employee_metrics (report_id);
+CREATE INDEX IF NOT EXISTS employee_metrics_by_employee ON employee_metrics (employee, role);
+CREATE INDEX IF NOT EXISTS transactions_by_report ON transactions (report_id);
+CREATE INDEX IF NOT EXISTS transactions_by_invoice ON transactions (inv_number);
+CREATE INDEX IF NOT EXISTS transactions_by_employee ON transactions (employee);
+CREATE INDEX IF NOT EXISTS quarter_hours_by_report ON quarter_hours (report_id);
+CREATE INDEX IF NOT EXISTS journal_lines_by_report ON journal_lines (report_id);
+CREATE INDEX IF NOT EXISTS inventory_metrics_by_report ON inventory_metrics (report_id);
+"""
+
+
+def create_table(table, columns):
+    """CREATE TABLE statement for a table of report rows, report_id first"""
+    definitions = ''.join(f",\n    {name} {column_type}" for name, column_type in columns)
+    return (f"CREATE TABLE IF NOT EXISTS {table} (\n"
+            f"    report_id INTEGER NOT NULL REFERENCES reports (report_id){definitions}\n);\n")
+
+
+def insert_statement(table, columns):
+    """INSERT of one row of a report rows table, report_id bound first"""
+    names = ['report_id'] + [name for name, _ in columns]
+    return f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+
+
+SCHEMA = REPORTS_SCHEMA + ''.join(create_table(table, columns) for table, columns in ROW_COLUMNS.items())
+
+
+def employee_rows(data):
+    """RPT001 employee and salesrep rows, the section totals with a NULL employee"""
+    def row(role, employee, entry):
+        # Rows without last year data lack the last fields, they are stored as NULL
+        sales = entry.get('sales', {})
+        invoice = entry.get('invoice', {})
+        return (role, employee) + tuple(map(sales.get, SALES_FIELDS)) + tuple(map(invoice.get, INVOICE_FIELDS))
+
+    for role in ('employee', 'salesrep'):
+        for employee, entry in data.get(f"{role}s", {}).items():
+            yield row(role, employee, entry)
+        total = data.get('totals', {}).get(role)
+        if total and (total.get('sales') or total.get('invoice')):
+            yield row(role, None, total)
+
+
+def transaction_rows(data):
+    """RPT002 transactions in report order, from a list of dicts or a TransactionColumns"""
+    transactions = data.get('transactions', [])
+    if hasattr(transactions, 'column'):
+        columns = [transactions.column(field) for field in TRANSACTION_FIELDS]
+        for field in TRANSACTION_FIELDS[7:12]:
+            nulls = transactions.null_mask(field)
+            index = TRANSACTION_FIELDS.index(field)
+            columns[index] = [None if null else value for value, null in zip(columns[index], nulls)]
+        return zip(range(len(transactions)), *columns)
+    fields = itemgetter(*TRANSACTION_FIELDS)
+    return ((line,) + fields(transaction) for line, transaction in enumerate(transactions))
+
+
+def quarter_hour_rows(data):
+    """RPT003 quarter hour slots, one row per slot and period, the totals with a NULL time_period"""
+    for time_period, periods in data.get('time_periods', {}).items():
+        for period, values in periods.items():
+            yield (time_period, period) + tuple(map(values.get, QUARTER_HOUR_FIELDS))
+    for period, values in data.get('totals', {}).items():
+        yield (None, period) + tuple(map(values.get, QUARTER_HOUR_FIELDS))
+
+
+def journal_rows(data):
+    """RPT004 category lines, the category's own line with a NULL line name"""
+    for category, entry in data.get('categories', {}).items():
+        if entry.get('data'):
+            yield (category, None) + tuple(map(entry['data'].get, JOURNAL_FIELDS))
+        for line, values in entry.get('subcategories', {}).items():
+            yield (category, line) + tuple(map(values.get, JOURNAL_FIELDS))
+
+
+def inventory_rows(data):
+    """RPT083 inventory counts per section and the rating percentages as metric 'rating_percent'"""
+    for metric, values in data.get('inventory', {}).items():
+        if values:
+            yield (metric,) + tuple(map(values.get, INVENTORY_FIELDS))
+    ratings = data.get('ratings')
+    if ratings:
+        yield ('rating_percent',) + tuple(map(ratings.get, RATING_FIELDS))
+
+
+# Report type -> (table, row function, result keys the table holds); the remaining keys go to reports.extra
+REPORT_TABLES = {
+    'RPT001': ('employee_metrics', employee_rows, ('employees', 'salesreps', 'totals')),
+    'RPT002': ('transactions', transaction_rows, ('transactions',)),
+    'RPT003': ('quarter_hours', quarter_hour_rows, ('time_periods', 'totals')),
+    'RPT004': ('journal_lines', journal_rows, ('categories',)),
+    'RPT083': ('inventory_metrics', inventory_rows, ('inventory', 'ratings')),
+}
+
+
+class ReportDatabase:
+    """
+    SQLite store of parsed reports
+
+    Every report becomes one row of the reports table, keyed by store,
+    print date and report type, plus its rows in the table of its report
+    type. The print date is the date in the file name or header timestamp;
+    a report printed after midnight carries the next calendar day, and the
+    business day it covers is only known as its accounting_day number.
+    Loading a report that is already stored replaces it. Rows are inserted
+    with executemany and committed in batches of about BATCH_ROWS rows, so
+    a large load runs in a few long transactions instead of one per report.
+    The lookup indexes are built on close.
+
+    Args:
+        path (str): Database file, created when missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.inserts = {table: insert_statement(table, columns) for table, columns in ROW_COLUMNS.items()}
+        self.pending_rows = 0
+
+    def add(self, real_date, report_type, data):
+        """
+        Store one parsed report
+
+        Args:
+            real_date (str): Print date of the report as YYYYMMDD, stored as YYYY-MM-DD in print_date
+            report_type (str): 'RPT001' etc., other types keep their whole result in reports.extra
+            data (dict): Parse result
+        """
+        connection = self.connection
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+        metadata = data.get('metadata', {})
+        store_id = metadata.get('store_id', '')
+        print_date = f"{real_date[:4]}-{real_date[4:6]}-{real_date[6:8]}"
+        table, rows, keys = REPORT_TABLES.get(report_type, (None, None, ()))
+
+        previous = connection.execute(
+            "SELECT report_id FROM reports WHERE store_id = ? AND print_date = ? AND report_type = ?",
+            (store_id, print_date, report_type)).fetchone()
+        if previous is not None:
+            for row_table in ROW_COLUMNS:
+                connection.execute(f"DELETE FROM {row_table} WHERE report_id = ?", previous)
+            connection.execute("DELETE FROM reports WHERE report_id = ?", previous)
+
+        extra = {key: value for key, value in data.items() if key not in keys}
+        report_id = connection.execute(
+            "INSERT INTO reports (store_id, store_name, print_date, accounting_day, report_type, printed, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (store_id, metadata.get('store_name'), print_date, metadata.get('accounting_day'),
+             report_type, metadata.get('report_date'), json.dumps(extra, default=json_default))).lastrowid
+
+        if table is not None:
+            cursor = connection.executemany(self.inserts[table],
+                                            ((report_id,) + row for row in rows(data)))
+            self.pending_rows += cursor.rowcount
+        self.pending_rows += 1
+        if self.pending_rows >= BATCH_ROWS:
+            self.commit()
+
+    def commit(self):
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self.pending_rows = 0
+
+    def create_indexes(self):
+        """
+        Commit and build the lookup indexes now rather than on close
+
+        Loading is fastest without them, but a database queried while it is
+        still being loaded, like the one run.py --watch keeps appending to,
+        needs them from the start. Rows added later keep them up to date.
+        """
+        self.commit()
+        self.connection.executescript(INDEXES)
+
+    def close(self):
+        """Commit, build the lookup indexes and close the database"""
+        if self.connection is None:
+            return
+        self.create_indexes()
+        self.connection.execute("PRAGMA optimize")
+        self.connection.close()
+        self.connection = None
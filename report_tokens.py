@@ -0,0 +1,140 @@
+# Cell contents TAMS prints instead of a number: overflow markers and a lone dash
+SENTINELS = frozenset(['******', '!!!!!!', '-'])
+
+# Distinct tokens remembered per converter before the cache is cleared
+TOKEN_CACHE_SIZE = 4096
+
+MISSING = object()
+
+# Tokens float()/int() reject, mapped to their converted value
+FLOAT_CACHE = {}
+INT_CACHE = {}
+
+
+def clean_token(token):
+    """
+    Reduce a TAMS numeric cell to plain number text
+
+    Handles surrounding blanks, the overflow sentinels, thousands separators,
+    a trailing percent sign and a trailing minus sign ('12.50-').
+
+    Args:
+        token (str): Raw cell or whitespace-separated token
+
+    Returns:
+        str or None: Text for float()/int(), or None if the cell holds no number
+    """
+    value = token.strip()
+    if not value or value in SENTINELS or value[0] in '*!':
+        return None
+    value = value.replace(',', '')
+    if value.endswith('%'):
+        value = value[:-1].rstrip()
+    if value.endswith(('-', '+')) and len(value) > 1 and value[0] not in '+-':
+        value = value[-1] + value[:-1].rstrip()
+    return value or None
+
+
+def remember(cache, token, value):
+    """Store a converted token, starting over when the cache is full"""
+    if len(cache) >= TOKEN_CACHE_SIZE:
+        cache.clear()
+    cache[token] = value
+    return value
+
+
+def to_float(token):
+    """
+    Convert a TAMS numeric cell to float
+
+    Plain numbers, with or without thousands separators, convert exactly as
+    float() converts them. The cells float() rejects, blanks, sentinels,
+    percentages and trailing signs, are the expensive ones: they go through
+    clean_token once and the result is memoized, so the many repeated ones
+    in a report ('', '******', '0.00%') cost a dict lookup afterwards.
+
+    Args:
+        token (str): Raw cell, padding included, or a split token
+
+    Returns:
+        float or None: The number, or None if the cell holds no number
+    """
+    value = FLOAT_CACHE.get(token, MISSING)
+    if value is not MISSING:
+        return value
+    try:
+        return float(token.replace(',', ''))
+    except ValueError:
+        pass
+    except AttributeError:
+        return None
+    value = clean_token(token)
+    if value is not None:
+        try:
+            value = float(value)
+        except ValueError:
+            value = None
+    return remember(FLOAT_CACHE, token, value)
+
+
+def to_int(token):
+    """
+    Convert a TAMS numeric cell to int, see to_float
+
+    Args:
+        token (str): Raw cell, padding included, or a split token
+
+    Returns:
+        int or None: The number, or None if the cell holds no integer
+    """
+    value = INT_CACHE.get(token, MISSING)
+    if value is not MISSING:
+        return value
+    try:
+        return int(token.replace(',', ''))
+    except ValueError:
+        pass
+    except AttributeError:
+        return None
+    value = clean_token(token)
+    if value is not None:
+        try:
+            value = int(value)
+        except ValueError:
+            value = None
+    return remember(INT_CACHE, token, value)
+
+
+# Plain type -> TAMS-aware converter, for row_converter
+CONVERTERS = {
+    float: to_float,
+    int: to_int,
+}
+
+
+def row_converter(fields, types, offset=0):
+    """
+    Build a converter for split rows of one fixed shape
+
+    Like FixedWidthLayout.extract, the converter tries the float()/int()
+    builtins on every token first; only when one of them rejects its token
+    is the row converted again with to_float/to_int.
+
+    Args:
+        fields (tuple): Key for every converted token
+        types (tuple): float or int for every field
+        offset (int): Index of the token holding the first field
+
+    Returns:
+        callable: convert(tokens) -> dict of field name -> value in field order
+    """
+    indexes = range(offset, offset + len(fields))
+    plain_items = tuple(zip(fields, indexes, types))
+    items = tuple(zip(fields, indexes, (CONVERTERS[kind] for kind in types)))
+
+    def convert(tokens):
+        try:
+            return {field: converter(tokens[index]) for field, index, converter in plain_items}
+        except (ValueError, TypeError):
+            return {field: converter(tokens[index]) for field, index, converter in items}
+    return convert
@@ -0,0 +1,160 @@
+import os
+import time
+import zlib
+
+from report_io import is_compressed
+
+# Seconds between two polls of the reports trees
+POLL_INTERVAL = 0.25
+
+# Seconds a file without an end marker must go unmodified before it is taken as complete
+SETTLE_SECONDS = 2.0
+
+# Printed at the bottom of the last page of every TAMS report
+END_MARKER = b'End of Report'
+
+# Bytes at the end of an uncompressed report searched for END_MARKER, trailing blank lines and form feeds included
+TAIL_SIZE = 512
+
+# Compressed bytes inflated at a time while checking a .z file
+INFLATE_CHUNK_SIZE = 1 << 16
+
+
+def has_end_marker(file_path):
+    """
+    Tell whether a report file has visibly been written to its end
+
+    A .z file is complete once its gzip stream ends: the file is inflated
+    through to the gzip trailer, whose CRC and length zlib checks, without
+    keeping the output. An uncompressed file is complete once END_MARKER
+    appears in its last TAIL_SIZE bytes.
+
+    Args:
+        file_path (str): Path to a .PF or .PF.z file
+
+    Returns:
+        bool: True if the file carries its end marker, False if it does not
+        (yet), cannot be read or is not valid gzip data
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if not is_compressed(file_path):
+                f.seek(max(os.fstat(f.fileno()).st_size - TAIL_SIZE, 0))
+                return END_MARKER in f.read()
+            # 16 + MAX_WBITS expects a gzip header and trailer around the deflate stream
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            while not decompressor.eof:
+                chunk = f.read(INFLATE_CHUNK_SIZE)
+                if not chunk:
+                    return False
+                decompressor.decompress(chunk)
+            return True
+    except (OSError, zlib.error):
+        return False
+
+
+class ReportWatcher:
+    """
+    Poll reports trees for report files that have been written completely
+
+    TAMS writes the day's reports over several hours into reports/<date>/.
+    Each poll lists only the directories whose mtime changed since they were
+    last listed (or that were modified within the last SETTLE_SECONDS, since
+    directory timestamps can be coarse) and stats only the files not handed
+    out yet. A file is complete when it carries its end marker (see
+    has_end_marker) or, failing that, when it has not been modified for
+    settle seconds. A file replaced later (new size or mtime when its
+    directory is listed again) is handed out again.
+
+    Args:
+        reports_dirs (list): Root directories holding one subdirectory per date
+        classify (callable): File path -> (real_date, report_type, file_path) or None
+                             for files to ignore, called once a file is complete
+        settle (float): Seconds without modification after which a file without an
+                        end marker is taken as complete
+    """
+
+    def __init__(self, reports_dirs, classify, settle=SETTLE_SECONDS):
+        self.reports_dirs = list(reports_dirs)
+        self.classify = classify
+        self.settle = settle
+        # Directory -> mtime_ns when it was last listed
+        self.listed = {}
+        self.date_dirs = set()
+        # File path -> (size, mtime_ns) for files handed out or ignored, and for files still being written
+        self.done = {}
+        self.pending = {}
+        # File path -> ((size, mtime_ns), has_end_marker result) so unchanged files are not read again
+        self.markers = {}
+
+    def changed(self, directory, now_ns):
+        """Tell whether a directory needs listing, remembering its mtime"""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return False
+        previous = self.listed.get(directory)
+        self.listed[directory] = mtime_ns
+        return previous != mtime_ns or now_ns - mtime_ns < self.settle * 1e9
+
+    def scan(self):
+        """List the directories changed since the last poll and queue their new or replaced files"""
+        now_ns = time.time_ns()
+        for reports_dir in self.reports_dirs:
+            if self.changed(reports_dir, now_ns):
+                with os.scandir(reports_dir) as entries:
+                    self.date_dirs.update(entry.path for entry in entries if entry.is_dir())
+
+        for date_dir in self.date_dirs:
+            if not self.changed(date_dir, now_ns):
+                continue
+            with os.scandir(date_dir) as entries:
+                for entry in entries:
+                    if entry.path in self.pending or not entry.is_file():
+                        continue
+                    signature = self.done.get(entry.path)
+                    if signature is not None:
+                        stat = entry.stat()
+                        if signature == (stat.st_size, stat.st_mtime_ns):
+                            continue
+                        del self.done[entry.path]
+                    self.pending[entry.path] = None
+
+    def complete(self, file_path, stat, now):
+        """Tell whether a pending file is complete, see the class description"""
+        if now - stat.st_mtime >= self.settle:
+            return True
+        signature = (stat.st_size, stat.st_mtime_ns)
+        known = self.markers.get(file_path)
+        if known is None or known[0] != signature:
+            known = self.markers[file_path] = (signature, has_end_marker(file_path))
+        return known[1]
+
+    def poll(self):
+        """
+        Look for files completed since the last poll
+
+        Returns:
+            list: classify results of the newly completed files, ignored files
+            left out, sorted by directory then file name like run.find_report_files
+        """
+        self.scan()
+        now = time.time()
+        ready = []
+        for file_path in sorted(self.pending):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                # Removed before it was complete
+                del self.pending[file_path]
+                self.markers.pop(file_path, None)
+                continue
+            if not self.complete(file_path, stat, now):
+                continue
+            del self.pending[file_path]
+            self.markers.pop(file_path, None)
+            self.done[file_path] = (stat.st_size, stat.st_mtime_ns)
+            job = self.classify(file_path)
+            if job is not None:
+                ready.append(job)
+        return ready
@@ -1,23 +1,23 @@
 import os
+import sys
 import gzip
-from report_parser import ReportParser
 import json
+import time
+import signal
+import argparse
+import datetime
+from collections import deque
+from report_parser import ParseStats, ReportParser
+from report_output import WRITERS, open_writer, write_json_atomic
+from report_manifest import IngestManifest, read_fingerprinted
+from report_cache import DEFAULT_MAX_BYTES, ParseCache
+from report_io import READERS, is_compressed
+from report_sniff import sniff_file
+from report_watch import POLL_INTERVAL, SETTLE_SECONDS, ReportWatcher
+from report_catalog import ReportCatalog
 
 all_reports_dir = 'reports/'
 
-def decompress_file(file_path):
-    decompressed_path = file_path.rstrip('.z')
-    with gzip.open(file_path, 'rb') as f_in:
-        with open(decompressed_path, 'wb') as f_out:
-            f_out.write(f_in.read())
-    return decompressed_path
-
-report_dirs = sorted(os.listdir(all_reports_dir))
-report_parser = ReportParser()
-
-report_data = {}
-char_count = {}
-
 report_types = {
     "RPT001":"RPT001",
     "RPT002":"RPT002",
@@ -26,29 +26,898 @@ report_types = {
     "RPT083":"RPT083"
 }
 
-for dir in report_dirs:
-    dir_path = os.path.join(all_reports_dir, dir)
-    for file in os.listdir(dir_path):
-        report_type = file.split('_')[0]
-        report_type = report_types.get(report_type, None)
-        if not file.startswith('RPT') or report_type is None:
-            continue
+class ScanFilter:
+    """
+    Restrictions on the reports a scan picks up, applied before files are opened
+
+    Date directories outside since/until are skipped by name, without being
+    listed. In a listed directory, files of other report types are skipped by
+    their name prefix, without being opened or stat'ed, unless files are
+    sniffed. Only the store filter has to look inside the remaining files, and
+    then only at their first header lines (see report_sniff).
+
+    Args:
+        since (str): First date directory to scan, YYYYMMDD, None for no lower bound
+        until (str): Last date directory to scan, YYYYMMDD, None for no upper bound
+        types (iterable): Report types to keep, e.g. ['RPT083'], None for all
+        stores (iterable): Store ids to keep, None for all
+    """
+
+    def __init__(self, since=None, until=None, types=None, stores=None):
+        self.since = since
+        self.until = until
+        self.types = set(types) if types else None
+        self.stores = set(stores) if stores else None
+
+    def keep_date(self, name):
+        """Tell whether a date directory, named YYYYMMDD, is in range; other names only pass without bounds"""
+        if self.since is None and self.until is None:
+            return True
+        if len(name) != 8 or not name.isdigit():
+            return False
+        return (self.since is None or name >= self.since) and (self.until is None or name <= self.until)
+
+    def keep_name(self, name):
+        """Tell whether a file may be a wanted report judging by its RPTxxx_ name prefix"""
+        return self.types is None or name.split('_')[0] in self.types
+
+    def keep_job(self, job, header=None):
+        """
+        Tell whether a classified report passes the type and store filters
+
+        Args:
+            job (tuple): (real_date, report_type, file_path)
+            header (dict): report_sniff header of the file if already read, sniffed here when needed
+
+        Returns:
+            bool: True to ingest the report
+        """
+        if self.types is not None and job[1] not in self.types:
+            return False
+        if self.stores is None:
+            return True
+        header = header if header is not None else sniff_file(job[2])
+        return header is not None and header.get('store_id') in self.stores
+
+def list_names(directory):
+    """Sorted entry names of a directory, listed with os.scandir so no entry is stat'ed"""
+    with os.scandir(directory) as entries:
+        return sorted(entry.name for entry in entries)
+
+def find_report_files(reports_dir, sniff=False, scan_filter=None):
+    """
+    Walk reports/<date>/ and collect every supported report file in a fixed order
+
+    By default the report type and date are taken from file names like
+    RPT001_20140514181224.PF.z. With sniff set every file is classified by
+    its first header line instead (see sniff_report_file), so renamed files
+    are still found.
+
+    Args:
+        reports_dir (str): Root directory holding one subdirectory per date
+        sniff (bool): Classify files by their contents rather than their names
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+
+    Returns:
+        list: (real_date, report_type, file_path) tuples, sorted by directory then file name
+    """
+    jobs = []
+    for dir in list_names(reports_dir):
+        if scan_filter is None or scan_filter.keep_date(dir):
+            jobs.extend(find_date_files(os.path.join(reports_dir, dir), sniff, scan_filter))
+    return jobs
+
+def find_date_files(dir_path, sniff=False, scan_filter=None):
+    """
+    Collect the supported report files of one date directory, see find_report_files
+
+    Args:
+        dir_path (str): A reports/<date>/ directory
+        sniff (bool): Classify files by their contents rather than their names
+        scan_filter (ScanFilter): Optional type and store restrictions
+
+    Returns:
+        list: (real_date, report_type, file_path) tuples, sorted by file name
+    """
+    jobs = []
+    for file in list_names(dir_path):
+        job = classify_file(os.path.join(dir_path, file), sniff, scan_filter)
+        if job is not None:
+            jobs.append(job)
+    return jobs
+
+def classify_file(file_path, sniff=False, scan_filter=None):
+    """
+    Classify one file of a date directory, see name_report_file and sniff_report_file
+
+    Args:
+        file_path (str): Path to any file of a date directory
+        sniff (bool): Classify the file by its contents rather than its name
+        scan_filter (ScanFilter): Optional type and store restrictions
+
+    Returns:
+        tuple or None: (real_date, report_type, file_path), None for files that
+        are not supported reports or do not pass scan_filter
+    """
+    if scan_filter is None:
+        return sniff_report_file(file_path) if sniff else name_report_file(file_path)
+    header = None
+    if sniff:
+        if not os.path.isfile(file_path):
+            return None
+        header = sniff_file(file_path)
+        job = report_job(header, file_path)
+    elif scan_filter.keep_name(os.path.basename(file_path)):
+        job = name_report_file(file_path)
+    else:
+        return None
+    return job if job is not None and scan_filter.keep_job(job, header) else None
+
+def find_catalog_files(catalog, reports_dir, scan_filter=None):
+    """
+    Collect the supported report files of a reports tree from a ReportCatalog, without walking the tree
+
+    Files are classified by name like find_report_files does, so the same
+    jobs come out in the same order as long as the catalog is up to date
+    (see ReportCatalog.update). The date range and report types are part of
+    the catalog query.
+
+    Args:
+        catalog (ReportCatalog): Catalog holding reports_dir
+        reports_dir (str): Root directory holding one subdirectory per date
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+
+    Returns:
+        list: (date directory path, jobs) pairs, jobs being (real_date, report_type, file_path) tuples
+    """
+    types = report_types if scan_filter is None or scan_filter.types is None else scan_filter.types
+    since, until = (scan_filter.since, scan_filter.until) if scan_filter is not None else (None, None)
+    rows = catalog.files(reports_dir, since, until, [report_type[3:] for report_type in types],
+                         ('dir', 'name', 'report_number', 'timestamp'))
+    directories = []
+    for dir, name, report_number, timestamp in rows:
+        if not directories or directories[-1][1] != dir:
+            if scan_filter is not None and not scan_filter.keep_date(dir):
+                continue
+            dir_path = os.path.join(reports_dir, dir)
+            jobs = []
+            directories.append((dir_path, dir, jobs))
+        job = (timestamp[:8], report_types[f"RPT{report_number}"], os.path.join(dir_path, name))
+        if scan_filter is None or scan_filter.keep_job(job):
+            jobs.append(job)
+    return [(dir_path, jobs) for dir_path, _, jobs in directories if jobs]
 
+def name_report_file(file_path):
+    """
+    Classify a report file from its name, e.g. RPT001_20140514181224.PF.z
+
+    Args:
+        file_path (str): Path to any file of a date directory
+
+    Returns:
+        tuple or None: (real_date, report_type, file_path) like find_report_files,
+        None for names that are not supported TAMS reports
+    """
+    file = os.path.basename(file_path)
+    report_type = file.split('_')[0]
+    report_type = report_types.get(report_type, None)
+    if not file.startswith('RPT') or report_type is None:
+        return None
+
+    if file.endswith('.PF') or file.endswith('.z'):
         real_date = file.split('_')[1].split('.')[0][:8]
-        if real_date not in report_data:
-            report_data[real_date] = {}
-
-        file_path = os.path.join(dir_path, file)
-        if file.endswith('.PF') or file.endswith('.z'):
-            if file.endswith('.z'):
-                file_path = decompress_file(file_path)
-            with open(file_path, 'rb') as f:
-                strdata = f.read().decode('utf-8')
-                report_parser.parse_report(report_type.strip('RPT'), strdata)
-                report_data[real_date][report_type] = report_parser.report_data
-
-with open('dump.json', 'w') as file:
-    json.dump(report_data, file, indent=2)
+        return real_date, report_type, file_path
+    return None
+
+def sniff_report_file(file_path):
+    """
+    Classify a report file from the report tag, store and print date in its header
+
+    Only the first few hundred bytes are read, decompressed for .z files.
+
+    Args:
+        file_path (str): Path to any file of a date directory
+
+    Returns:
+        tuple or None: (real_date, report_type, file_path) like find_report_files,
+        real_date being the print date of the report; None for anything that is
+        not a supported TAMS report
+    """
+    if not os.path.isfile(file_path):
+        return None
+    return report_job(sniff_file(file_path), file_path)
+
+def report_job(header, file_path):
+    """
+    Turn a sniffed header into a job for iter_parsed_reports
+
+    Args:
+        header (dict): report_sniff.sniff_file result, may be None
+        file_path (str): Path of the sniffed file
+
+    Returns:
+        tuple or None: (real_date, report_type, file_path), None if the header
+        is missing, undated or of an unsupported report type
+    """
+    if header is None or 'report_datetime' not in header:
+        return None
+    report_type = report_types.get(header['report_type'], None)
+    if report_type is None:
+        return None
+    return header['report_datetime'].strftime('%Y%m%d'), report_type, file_path
+
+def store_directory(store_id):
+    """Output directory name of a store, ids unfit for a file name (or missing) go to 'unknown'"""
+    if store_id and store_id.replace('-', '').replace('_', '').isalnum():
+        return store_id
+    return 'unknown'
+
+def find_store_files(reports_dirs, scan_filter=None):
+    """
+    Sniff every file below one or more reports trees and group the supported reports by store
+
+    The store is read from the second header line of each report, so trees
+    may hold one store each or mix several; a store may also be spread over
+    several trees. With a type filter, RPTxxx_ files of other types are
+    skipped by name without being opened.
+
+    Args:
+        reports_dirs (list): Root directories holding one subdirectory per date
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+
+    Returns:
+        dict: store directory name (see store_directory) -> {'store_id', 'store_name',
+        'jobs'}, jobs being (real_date, report_type, file_path) tuples in the order
+        of find_report_files, tree by tree
+    """
+    stores = {}
+    for reports_dir in reports_dirs:
+        for dir in list_names(reports_dir):
+            if scan_filter is not None and not scan_filter.keep_date(dir):
+                continue
+            dir_path = os.path.join(reports_dir, dir)
+            for file in list_names(dir_path):
+                # Files named like a report of an unwanted type are skipped unopened, like in the other
+                # scans; only names that tell nothing, e.g. renamed reports, are left to the header
+                if scan_filter is not None and file.startswith('RPT') and not scan_filter.keep_name(file):
+                    continue
+                file_path = os.path.join(dir_path, file)
+                if not os.path.isfile(file_path):
+                    continue
+                header = sniff_file(file_path)
+                job = report_job(header, file_path)
+                if job is None or (scan_filter is not None and not scan_filter.keep_job(job, header)):
+                    continue
+                store_id = header.get('store_id', '')
+                store = stores.setdefault(store_directory(store_id), {
+                    'store_id': store_id,
+                    'store_name': header.get('store_name'),
+                    'jobs': [],
+                })
+                store['jobs'].append(job)
+    return stores
+
+# Parser of the current process, set up by init_worker and shared by all its parse calls
+worker_parser = ReportParser()
+collect_stats = False
+
+def init_worker(cache_dir=None, cache_size=DEFAULT_MAX_BYTES, stats=False):
+    """
+    Set up per-process parser state, runs once in every pool worker
+
+    Args:
+        cache_dir (str): Directory of the content-addressed parse cache, None disables it
+        cache_size (int): Size budget of the cache in bytes
+        stats (bool): Collect ParseStats for every parsed file
+    """
+    global worker_parser, collect_stats
+    cache = ParseCache(cache_dir, cache_size) if cache_dir else None
+    worker_parser = ReportParser(cache=cache, collect_stats=stats)
+    collect_stats = stats
+
+def parse_report_file(job, fingerprint=False):
+    """
+    Decompress (if needed) and parse a single report file
+
+    Uncompressed files are memory-mapped and compressed files decompressed in
+    memory, nothing is written to the reports tree. Either way the report is
+    decoded one page at a time. With fingerprint set the file is read whole
+    and the bytes parsed are fingerprinted for the manifest, in the same
+    read. Runs in the worker processes of the parallel mode, so it only takes
+    and returns picklable values.
+
+    Args:
+        job (tuple): (real_date, report_type, file_path) from find_report_files
+        fingerprint (bool): Also return the report_manifest fingerprint of the file
+
+    Returns:
+        tuple: (real_date, report_type, parsed report dict, ParseStats or None, fingerprint or None)
+    """
+    real_date, report_type, file_path = job
+    call_stats = ParseStats() if collect_stats else None
+    if not fingerprint:
+        data = worker_parser.parse_file(report_type.strip('RPT'), file_path, call_stats)
+        return real_date, report_type, data, call_stats, None
+    raw, file_fingerprint = read_fingerprinted(file_path)
+    data = worker_parser.parse_report(report_type.strip('RPT'), decompress_payload(job, raw), call_stats)
+    return real_date, report_type, data, call_stats, file_fingerprint
+
+def parse_report_payload(job, payload):
+    """
+    Parse report contents already read (and decompressed) by the ingest pipeline
+
+    Runs in the worker processes of ingest_pipeline; the bytes are decoded
+    one page at a time, as for a memory-mapped file.
+
+    Args:
+        job (tuple): (real_date, report_type, file_path) from find_report_files
+        payload (bytes): Uncompressed report contents
+
+    Returns:
+        tuple: (real_date, report_type, parsed report dict, ParseStats or None, None), the
+        fingerprint of the file being taken by the reading stage
+    """
+    real_date, report_type, file_path = job
+    call_stats = ParseStats() if collect_stats else None
+    data = worker_parser.parse_report(report_type.strip('RPT'), payload, call_stats)
+    return real_date, report_type, data, call_stats, None
+
+def read_file(file_path):
+    """Read a whole file as bytes"""
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def decompress_payload(job, payload):
+    """Inflate the contents of a .z report file, other files are passed through"""
+    return gzip.decompress(payload) if is_compressed(job[2]) else payload
+
+def iter_parsed_reports(jobs, workers=1, manifest=None, cache_dir=None, cache_size=DEFAULT_MAX_BYTES,
+                        stats=None):
+    """
+    Parse the given jobs and yield the results in job order
+
+    With more than one worker the files are parsed in a process pool. Only a
+    small window of jobs is in flight at a time so finished results do not pile
+    up waiting for a slow file earlier in the order. Files the manifest already
+    knows are not parsed at all; their stored results are yielded in place.
+
+    Args:
+        jobs (list): (real_date, report_type, file_path) tuples
+        workers (int): Number of worker processes, 1 parses in this process
+        manifest (IngestManifest): Optional record of previously ingested files
+        cache_dir (str): Optional directory of the content-addressed parse cache
+        cache_size (int): Size budget of the parse cache in bytes
+        stats (dict): Optional RPTxxx -> ParseStats totals, updated for every parsed file
+
+    Yields:
+        tuple: (real_date, report_type, parsed report dict)
+    """
+    if workers > 1:
+        # Imported here, multiprocessing costs a single-worker run more than the parsers do
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(cache_dir, cache_size, stats is not None))
+    else:
+        executor = None
+        init_worker(cache_dir, cache_size, stats is not None)
+    window = workers * 2 if executor is not None else 0
+    pending = deque()
+
+    def finish(job, result):
+        if result is None:
+            result = parse_report_file(job, manifest is not None)
+        elif isinstance(result, tuple):
+            return result
+        else:
+            result = result.result()
+        return record_result(job, result, manifest, stats)
+
+    try:
+        for job in jobs:
+            result = None
+            if manifest is not None:
+                data = manifest.lookup(job[2])
+                if data is not None:
+                    result = (job[0], job[1], data)
+            if result is None and executor is not None:
+                result = executor.submit(parse_report_file, job, manifest is not None)
+            pending.append((job, result))
+            while len(pending) > window:
+                yield finish(*pending.popleft())
+        while pending:
+            yield finish(*pending.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def record_result(job, result, manifest=None, stats=None):
+    """
+    Keep a fresh parse_report_file result in the manifest and the stats totals
+
+    Args:
+        job (tuple): (real_date, report_type, file_path) that was parsed
+        result (tuple): parse_report_file return value, with the file's fingerprint when manifest is set
+        manifest (IngestManifest): Optional record of ingested files
+        stats (dict): Optional RPTxxx -> ParseStats totals
+
+    Returns:
+        tuple: (real_date, report_type, parsed report dict)
+    """
+    real_date, report_type, data, call_stats, fingerprint = result
+    if manifest is not None:
+        manifest.record(job[2], data, fingerprint)
+    if stats is not None and call_stats is not None:
+        stats.setdefault(report_type, ParseStats()).merge(call_stats)
+    return real_date, report_type, data
+
+def write_reports(writer, jobs, workers=1, manifest=None, cache_dir=None, cache_size=DEFAULT_MAX_BYTES,
+                  stats=None):
+    """
+    Parse the given jobs and hand each report to writer as soon as it is parsed
+
+    Args:
+        writer (ReportWriter): Output stage from report_output
+        jobs (list): (real_date, report_type, file_path) tuples
+        workers (int): Number of worker processes
+        manifest (IngestManifest): Optional manifest used to skip unchanged files, saved at the end
+        cache_dir (str): Optional directory of the content-addressed parse cache
+        cache_size (int): Size budget of the parse cache in bytes
+        stats (dict): Optional RPTxxx -> ParseStats totals to fill in
+
+    Returns:
+        int: Number of reports written
+    """
+    count = 0
+    try:
+        for real_date, report_type, data in iter_parsed_reports(jobs, workers, manifest,
+                                                                 cache_dir, cache_size, stats):
+            writer.write(real_date, report_type, data)
+            count += 1
+    finally:
+        if manifest is not None:
+            manifest.save()
+    return count
+
+def ingest(writer, reports_dir=all_reports_dir, workers=1, manifest=None, cache_dir=None,
+           cache_size=DEFAULT_MAX_BYTES, stats=None, sniff=False, scan_filter=None, catalog=None):
+    """
+    Parse every supported report below reports_dir and hand each one to writer
+
+    Reports are written as soon as they are parsed, in the order of
+    find_report_files, so the serial and parallel modes produce identical
+    output and memory use does not grow with the number of dates.
+
+    Args:
+        writer (ReportWriter): Output stage from report_output
+        reports_dir (str or list): Root directory holding one subdirectory per date,
+                                   or several, read one after the other
+        workers (int): Number of worker processes
+        manifest (IngestManifest): Optional manifest used to skip unchanged files
+        cache_dir (str): Optional directory of the content-addressed parse cache
+        cache_size (int): Size budget of the parse cache in bytes
+        stats (dict): Optional RPTxxx -> ParseStats totals to fill in
+        sniff (bool): Classify files by their header rather than their name
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+        catalog (ReportCatalog): Optional catalog to find the files in instead of walking
+                                 the trees, ignored with sniff
+
+    Returns:
+        int: Number of reports written
+    """
+    reports_dirs = [reports_dir] if isinstance(reports_dir, str) else reports_dir
+    if catalog is not None and not sniff:
+        jobs = [job for directory in reports_dirs
+                for _, dir_jobs in find_catalog_files(catalog, directory, scan_filter) for job in dir_jobs]
+    else:
+        jobs = [job for directory in reports_dirs for job in find_report_files(directory, sniff, scan_filter)]
+    return write_reports(writer, jobs, workers, manifest, cache_dir, cache_size, stats)
+
+def ingest_store(shard):
+    """
+    Ingest the reports of one store into that store's own output
+
+    Runs in the worker processes of ingest_stores, so it only takes and
+    returns picklable values. Each store has its own manifest below the
+    manifest directory, so no two processes ever write the same file.
+
+    Args:
+        shard (tuple): (store directory name, jobs, output format, output path,
+                       manifest directory or None, cache_dir, cache_size,
+                       collect stats, workers)
+
+    Returns:
+        tuple: (reports written, RPTxxx -> ParseStats or None, manifest hits, manifest misses)
+    """
+    store, jobs, output_format, path, manifest_dir, cache_dir, cache_size, collect, workers = shard
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    manifest = IngestManifest(os.path.join(manifest_dir, store)) if manifest_dir else None
+    stats = {} if collect else None
+    with open_writer(output_format, path) as writer:
+        count = write_reports(writer, jobs, workers, manifest, cache_dir, cache_size, stats)
+    if manifest is None:
+        return count, stats, 0, 0
+    manifest.prune()
+    manifest.save()
+    return count, stats, manifest.hits, manifest.misses
+
+def ingest_stores(reports_dirs, output_format, output_dir, workers=1, manifest_dir=None, cache_dir=None,
+                  cache_size=DEFAULT_MAX_BYTES, stats=None, scan_filter=None):
+    """
+    Partition the reports below reports_dirs by store and ingest every store separately
+
+    Each store is written to <output_dir>/<store>/ in the chosen format, so
+    reports of different stores never collide, and <output_dir>/stores.json
+    lists every store with the range of dates available for it. With more
+    than one worker the stores are ingested in parallel, one process per
+    store at a time, largest stores first; a single store is parsed with
+    all the workers instead.
+
+    Args:
+        reports_dirs (list): Root directories holding one subdirectory per date
+        output_format (str): One of the keys of report_output.WRITERS
+        output_dir (str): Directory receiving one subdirectory per store and stores.json
+        workers (int): Number of worker processes
+        manifest_dir (str): Optional directory holding one ingestion manifest per store
+        cache_dir (str): Optional directory of the content-addressed parse cache, shared by all stores
+        cache_size (int): Size budget of the parse cache in bytes
+        stats (dict): Optional RPTxxx -> ParseStats totals to fill in
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+
+    Returns:
+        dict: The stores.json index, store -> store_id, store_name, first_date,
+        last_date, dates, reports, output, manifest_hits and manifest_misses
+    """
+    stores = find_store_files(reports_dirs, scan_filter)
+    output_name = WRITERS[output_format][1]
+    store_workers = 1 if len(stores) > 1 else workers
+    shards = {store: (store, info['jobs'], output_format, os.path.join(output_dir, store, output_name),
+                      manifest_dir, cache_dir, cache_size, stats is not None, store_workers)
+              for store, info in stores.items()}
+    order = sorted(shards, key=lambda store: len(stores[store]['jobs']), reverse=True)
+
+    if workers > 1 and len(shards) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            futures = {store: executor.submit(ingest_store, shards[store]) for store in order}
+            results = {store: future.result() for store, future in futures.items()}
+    else:
+        results = {store: ingest_store(shards[store]) for store in order}
+
+    index = {}
+    for store in sorted(stores):
+        count, store_stats, hits, misses = results[store]
+        dates = sorted({job[0] for job in stores[store]['jobs']})
+        index[store] = {
+            'store_id': stores[store]['store_id'],
+            'store_name': stores[store]['store_name'],
+            'first_date': dates[0],
+            'last_date': dates[-1],
+            'dates': len(dates),
+            'reports': count,
+            'output': os.path.join(store, output_name),
+            'manifest_hits': hits,
+            'manifest_misses': misses,
+        }
+        if stats is not None:
+            for report_type, report_stats in store_stats.items():
+                stats.setdefault(report_type, ParseStats()).merge(report_stats)
+    os.makedirs(output_dir, exist_ok=True)
+    write_json_atomic(os.path.join(output_dir, 'stores.json'), index)
+    return index
+
+def watch(writer, reports_dirs, workers=1, manifest=None, cache_dir=None, cache_size=DEFAULT_MAX_BYTES,
+          stats=None, sniff=False, interval=POLL_INTERVAL, settle=SETTLE_SECONDS, scan_filter=None):
+    """
+    Ingest the reports trees, then keep ingesting report files as TAMS completes them
+
+    The files already complete are ingested first, like ingest does, with
+    all the workers. From then on the trees are polled every interval seconds
+    (see report_watch.ReportWatcher) and each newly completed file is parsed
+    right away in this process, appended to the output and flushed, so it is
+    stored within about interval seconds plus its parse time of being written.
+    A file that fails to parse is reported and skipped until it is replaced.
+    Runs until interrupted.
+
+    Args:
+        writer (ReportWriter): Output stage from report_output that stores each report as it is written
+        reports_dirs (list): Root directories holding one subdirectory per date
+        workers (int): Number of worker processes for the files found at start
+        manifest (IngestManifest): Optional manifest, saved after every poll that ingested files
+        cache_dir (str): Optional directory of the content-addressed parse cache
+        cache_size (int): Size budget of the parse cache in bytes
+        stats (dict): Optional RPTxxx -> ParseStats totals to fill in
+        sniff (bool): Classify files by their contents rather than their names
+        interval (float): Seconds between two polls
+        settle (float): Seconds after which an unmodified file without an end marker is taken as complete
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+    """
+    def classify(file_path):
+        if scan_filter is not None and not scan_filter.keep_date(os.path.basename(os.path.dirname(file_path))):
+            return None
+        return classify_file(file_path, sniff, scan_filter)
+
+    watcher = ReportWatcher(reports_dirs, classify, settle)
+    count = write_reports(writer, watcher.poll(), workers, manifest, cache_dir, cache_size, stats)
+    # The output is read while it grows, so it gets its indexes now instead of on close
+    writer.build_indexes()
+    writer.flush()
+    print(f"Ingested {count} reports, watching for new ones", flush=True)
+
+    init_worker(cache_dir, cache_size, stats is not None)
+    try:
+        while True:
+            time.sleep(interval)
+            for job in watcher.poll():
+                real_date, report_type, file_path = job
+                try:
+                    data = manifest.lookup(file_path) if manifest is not None else None
+                    if data is None:
+                        data = record_result(job, parse_report_file(job, manifest is not None), manifest,
+                                             stats)[2]
+                except Exception as error:
+                    print(f"Failed to parse {file_path}: {error!r}", file=sys.stderr, flush=True)
+                    continue
+                writer.write(real_date, report_type, data)
+                writer.flush()
+                # The mtime the watcher saw when it took the file as complete, the file may be gone by now
+                latency = time.time() - watcher.done[file_path][1] / 1e9
+                print(f"Ingested {report_type} {real_date} {file_path} ({latency:.2f}s after it was written)",
+                      flush=True)
+            # Rewriting manifest.json costs as much as the whole archive, so once per poll at most
+            if manifest is not None:
+                manifest.save()
+    finally:
+        if manifest is not None:
+            manifest.save()
+
+def ingest_pipeline(writer, reports_dir=all_reports_dir, workers=1, manifest=None, cache_dir=None,
+                    cache_size=DEFAULT_MAX_BYTES, stats=None, sniff=False, readers=READERS, scan_filter=None,
+                    catalog=None):
+    """
+    Ingest like ingest, through the staged asyncio pipeline of report_pipeline
+
+    Date directories are scanned and files read while earlier files are
+    decompressed in threads and parsed in a pool of worker processes; a
+    single writer stores the reports in the order of find_report_files, so
+    the output is the same as ingest's. Files the manifest already knows skip
+    reading, decompression and parsing.
+
+    Args:
+        writer (ReportWriter): Output stage from report_output
+        reports_dir (str or list): Root directory holding one subdirectory per date, or several
+        workers (int): Number of parser processes
+        manifest (IngestManifest): Optional manifest used to skip unchanged files, saved at the end
+        cache_dir (str): Optional directory of the content-addressed parse cache
+        cache_size (int): Size budget of the parse cache in bytes
+        stats (dict): Optional RPTxxx -> ParseStats totals to fill in
+        sniff (bool): Classify files by their contents rather than their names
+        readers (int): Concurrent file reads
+        scan_filter (ScanFilter): Optional date, type and store restrictions
+        catalog (ReportCatalog): Optional catalog to find the files in instead of listing
+                                 the directories, ignored with sniff
+
+    Returns:
+        dict: report_pipeline.run_pipeline utilization report, plus 'reports' written
+    """
+    # Imported here like the process pool of iter_parsed_reports
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from report_io import DECOMPRESSORS
+    from report_pipeline import run_pipeline
+
+    reports_dirs = [reports_dir] if isinstance(reports_dir, str) else reports_dir
+    if catalog is not None and not sniff:
+        cataloged = dict(pair for directory in reports_dirs
+                         for pair in find_catalog_files(catalog, directory, scan_filter))
+        directories = list(cataloged)
+        scan = cataloged.get
+    else:
+        directories = [os.path.join(directory, dir) for directory in reports_dirs
+                       for dir in list_names(directory) if scan_filter is None or scan_filter.keep_date(dir)]
+        scan = lambda directory: find_date_files(directory, sniff, scan_filter)  # noqa: E731
+    count = 0
+
+    def lookup(job):
+        data = manifest.lookup(job[2])
+        return (job[0], job[1], data) if data is not None else None
+
+    # Fingerprints taken by the read stage, until the writer records the file in the manifest
+    fingerprints = {}
+
+    def read(file_path):
+        raw, fingerprints[file_path] = read_fingerprinted(file_path)
+        return raw
+
+    def write(job, result):
+        nonlocal count
+        if len(result) == 5:
+            result = record_result(job, result[:4] + (fingerprints.pop(job[2], None),), manifest, stats)
+        writer.write(*result)
+        count += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=readers + DECOMPRESSORS + 1) as thread_pool, \
+                ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                    initargs=(cache_dir, cache_size, stats is not None)) as process_pool:
+            report = asyncio.run(run_pipeline(
+                directories, scan, read if manifest is not None else read_file,
+                decompress_payload, parse_report_payload, write, thread_pool, process_pool,
+                parsers=workers, readers=readers, lookup=lookup if manifest is not None else None))
+    finally:
+        if manifest is not None:
+            manifest.save()
+    report['reports'] = count
+    return report
+
+def print_pipeline_report(report):
+    """Print the utilization of every pipeline stage, see report_pipeline.StageStats"""
+    print(f"Pipeline: {report['reports']} reports in {report['seconds']:.2f}s")
+    print(f"{'stage':<12}{'tasks':>6}{'items':>8}{'busy':>8}{'starved':>9}{'blocked':>9}")
+    for name, stage in report.items():
+        if isinstance(stage, dict):
+            print(f"{name:<12}{stage['concurrency']:>6}{stage['items']:>8}{stage['busy']:>8.0%}"
+                  f"{stage['starved']:>9.0%}{stage['blocked']:>9.0%}")
+
+def write_stats(path, stats):
+    """Write RPTxxx -> ParseStats totals to path as JSON, nothing when stats were not collected"""
+    if stats is None:
+        return
+    with open(path, 'w') as file:
+        json.dump({report_type: report_stats.as_dict() for report_type, report_stats in stats.items()},
+                  file, indent=2)
+
+def date_argument(value):
+    """argparse type of --since/--until: a date as YYYYMMDD or YYYY-MM-DD, returned as YYYYMMDD"""
+    for date_format in ('%Y%m%d', '%Y-%m-%d'):
+        try:
+            return datetime.datetime.strptime(value, date_format).strftime('%Y%m%d')
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"not a YYYYMMDD or YYYY-MM-DD date: {value}")
+
+def types_argument(value):
+    """argparse type of --types: comma-separated report types, RPT083 or 083, returned as RPTxxx"""
+    types = [name if name.upper().startswith('RPT') else f"RPT{name}" for name in value.split(',') if name]
+    unknown = [name for name in types if name.upper() not in report_types]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unsupported report type {', '.join(unknown)}, "
+                                         f"choose from {', '.join(report_types)}")
+    return [name.upper() for name in types]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parse TAMS reports into JSON")
+    arg_parser.add_argument('--reports-dir', action='append', default=None,
+                            help="directory with one subdirectory per date, repeat for several "
+                                 "(default: reports/)")
+    arg_parser.add_argument('--format', default='jsonl', choices=sorted(WRITERS),
+                            help="jsonl: one line per report, shards: one file per report plus "
+                                 "index.json, json: single dump.json, sqlite: tables in dump.sqlite "
+                                 "(default: jsonl)")
+    arg_parser.add_argument('--output', default=None,
+                            help="output file or directory (default: dump.jsonl, dump/, dump.json or dump.sqlite)")
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="number of parser processes, 0 for one per CPU (default: 1)")
+    arg_parser.add_argument('--manifest-dir', default=None,
+                            help="keep an ingestion manifest here and skip files parsed by earlier runs")
+    arg_parser.add_argument('--cache-dir', default=None,
+                            help="cache parse results here, keyed by report content and parser version")
+    arg_parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                            help="size limit of the parse cache in MB (default: 512)")
+    arg_parser.add_argument('--stats', default=None,
+                            help="write per-report timings, throughput and skipped-line counts to this JSON file")
+    arg_parser.add_argument('--sniff', action='store_true',
+                            help="identify reports by the tag and print date in their first header line "
+                                 "instead of by file name")
+    arg_parser.add_argument('--by-store', action='store_true',
+                            help="sniff the store of every report and write each store to "
+                                 "<output>/<store_id>/ plus a stores.json index (default output: stores/)")
+    arg_parser.add_argument('--watch', action='store_true',
+                            help="after the ingest keep polling the reports trees and append every report file "
+                                 "TAMS completes to the output, until interrupted (jsonl, shards or sqlite)")
+    arg_parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                            help=f"seconds between two polls in --watch mode (default: {POLL_INTERVAL})")
+    arg_parser.add_argument('--settle', type=float, default=SETTLE_SECONDS,
+                            help="seconds a file without an 'End of Report' line must go unmodified before "
+                                 f"--watch takes it as complete (default: {SETTLE_SECONDS})")
+    arg_parser.add_argument('--pipeline', action='store_true',
+                            help="read, decompress, parse and write in concurrent stages with bounded queues "
+                                 "and print the utilization of each stage")
+    arg_parser.add_argument('--readers', type=int, default=READERS,
+                            help=f"concurrent file reads of --pipeline (default: {READERS})")
+    arg_parser.add_argument('--since', type=date_argument, default=None,
+                            help="first date directory to ingest, YYYYMMDD or YYYY-MM-DD; earlier ones are skipped "
+                                 "without being listed")
+    arg_parser.add_argument('--until', type=date_argument, default=None,
+                            help="last date directory to ingest, YYYYMMDD or YYYY-MM-DD")
+    arg_parser.add_argument('--types', type=types_argument, default=None,
+                            help="comma-separated report types to ingest, e.g. RPT001,RPT083; other files are "
+                                 "skipped by name")
+    arg_parser.add_argument('--stores', type=lambda value: [store for store in value.split(',') if store],
+                            default=None,
+                            help="comma-separated store ids to ingest, read from the header of every candidate file")
+    arg_parser.add_argument('--catalog', default=None,
+                            help="find report files in this catalog file instead of walking the reports trees; "
+                                 "it is created on first use and only changed directories are listed again")
+    arg_parser.add_argument('--catalog-no-refresh', action='store_true',
+                            help="trust --catalog as is, without checking the trees for new or removed files")
+    arg_parser.add_argument('--list', action='store_true',
+                            help="print the report files that would be ingested, one per line, and exit")
+    args = arg_parser.parse_args()
+    if args.catalog and (args.sniff or args.by_store or args.watch):
+        arg_parser.error("--catalog finds files by name, it cannot be combined with --sniff, --by-store or --watch")
+    if args.catalog_no_refresh and not args.catalog:
+        arg_parser.error("--catalog-no-refresh needs --catalog")
+    if args.pipeline and (args.watch or args.by_store):
+        arg_parser.error("--pipeline cannot be combined with --watch or --by-store")
+    if args.watch and args.format == 'json':
+        arg_parser.error("--watch appends every report as it is parsed, use --format jsonl, shards or sqlite")
+    if args.watch and args.by_store:
+        arg_parser.error("--watch and --by-store cannot be combined")
+
+    reports_dirs = args.reports_dir or [all_reports_dir]
+    workers = args.workers or os.cpu_count() or 1
+    scan_filter = None
+    if args.since or args.until or args.types or args.stores:
+        scan_filter = ScanFilter(args.since, args.until, args.types, args.stores)
+    catalog = None
+    if args.catalog:
+        catalog = ReportCatalog(args.catalog)
+        if not args.catalog_no_refresh:
+            start = time.perf_counter()
+            for directory in reports_dirs:
+                catalog.update(directory, scan_filter.keep_date if scan_filter is not None else None)
+            print(f"Catalog: {catalog.listed} directories listed in {time.perf_counter() - start:.3f}s",
+                  file=sys.stderr)
+    if args.list:
+        for directory in reports_dirs:
+            if catalog is not None:
+                jobs = [job for _, dir_jobs in find_catalog_files(catalog, directory, scan_filter) for job in dir_jobs]
+            else:
+                jobs = find_report_files(directory, args.sniff, scan_filter)
+            for real_date, report_type, file_path in jobs:
+                print(f"{real_date} {report_type} {file_path}")
+        return
+    if args.by_store:
+        stats = {} if args.stats else None
+        index = ingest_stores(reports_dirs, args.format, args.output or 'stores', workers, args.manifest_dir,
+                              args.cache_dir, args.cache_size * 1024 * 1024, stats, scan_filter)
+        write_stats(args.stats, stats)
+        for store, entry in index.items():
+            print(f"Store {store}: {entry['reports']} reports, {entry['first_date']} to {entry['last_date']}")
+        return
+
+    manifest = IngestManifest(args.manifest_dir) if args.manifest_dir else None
+    stats = {} if args.stats else None
+    if args.watch:
+        # Stop like Ctrl-C does, so the output is closed properly
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            with open_writer(args.format, args.output) as writer:
+                watch(writer, reports_dirs, workers, manifest, args.cache_dir, args.cache_size * 1024 * 1024,
+                      stats, args.sniff, args.poll_interval, args.settle, scan_filter)
+        except KeyboardInterrupt:
+            pass
+        write_stats(args.stats, stats)
+        return
+
+    with open_writer(args.format, args.output) as writer:
+        if args.pipeline:
+            report = ingest_pipeline(writer, reports_dirs, workers, manifest, args.cache_dir,
+                                     args.cache_size * 1024 * 1024, stats, args.sniff, args.readers,
+                                     scan_filter, catalog)
+        else:
+            ingest(writer, reports_dirs, workers, manifest, args.cache_dir,
+                   args.cache_size * 1024 * 1024, stats, args.sniff, scan_filter, catalog)
+    write_stats(args.stats, stats)
+    if args.pipeline:
+        print_pipeline_report(report)
+    if manifest is not None:
+        pruned = manifest.prune()
+        manifest.save()
+        print(f"Manifest: {manifest.hits} reused, {manifest.misses} parsed, {pruned} stale results removed")
+
+if __name__ == '__main__':
+    main()
 
 """
 EXAMPLE STRUCTURE
@@ -0,0 +1,308 @@
+import gzip
+import json
+import zlib
+import signal
+import argparse
+import threading
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from report_parser import PARSER_MODULES, ReportParser
+from report_sniff import SNIFF_SIZE, sniff_header
+
+# Largest request body accepted, compressed or not, and largest report once decompressed
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_REPORT_BYTES = 256 * 1024 * 1024
+
+# Seconds a request waits for a free parse slot before it is turned away with 503
+QUEUE_TIMEOUT = 10.0
+
+# Responses smaller than this are sent uncompressed even to clients accepting gzip
+GZIP_MIN_BYTES = 1024
+
+# Seconds an idle keep-alive connection is kept open
+IDLE_TIMEOUT = 30
+
+# Parser of each worker process, created by warm_worker
+worker_parser = None
+
+
+def warm_worker():
+    """Set up a worker process: import every parser module and create its ReportParser"""
+    global worker_parser
+    for report_number in PARSER_MODULES:
+        ReportParser.parser_for(report_number)
+    worker_parser = ReportParser()
+
+
+def worker_ready():
+    """No-op submitted once per worker at start, so the pool is spawned and warm before the first request"""
+    return True
+
+
+def parse_payload(report_number, payload):
+    """
+    Parse one uploaded report, runs in the worker processes
+
+    The result is serialized here so the server process only copies bytes.
+
+    Args:
+        report_number (str): Report number without prefix
+        payload (bytes): Uncompressed report contents
+
+    Returns:
+        bytes: {"report": "RPTxxx", "data": ...} as UTF-8 JSON
+    """
+    data = worker_parser.parse_report(report_number, payload)
+    return json.dumps({'report': f"RPT{report_number}", 'data': data}).encode('utf-8')
+
+
+def inflate(body, limit=MAX_REPORT_BYTES):
+    """
+    Decompress a gzip request body without letting it grow past limit
+
+    Args:
+        body (bytes): gzip data
+        limit (int): Largest decompressed size accepted
+
+    Returns:
+        bytes or None: The report contents, None if they exceed limit
+
+    Raises:
+        zlib.error: The body is not valid gzip data
+    """
+    # 16 + MAX_WBITS expects a gzip header and trailer around the deflate stream
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    payload = decompressor.decompress(body, limit + 1)
+    if len(payload) > limit:
+        return None
+    if not decompressor.eof:
+        raise zlib.error("truncated gzip data")
+    return payload
+
+
+def requested_report_number(path):
+    """
+    Report number named by the request, as /parse/RPT002, /parse/002 or /parse?report=RPT002
+
+    Returns:
+        str or None: The number without prefix, None if the request names none
+    """
+    url = urlsplit(path)
+    name = url.path[len('/parse'):].strip('/') or parse_qs(url.query).get('report', [''])[0]
+    if name.upper().startswith('RPT'):
+        name = name[3:]
+    return name or None
+
+
+class ParseRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /parse[/RPTxxx] with a raw or gzip-compressed report body, GET /health
+
+    The body must carry a Content-Length. It is taken as gzip data when sent
+    with Content-Encoding: gzip or when it starts with the gzip magic bytes.
+    Without a report number in the URL the report is identified from its
+    header line. HTTP/1.1 keeps connections alive between requests.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'TAMSReportParser/1.0'
+    timeout = IDLE_TIMEOUT
+
+    def handle_expect_100(self):
+        """Turn away an oversized body before the client sends it, when it asked first"""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = 0
+        if length < 0:
+            self.send_json(400, {'error': 'negative Content-Length'}, close=True)
+            return False
+        if length > self.server.max_body:
+            self.send_json(413, {'error': f"body larger than {self.server.max_body} bytes"}, close=True)
+            return False
+        return super().handle_expect_100()
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/health':
+            self.send_json(404, {'error': 'not found'})
+            return
+        self.send_json(200, {'status': 'ok', 'workers': self.server.workers,
+                             'max_concurrency': self.server.max_concurrency})
+
+    def do_POST(self):
+        if urlsplit(self.path).path.split('/')[1:2] != ['parse']:
+            self.send_json(404, {'error': 'not found'}, close=True)
+            return
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            self.send_json(411, {'error': 'chunked bodies are not supported, send a Content-Length'}, close=True)
+            return
+        try:
+            length = int(self.headers.get('Content-Length'))
+        except (TypeError, ValueError):
+            self.send_json(411, {'error': 'Content-Length required'}, close=True)
+            return
+        if length < 0:
+            # rfile.read(-1) would wait for the client to close the connection
+            self.send_json(400, {'error': 'negative Content-Length'}, close=True)
+            return
+        if length > self.server.max_body:
+            # The body is left unread, so the connection cannot be reused
+            self.send_json(413, {'error': f"body larger than {self.server.max_body} bytes"}, close=True)
+            return
+        body = self.rfile.read(length)
+
+        payload = body
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip' or body[:2] == b'\x1f\x8b':
+            try:
+                payload = inflate(body, self.server.max_report)
+            except zlib.error:
+                self.send_json(400, {'error': 'body is not valid gzip data'})
+                return
+            if payload is None:
+                self.send_json(413, {'error': f"report larger than {self.server.max_report} bytes"})
+                return
+
+        report_number = requested_report_number(self.path)
+        if report_number is None:
+            header = sniff_header(payload[:SNIFF_SIZE])
+            report_number = header['report_number'] if header else None
+            if report_number is None:
+                self.send_json(400, {'error': 'no report number given and none found in the header line'})
+                return
+        if report_number not in PARSER_MODULES:
+            self.send_json(400, {'error': f"Unknown report number: {report_number}"})
+            return
+
+        if not self.server.slots.acquire(timeout=self.server.queue_timeout):
+            self.send_json(503, {'error': 'too many reports being parsed, retry later'},
+                           headers={'Retry-After': '1'})
+            return
+        pool = self.server.pool
+        try:
+            result = pool.submit(parse_payload, report_number, payload).result()
+        except BrokenProcessPool:
+            self.server.restart_pool(pool)
+            self.send_json(503, {'error': 'parser process died, retry later'}, headers={'Retry-After': '1'})
+            return
+        except Exception as error:
+            self.send_json(422, {'error': f"RPT{report_number} could not be parsed: {error}"})
+            return
+        finally:
+            self.server.slots.release()
+        self.send_body(200, result)
+
+    def send_json(self, status, body, headers=None, close=False):
+        """Send a small JSON response, closing the connection when the request body was not consumed"""
+        self.send_body(status, json.dumps(body).encode('utf-8'), headers, close)
+
+    def send_body(self, status, body, headers=None, close=False):
+        """Send a JSON response, gzip-compressed when the client accepts it and it is worth it"""
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if close:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ParseServer(ThreadingHTTPServer):
+    """
+    HTTP server handing uploaded reports to a pre-warmed pool of parser processes
+
+    Each connection is served by its own thread; at most max_concurrency
+    reports are parsed at once, further requests wait up to queue_timeout
+    seconds for a slot.
+
+    Args:
+        address (tuple): (host, port) to listen on
+        workers (int): Parser processes, all started and warmed before serving
+        max_concurrency (int): Reports parsed at once, defaults to workers
+        max_body (int): Largest request body accepted in bytes
+        max_report (int): Largest decompressed report accepted in bytes
+        queue_timeout (float): Seconds a request waits for a parse slot
+        verbose (bool): Log every request to stderr
+    """
+
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self, address, workers=1, max_concurrency=None, max_body=MAX_BODY_BYTES,
+                 max_report=MAX_REPORT_BYTES, queue_timeout=QUEUE_TIMEOUT, verbose=False):
+        self.workers = workers
+        self.max_concurrency = max_concurrency or workers
+        self.max_body = max_body
+        self.max_report = max_report
+        self.queue_timeout = queue_timeout
+        self.verbose = verbose
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.pool_lock = threading.Lock()
+        super().__init__(address, ParseRequestHandler)
+        self.pool = self.start_pool()
+
+    def start_pool(self):
+        """Start the parser processes and wait until every one of them is warm"""
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        # Submitted together so every worker process is started, each runs warm_worker first
+        for future in [pool.submit(worker_ready) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def restart_pool(self, broken):
+        """Replace a pool whose worker process died, once however many requests saw it break"""
+        with self.pool_lock:
+            if self.pool is broken:
+                self.pool = self.start_pool()
+                broken.shutdown(wait=False)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Serve the TAMS report parsers over HTTP: POST a raw or gzip report to /parse "
+                    "or /parse/RPTxxx and get its JSON back")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: 127.0.0.1)")
+    arg_parser.add_argument('--port', type=int, default=8080, help="port to listen on (default: 8080)")
+    arg_parser.add_argument('--workers', type=int, default=2, help="parser processes (default: 2)")
+    arg_parser.add_argument('--max-concurrency', type=int, default=None,
+                            help="reports parsed at once, more requests wait (default: --workers)")
+    arg_parser.add_argument('--max-body-mb', type=float, default=MAX_BODY_BYTES / 1024 / 1024,
+                            help="largest request body in MB (default: 64)")
+    arg_parser.add_argument('--max-report-mb', type=float, default=MAX_REPORT_BYTES / 1024 / 1024,
+                            help="largest report after decompression in MB (default: 256)")
+    arg_parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = arg_parser.parse_args()
+
+    server = ParseServer((args.host, args.port), args.workers, args.max_concurrency,
+                         int(args.max_body_mb * 1024 * 1024), int(args.max_report_mb * 1024 * 1024),
+                         verbose=args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/parse with {args.workers} workers",
+          flush=True)
+    # Stop like Ctrl-C does, so the worker processes are shut down
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
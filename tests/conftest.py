@@ -0,0 +1,28 @@
+import os
+import sys
+import datetime
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'bench'))
+
+from generate_reports import generate_report  # noqa: E402
+from report_parser import ReportParser  # noqa: E402
+
+REPORT_NUMBERS = ["001", "002", "003", "004", "083"]
+
+# Print time of the generated reports, the real_date of their results is its date
+PRINTED = datetime.datetime(2014, 5, 14, 18, 12, 24)
+
+
+@pytest.fixture(scope='session')
+def parsed_reports():
+    """(real_date, 'RPTxxx', result) of one generated report of every supported type"""
+    parser = ReportParser()
+    return [(PRINTED.strftime('%Y%m%d'), f"RPT{report_number}",
+             parser.parse_report(report_number, generate_report(report_number, PRINTED, employees=12,
+                                                                transactions=150)))
+            for report_number in REPORT_NUMBERS]
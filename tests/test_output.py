@@ -0,0 +1,100 @@
+import json
+import sqlite3
+
+from report_columnar import TRANSACTION_FIELDS
+from report_output import open_writer
+from report_sqlite import REPORT_TABLES
+
+
+def json_round_trip(value):
+    return json.loads(json.dumps(value))
+
+
+def write_all(output_format, path, reports):
+    with open_writer(output_format, str(path)) as writer:
+        for real_date, report_type, data in reports:
+            writer.write(real_date, report_type, data)
+
+
+def test_jsonl_round_trip(tmp_path, parsed_reports):
+    path = tmp_path / 'dump.jsonl'
+    write_all('jsonl', path, parsed_reports)
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{'date': real_date, 'report': report_type, 'data': json_round_trip(data)}
+                     for real_date, report_type, data in parsed_reports]
+
+
+def test_json_round_trip(tmp_path, parsed_reports):
+    path = tmp_path / 'dump.json'
+    write_all('json', path, parsed_reports)
+    expected = {}
+    for real_date, report_type, data in parsed_reports:
+        expected.setdefault(real_date, {})[report_type] = data
+    # The spooled reports are stitched into exactly what one json.dump with indent=2 writes
+    assert path.read_text() == json.dumps(expected, indent=2)
+    assert [entry.name for entry in tmp_path.iterdir()] == ['dump.json']
+
+
+def test_json_empty(tmp_path):
+    path = tmp_path / 'dump.json'
+    write_all('json', path, [])
+    assert json.loads(path.read_text()) == {}
+
+
+def test_shards_round_trip(tmp_path, parsed_reports):
+    directory = tmp_path / 'dump'
+    write_all('shards', directory, parsed_reports)
+    real_date = parsed_reports[0][0]
+    assert json.loads((directory / 'index.json').read_text()) == {
+        real_date: [report_type for _, report_type, _ in parsed_reports]}
+    for real_date, report_type, data in parsed_reports:
+        assert json.loads((directory / real_date / f"{report_type}.json").read_text()) == json_round_trip(data)
+
+
+def read_reports(path):
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    try:
+        reports = {}
+        for report in connection.execute("SELECT * FROM reports ORDER BY report_id"):
+            table = REPORT_TABLES[report['report_type']][0]
+            rows = connection.execute(f"SELECT * FROM {table} WHERE report_id = ? ORDER BY rowid",
+                                      (report['report_id'],)).fetchall()
+            reports[report['report_type']] = (dict(report), [tuple(row)[1:] for row in rows])
+        return reports
+    finally:
+        connection.close()
+
+
+def test_sqlite_round_trip(tmp_path, parsed_reports):
+    path = tmp_path / 'dump.sqlite'
+    write_all('sqlite', path, parsed_reports)
+    reports = read_reports(path)
+    assert list(reports) == [report_type for _, report_type, _ in parsed_reports]
+
+    for real_date, report_type, data in parsed_reports:
+        report, rows = reports[report_type]
+        metadata = data['metadata']
+        assert report['store_id'] == metadata['store_id']
+        assert report['print_date'] == f"{real_date[:4]}-{real_date[4:6]}-{real_date[6:8]}"
+        assert report['accounting_day'] == metadata.get('accounting_day')
+        table, row_function, keys = REPORT_TABLES[report_type]
+        assert json.loads(report['extra']) == json_round_trip(
+            {key: value for key, value in data.items() if key not in keys})
+        # Every value comes back with its type, REAL columns hold floats and NULL stands for None
+        assert rows == list(row_function(data))
+        assert rows
+
+    _, transactions = reports['RPT002']
+    results = {report_type: data for _, report_type, data in parsed_reports}
+    assert [dict(zip(TRANSACTION_FIELDS, row[1:])) for row in transactions] == results['RPT002']['transactions']
+
+
+def test_sqlite_reload_replaces(tmp_path, parsed_reports):
+    path = tmp_path / 'dump.sqlite'
+    write_all('sqlite', path, parsed_reports)
+    first = read_reports(path)
+    write_all('sqlite', path, parsed_reports)
+    second = read_reports(path)
+    assert [rows for _, rows in second.values()] == [rows for _, rows in first.values()]
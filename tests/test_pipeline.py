@@ -0,0 +1,62 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import run
+from generate_reports import generate_archive
+from report_manifest import IngestManifest
+from report_output import open_writer
+
+
+@pytest.fixture(scope='module')
+def reports_dir(tmp_path_factory):
+    """A generated archive of three days, one uncompressed so both read paths are taken"""
+    directory = tmp_path_factory.mktemp('reports')
+    generate_archive(str(directory), days=2, employees=12, transactions=150)
+    generate_archive(str(directory), days=1, employees=12, transactions=150, compress=False,
+                     start=datetime.date(2014, 5, 20))
+    return str(directory)
+
+
+def output_contents(output_format, path):
+    if output_format == 'sqlite':
+        connection = sqlite3.connect(path)
+        try:
+            return list(connection.iterdump())
+        finally:
+            connection.close()
+    with open(path) as f:
+        return f.read()
+
+
+def ingest_to(output_format, path, reports_dir, pipeline, workers=1, manifest=None):
+    # The writer is opened and closed on the test's thread, like run.py main does
+    with open_writer(output_format, str(path)) as writer:
+        if pipeline:
+            report = run.ingest_pipeline(writer, reports_dir, workers, manifest)
+            count = report['reports']
+        else:
+            count = run.ingest(writer, reports_dir, workers, manifest)
+    return count, output_contents(output_format, str(path))
+
+
+@pytest.mark.parametrize('output_format', ['jsonl', 'json', 'sqlite'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_pipeline_writes_what_a_serial_ingest_writes(tmp_path, reports_dir, output_format, workers):
+    serial = ingest_to(output_format, tmp_path / f"serial.{output_format}", reports_dir, False)
+    pipeline = ingest_to(output_format, tmp_path / f"pipeline.{output_format}", reports_dir, True, workers)
+    assert serial[0] == 15
+    assert pipeline == serial
+
+
+def test_pipeline_reuses_the_manifest(tmp_path, reports_dir):
+    serial = ingest_to('jsonl', tmp_path / 'serial.jsonl', reports_dir, False)
+    manifest = IngestManifest(str(tmp_path / 'manifest'))
+    first = ingest_to('jsonl', tmp_path / 'first.jsonl', reports_dir, True, manifest=manifest)
+    assert (manifest.hits, manifest.misses) == (0, 15)
+
+    manifest = IngestManifest(str(tmp_path / 'manifest'))
+    second = ingest_to('jsonl', tmp_path / 'second.jsonl', reports_dir, True, manifest=manifest)
+    assert (manifest.hits, manifest.misses) == (15, 0)
+    assert first == second == serial
@@ -0,0 +1,76 @@
+import pytest
+
+import report_parser
+from report_tokens import row_converter, to_float, to_int
+
+
+@pytest.mark.parametrize('token, expected', [
+    ('12.50', 12.5),
+    ('  42 ', 42.0),
+    ('-3.2', -3.2),
+    ('+3', 3.0),
+    ('1,234.50', 1234.5),
+    ('52,', 52.0),
+    ('87.50%', 87.5),
+    ('  0.00% ', 0.0),
+    ('12.50-', -12.5),
+    ('5-', -5.0),
+    ('1,234.50-', -1234.5),
+    ('******', None),
+    ('!!!!!!', None),
+    ('**********', None),
+    ('-', None),
+    ('', None),
+    ('      ', None),
+    ('abc', None),
+    (None, None),
+])
+def test_to_float(token, expected):
+    assert to_float(token) == expected
+    # The second call is answered from the cache of rejected tokens
+    assert to_float(token) == expected
+
+
+@pytest.mark.parametrize('token, expected', [
+    ('42', 42),
+    ('52,', 52),
+    ('1,234', 1234),
+    ('12-', -12),
+    ('  7 ', 7),
+    ('******', None),
+    ('!!!!!!', None),
+    ('-', None),
+    ('', None),
+    ('12.5', None),
+    (None, None),
+])
+def test_to_int(token, expected):
+    assert to_int(token) == expected
+    assert to_int(token) == expected
+
+
+def test_to_float_keeps_the_type_of_plain_numbers():
+    assert isinstance(to_float('3'), float)
+    assert isinstance(to_int('3'), int)
+
+
+def test_row_converter_falls_back_per_row():
+    convert = row_converter(('sales', 'count', 'percent'), (float, int, float), offset=1)
+    assert convert(['1001', '10.5', '3', '25.00']) == {'sales': 10.5, 'count': 3, 'percent': 25.0}
+    assert convert(['1001', '52,', '12-', '87.50%']) == {'sales': 52.0, 'count': -12, 'percent': 87.5}
+    assert convert(['Total', '!!!!!!', '3', None]) == {'sales': None, 'count': 3, 'percent': None}
+
+
+def test_row_converter_keeps_field_order():
+    convert = row_converter(('b', 'a'), (int, int))
+    assert list(convert(['1', '2'])) == ['b', 'a']
+
+
+def test_legacy_helpers_resolve_through_report_parser():
+    assert report_parser.safe_float('1,234.50') == 1234.5
+    assert report_parser.safe_float('87.50%') == 87.5
+    assert report_parser.safe_float(3) == 3.0
+    assert report_parser.safe_float(None) is None
+    assert report_parser.safe_int('12-') == -12
+    assert report_parser.safe_int('!!!!!!') is None
+    assert report_parser.detect_data_type('Emp   Net Sales   Gross   GP%') == 'sales'